@@ -7,6 +7,7 @@
     to execute functionalities within gsa-module package
 """
 import numpy as np
+from .util import write_array
 
 
 def create_sample():
@@ -35,14 +36,32 @@ def create_sample():
                                   seed=inputs["seed_number"])
     elif inputs["method"] == "lhs-opt":
         # Create an optimized latin hypercube design
-        dm = samples.lhs_opt.create_ese(inputs["num_samples"],
-                                        inputs["num_dimensions"],
-                                        seed=inputs["seed_number"],
-                                        max_outer=inputs["num_iterations"])
+        if inputs["optimizer"] == "sa":
+            dm = samples.lhs_opt.create_sa(inputs["num_samples"],
+                                           inputs["num_dimensions"],
+                                           seed=inputs["seed_number"],
+                                           max_outer=inputs["num_iterations"],
+                                           obj_function=inputs["objective"])
+        elif inputs["num_starts"] > 1 or inputs["checkpoint_dir"] is not None:
+            # From several independent optimizations, can be resumed
+            dm = samples.lhs_opt.create_ese_multistart(
+                inputs["num_samples"], inputs["num_dimensions"],
+                seed=inputs["seed_number"],
+                max_outer=inputs["num_iterations"],
+                num_starts=inputs["num_starts"],
+                n_jobs=inputs["num_jobs"],
+                obj_function=inputs["objective"],
+                checkpoint_dir=inputs["checkpoint_dir"])
+        else:
+            dm = samples.lhs_opt.create_ese(inputs["num_samples"],
+                                            inputs["num_dimensions"],
+                                            seed=inputs["seed_number"],
+                                            max_outer=inputs["num_iterations"],
+                                            obj_function=inputs["objective"])
 
     # Save the design into file
-    np.savetxt(inputs["filename"], dm,
-               fmt="%1.6e", delimiter=inputs["delimiter"])
+    write_array(inputs["filename"], dm, inputs["output_format"],
+                fmt=inputs["float_format"])
 
 
 def morris_generate():
@@ -66,8 +85,8 @@ def morris_generate():
                                   inputs["direction_numbers"])
 
     # Save the sample
-    np.savetxt(inputs["output_file"], dm,
-               fmt="%1.6e", delimiter=inputs["delimiter"])
+    write_array(inputs["output_file"], dm, inputs["output_format"],
+                fmt=inputs["float_format"])
 
 
 def morris_analyze():
@@ -123,7 +142,9 @@ def morris_analyze():
     param_rank, bootstrap = morris.analyze.ee(dm_norm,
                                               outp,
                                               bootstrap=10000,
-                                              xx_rescaled=dm_resc)
+                                              xx_rescaled=dm_resc,
+                                              seed=inputs["seed_number"],
+                                              n_jobs=inputs["num_jobs"])
 
     # Save the result of the analysis
     np.savetxt(inputs["output_file"], param_rank,
@@ -155,4 +176,6 @@ def sobol_generate():
     )
 
     # Save the samples
-    sobol.sobol_saltelli.write(dm_dict, inputs["output_header"])
+    sobol.sobol_saltelli.write(dm_dict, inputs["output_header"],
+                               fmt=inputs["float_format"],
+                               output_format=inputs["output_format"])
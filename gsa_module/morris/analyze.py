@@ -36,16 +36,26 @@ import numpy as np
 def ee(xx_normalized: np.ndarray,
        y: np.ndarray,
        bootstrap: int = 10000,
-       xx_rescaled: np.ndarray = None) -> tuple:
+       xx_rescaled: np.ndarray = None,
+       seed=None,
+       n_jobs: int = 1) -> tuple:
         """Compute the statistics of elementary effects and bootstrap samples
 
         the function will detect whether xx_normalized is of radial or 
         trajectory design
 
+        The replications are resampled by chunks of bootstrap samples, the
+        statistics of all the samples of a chunk are computed at once (see
+        `gsa_module.util.bootstrap()`).
+
         :param xx_normalized: normalized inputs array
         :param y: model output array
         :param bootstrap: the number of bootstrap samples
         :param xx_rescaled: rescaled inputs array
+        :param seed: the random seed number of the bootstrap, None to use the
+            global numpy random state
+        :param n_jobs: the number of threads to compute the bootstrap
+            samples, -1 to use all the CPUs
         :return: k*6 array, rows correspond to parameters and columns to
             (mu_ee, mu*_ee, sd_ee, mu_see, mu*_see, sd_see) and 
             bootstrap * k * 6 array, 1st dimension is bootstrap replication, 
@@ -53,6 +63,7 @@ def ee(xx_normalized: np.ndarray,
             of elementary effects
         """
         from .misc import sniff_morris
+        from ..util import bootstrap as bootstrap_samples
 
         # Compute the elementary effects for each replications
         if sniff_morris(xx_normalized)[0] == "trajectory":
@@ -63,20 +74,15 @@ def ee(xx_normalized: np.ndarray,
             raise ValueError("type of morris design cannot be determined!")
 
         num_dims = ee.shape[1]  # number of dimensions
-        num_reps = ee.shape[0]  # number of replications
         # Calculate the statistical summary of the elementary effects
         estimate_results = ee_statistics(ee, see)
 
-        # Do bootstrap
+        # Do bootstrap, the replications along the last axis
         if bootstrap > 0:
-            bootstrap_results = np.empty([bootstrap, num_dims, 6])
-            for i in range(bootstrap):
-                idx = np.random.choice(num_reps, num_reps, replace=True)
-                if see is not None:
-                    bootstrap_results[i, :, :] = ee_statistics(ee[idx, :],
-                                                               see[idx, :])
-                else:
-                    bootstrap_results[i, :, :] = ee_statistics(ee[idx, :])
+            outputs = [ee.T] if see is None else [ee.T, see.T]
+            bootstrap_results = bootstrap_samples(
+                ee_statistics_replicates, outputs, bootstrap,
+                seed=seed, n_jobs=n_jobs).reshape(bootstrap, num_dims, 6)
         else:
             bootstrap_results = None
 
@@ -87,6 +93,8 @@ def ee(xx_normalized: np.ndarray,
 def ee_statistics(ee: np.ndarray, see: np.ndarray = None) -> np.ndarray:
     """Compute the statistics of elementary effects
 
+    Without the standardized elementary effects, their statistics are zero.
+
     :param ee: the elementary effects, all dimensions and replications (reps.)
     :param see: the standardized elementary effects, all dimensions and reps.
     :return: k*6 output array, rows correspond to parameters and columns to
@@ -94,7 +102,7 @@ def ee_statistics(ee: np.ndarray, see: np.ndarray = None) -> np.ndarray:
     """
     # Get some parameters
     num_dims = ee.shape[1]  # number of dimensions
-    results = np.empty([num_dims, 6])
+    results = np.zeros([num_dims, 6])
     for i in range(num_dims):
         results[i, 0] = np.average(ee[:, i])
         results[i, 1] = np.average(np.abs(ee[:, i]))
@@ -109,6 +117,29 @@ def ee_statistics(ee: np.ndarray, see: np.ndarray = None) -> np.ndarray:
     return results
 
 
+def ee_statistics_replicates(ee: np.ndarray,
+                             see: np.ndarray = None) -> np.ndarray:
+    """Compute the statistics of elementary effects of many resampled sets
+
+    :param ee: the elementary effects, num_dims * num_sets * num_reps
+    :param see: the standardized elementary effects, same shape as `ee`
+    :return: (num_dims * 6) * num_sets array, the statistics of each set with
+        the rows of parameter i being rows 6*i to 6*i+5, in the same order as
+        the columns of :func:`ee_statistics`
+    """
+    results = np.zeros([ee.shape[0], 6, ee.shape[1]])
+    results[:, 0] = np.mean(ee, axis=-1)
+    results[:, 1] = np.mean(np.abs(ee), axis=-1)
+    results[:, 2] = np.std(ee, axis=-1)
+
+    if see is not None:
+        results[:, 3] = np.mean(see, axis=-1)
+        results[:, 4] = np.mean(np.abs(see), axis=-1)
+        results[:, 5] = np.std(see, axis=-1)
+
+    return results.reshape(-1, ee.shape[1])
+
+
 def trajectory_ee(xx_normalized: np.ndarray,
                   y: np.ndarray,
                   xx_rescaled: np.ndarray = None) -> tuple:
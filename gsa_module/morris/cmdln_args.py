@@ -10,7 +10,7 @@
 """
 import argparse
 import os
-from ..util import ext_to_delimiter
+from ..util import OUTPUT_FORMATS, ext_to_delimiter, ext_to_format
 from .._version import __version__
 
 
@@ -42,19 +42,25 @@ def get_create_sample():
     |                  | matrix file. By default: "csv" or parse directly if  |
     |                  | filename with extension is specified.                |
     +------------------+------------------------------------------------------+
+    | output_format    | ("csv", "tsv", "txt", "npy", "npz") the format of    |
+    |                  | the design matrix file. By default: the extension of |
+    |                  | the filename, otherwise the delimiter. The filename  |
+    |                  | "-" writes the design into the standard output       |
+    +------------------+------------------------------------------------------+
+    | float_format     | (str) the print format of the number in the text     |
+    |                  | formats. By default: "%1.6e"                         |
+    +------------------+------------------------------------------------------+
     | num_levels       | (None or int, >0) The number of levels, partitioning |
     |                  | the parameter space in the trajectory sampling scheme|
     +------------------+------------------------------------------------------+
     | seed_number      | (None or int, >= 0) Seed number for random number    |
     |                  | generation in the trajectory sampling scheme         |
     +------------------+------------------------------------------------------+
-    | direction_numbers| (None or np.ndarray) the contents of a direction     |
-    |                  | number file for Sobol' sequence generator            |
+    | direction_numbers| (None or str) the fullname (file+path) of a          |
+    |                  | direction number file for Sobol' sequence generator  |
     |                  | (default: built-in new-joe-kuo-6.21201)              |
     +------------------+------------------------------------------------------+
     """
-    from ..samples import sobol
-
     parser = argparse.ArgumentParser(
         description="%(prog)s - gsa-module, Generate DOE for Morris"
     )
@@ -93,6 +99,26 @@ def get_create_sample():
         help="the delimiter for the file (default: %(default)s)"
     )
 
+    # The output format
+    parser.add_argument(
+        "-of", "--output_format",
+        type=str,
+        choices=OUTPUT_FORMATS,
+        required=False,
+        help="The format of the file, text or numpy binary (default: from "
+             "the extension of the file, otherwise the delimiter)"
+    )
+
+    # The print format of the number
+    parser.add_argument(
+        "-fmt", "--float_format",
+        type=str,
+        required=False,
+        default="%1.6e",
+        help="The print format of the number in the text formats "
+             "(default: %(default)s)"
+    )
+
     # The method of generation
     parser.add_argument(
         "-ss", "--sampling_scheme",
@@ -157,16 +183,22 @@ def get_create_sample():
     # Assign the delimiter
     delimiter = ext_to_delimiter(args.delimiter)
 
+    # Check the output format
+    if args.output_format is None:
+        output_format = args.delimiter
+    else:
+        output_format = args.output_format
+
     # Create default filename if not passed
     if args.output_file is None and args.sampling_scheme == "trajectory":
         output_file = "trajectory_{}_{}_{}.{}" .format(args.num_blocks,
                                                        args.num_dimensions,
                                                        args.num_levels,
-                                                       args.delimiter)
+                                                       output_format)
     elif args.output_file is None and args.sampling_scheme == "radial":
         output_file = "radial_{}_{}.{}" .format(args.num_blocks,
                                                 args.num_dimensions,
-                                                args.delimiter)
+                                                output_format)
     else:
         extension = args.output_file.split("/")[-1].split(".")[-1]
         # Override the delimiter if it is assigned directly as an extension
@@ -174,6 +206,10 @@ def get_create_sample():
             delimiter = ext_to_delimiter(extension)
         else:
             delimiter = ext_to_delimiter(args.delimiter)
+        # An explicit output format wins over the extension,
+        # "-" for the standard output
+        if args.output_format is None:
+            output_format = ext_to_format(args.output_file, output_format)
         output_file = args.output_file
 
     # Check the validity of number of levels
@@ -197,8 +233,8 @@ def get_create_sample():
     if args.sampling_scheme == "radial":
         if args.direction_numbers is not None:
             if os.path.exists(args.direction_numbers):
-                direction_numbers = sobol.read_dirnumfile(
-                    args.direction_numbers, args.num_dimensions)
+                # Parsed and cached when the Sobol' generator is created
+                direction_numbers = args.direction_numbers
             else:
                 raise ValueError(
                     "Specified direction numbers file does not exist!")
@@ -214,6 +250,8 @@ def get_create_sample():
         "sampling_scheme": args.sampling_scheme,
         "output_file": output_file,
         "delimiter": delimiter,
+        "output_format": output_format,
+        "float_format": args.float_format,
         "num_levels": num_levels,
         "seed_number": seed_number,
         "direction_numbers": direction_numbers
@@ -252,6 +290,13 @@ def get_analyze():
     +-----------------------+------------------------------------------------------+
     | model_checking        | (bool) Flag to verbosely check the model             |
     +-----------------------+------------------------------------------------------+
+    | seed_number           | (None or int, >= 0) Seed number of the bootstrap,    |
+    |                       | the bootstrap samples do not depend on the number of |
+    |                       | threads                                              |
+    +-----------------------+------------------------------------------------------+
+    | num_jobs              | (1 or int) the number of threads to compute the      |
+    |                       | bootstrap samples, -1 to use all the CPUs            |
+    +-----------------------+------------------------------------------------------+
     """
     import os
 
@@ -299,6 +344,24 @@ def get_analyze():
         help="Verbose model error checking"
     )
 
+    # The random seed number of the bootstrap
+    parser.add_argument(
+        "-s", "--seed_number",
+        type=int,
+        required=False,
+        help="The random seed number of the bootstrap"
+    )
+
+    # The number of threads of the bootstrap
+    parser.add_argument(
+        "-nj", "--num_jobs",
+        type=int,
+        required=False,
+        default=1,
+        help="The number of threads to compute the bootstrap samples, -1 to"
+             " use all the CPUs (default: %(default)s)"
+    )
+
     # Print Version
     parser.add_argument(
         "-V", "--version",
@@ -325,6 +388,10 @@ def get_analyze():
         raise ValueError("{} output file does not exist!"
                          .format(args.outputs))
 
+    # Check the validity of seed number
+    if args.seed_number is not None and args.seed_number < 0:
+        raise ValueError("Random seed number must be >= 0")
+
     # Create filename of analysis output file
     if args.output_file is None:
         output_file = "{}-{}" \
@@ -343,7 +410,9 @@ def get_analyze():
               "outputs": args.outputs,
               "output_file": output_file,
               "bootstrap_output_file": bootstrap_output_file,
-              "model_checking": args.model_checking
+              "model_checking": args.model_checking,
+              "seed_number": args.seed_number,
+              "num_jobs": args.num_jobs
               }
 
     return inputs
@@ -106,7 +106,8 @@ def radial(r: int, k: int, dirnum: np.ndarray = None,
 
     :param r: the number of blocks/replications/trajectories
     :param k: the number of dimensions/parameters
-    :param dirnum: the numpy array with direction number parameters
+    :param dirnum: the numpy array with direction number parameters or the
+        fullname of a direction numbers file
     :param shift_exclude: the lower shift for the half of the design with which
         the first half is subtracted
     :return: the radial design matrix of dimension r*(k+1)-by-k
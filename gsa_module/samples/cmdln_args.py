@@ -4,8 +4,9 @@ validation data
 """
 import argparse
 import os
-from ..util import ext_to_delimiter
+from ..util import OUTPUT_FORMATS, ext_to_delimiter, ext_to_format
 from .._version import __version__
+from .opt_alg.objective_functions import OBJECTIVE_FUNCTIONS
 
 
 __author__ = "Damar Wicaksono"
@@ -35,6 +36,14 @@ def get_create_sample():
     | delimiter        | ("csv", "tsv", "txt") the delimiter of the design    |
     |                  | matrix file. By default: "csv"                       |
     +------------------+------------------------------------------------------+
+    | output_format    | ("csv", "tsv", "txt", "npy", "npz") the format of    |
+    |                  | the design matrix file. By default: the extension of |
+    |                  | the filename, otherwise the delimiter. The filename  |
+    |                  | "-" writes the design into the standard output       |
+    +------------------+------------------------------------------------------+
+    | float_format     | (str) the print format of the number in the text     |
+    |                  | formats. By default: "%1.6e"                         |
+    +------------------+------------------------------------------------------+
     | seed_number      | (None or int, >0) The random seed number (irrelevant |
     |                  | for non-randomized Sobol' sequence)                  |
     +------------------+------------------------------------------------------+
@@ -51,9 +60,23 @@ def get_create_sample():
     | num_iterations   | (100 or int, >0) the maximum number of outer         |
     |                  | iterations for optimizing the latin hypercube design |
     +------------------+------------------------------------------------------+
+    | objective        | (str) the objective function to optimize the latin   |
+    |                  | hypercube design. By default: "w2_discrepancy"       |
+    +------------------+------------------------------------------------------+
+    | optimizer        | ("ese", "sa") the algorithm to optimize the latin    |
+    |                  | hypercube design, Enhanced Stochastic Evolutionary or|
+    |                  | Simulated Annealing. By default: "ese"               |
+    +------------------+------------------------------------------------------+
+    | num_starts       | (1 or int, >0) the number of independent optimization|
+    |                  | of the latin hypercube design, the best is selected  |
+    +------------------+------------------------------------------------------+
+    | num_jobs         | (1 or int) the number of worker processes to run the |
+    |                  | independent optimizations, -1 to use all the CPUs    |
+    +------------------+------------------------------------------------------+
+    | checkpoint_dir   | (None or str) the directory to save the checkpoints  |
+    |                  | of the optimizations and to resume them from         |
+    +------------------+------------------------------------------------------+
     """
-    from .sobol import read_dirnumfile
-
     parser = argparse.ArgumentParser(
         description="gsa-module create_sample - Generate Design Matrix File"
     )
@@ -111,6 +134,26 @@ def get_create_sample():
         help="the delimiter for the file (default: %(default)s)"
     )
 
+    # The output format
+    parser.add_argument(
+        "-of", "--output_format",
+        type=str,
+        choices=OUTPUT_FORMATS,
+        required=False,
+        help="The format of the file, text or numpy binary (default: from "
+             "the extension of the file, otherwise the delimiter)"
+    )
+
+    # The print format of the number
+    parser.add_argument(
+        "-fmt", "--float_format",
+        type=str,
+        required=False,
+        default="%1.6e",
+        help="The print format of the number in the text formats "
+             "(default: %(default)s)"
+    )
+
     # Print the version
     parser.add_argument(
         "-V", "--version",
@@ -161,6 +204,56 @@ def get_create_sample():
              " (default: 100 iterations)"
     )
 
+    # The objective function
+    group_lhs_opt.add_argument(
+        "-obj", "--objective",
+        type=str,
+        choices=sorted(OBJECTIVE_FUNCTIONS.keys()),
+        required=False,
+        default="w2_discrepancy",
+        help="The objective function to optimize LHS (default: %(default)s)"
+    )
+
+    # The optimization algorithm
+    group_lhs_opt.add_argument(
+        "-alg", "--optimizer",
+        type=str,
+        choices=["ese", "sa"],
+        required=False,
+        default="ese",
+        help="The algorithm to optimize LHS, Enhanced Stochastic Evolutionary"
+             " or Simulated Annealing (default: %(default)s)"
+    )
+
+    # The number of independent optimizations
+    group_lhs_opt.add_argument(
+        "-nstart", "--num_starts",
+        type=int,
+        required=False,
+        default=1,
+        help="The number of independent optimizations of LHS, the best design"
+             " is selected (default: %(default)s)"
+    )
+
+    # The number of worker processes
+    group_lhs_opt.add_argument(
+        "-nj", "--num_jobs",
+        type=int,
+        required=False,
+        default=1,
+        help="The number of worker processes for the independent"
+             " optimizations, -1 to use all the CPUs (default: %(default)s)"
+    )
+
+    # The checkpoint directory
+    group_lhs_opt.add_argument(
+        "-ckpt", "--checkpoint_dir",
+        type=str,
+        required=False,
+        help="The directory to save the checkpoints of the optimizations,"
+             " an interrupted optimization is resumed from its checkpoint"
+    )
+
     # Get the command line arguments
     args = parser.parse_args()
 
@@ -176,8 +269,8 @@ def get_create_sample():
     if args.method == "sobol":
         if args.direction_numbers is not None:
             if os.path.exists(args.direction_numbers):
-                direction_numbers = read_dirnumfile(args.direction_numbers,
-                                                    args.num_dimensions)
+                # Parsed and cached when the Sobol' generator is created
+                direction_numbers = args.direction_numbers
             else:
                 raise ValueError(
                     "Sobol' generator direction number file does not exist!")
@@ -197,11 +290,17 @@ def get_create_sample():
     else:
         seed_number = args.seed_number
 
+    # Check the output format
+    if args.output_format is None:
+        output_format = args.delimiter
+    else:
+        output_format = args.output_format
+
     # Create default filename if not passed
     if args.output_file is None:
         output_file = "{}_{}_{}.{}" .format(args.method, args.num_samples,
                                             args.num_dimensions,
-                                            args.delimiter)
+                                            output_format)
     else:
         extension = args.output_file.split("/")[-1].split(".")[-1]
         # Override the delimiter if it is assigned directly as an extension
@@ -209,6 +308,10 @@ def get_create_sample():
             delimiter = ext_to_delimiter(extension)
         else:
             delimiter = ext_to_delimiter(args.delimiter)
+        # An explicit output format wins over the extension,
+        # "-" for the standard output
+        if args.output_format is None:
+            output_format = ext_to_format(args.output_file, output_format)
         output_file = args.output_file
 
     # Set default value for the number of iterations if opt-lhs is selected
@@ -216,17 +319,31 @@ def get_create_sample():
         if args.num_iterations < 0:
             raise ValueError("Number of iterations must be greater than zero!")
 
+    # Check the validity of the number of independent optimizations
+    if args.num_starts <= 0:
+        raise ValueError("Zero or negative number of optimizations")
+    if args.optimizer == "sa" and \
+            (args.num_starts > 1 or args.checkpoint_dir is not None):
+        raise ValueError("Multi-start and checkpoint only available for ESE")
+
     # Return the parsed command line arguments as a dictionary
     inputs = {"num_samples": args.num_samples,
               "num_dimensions": args.num_dimensions,
               "method": args.method,
               "filename": output_file,
               "delimiter": delimiter,
+              "output_format": output_format,
+              "float_format": args.float_format,
               "seed_number": seed_number,
               "direction_numbers": direction_numbers,
               "exclude_nominal": args.exclude_nominal,
               "randomize_sobol": args.randomize_sobol,
-              "num_iterations": args.num_iterations
+              "num_iterations": args.num_iterations,
+              "objective": args.objective,
+              "optimizer": args.optimizer,
+              "num_starts": args.num_starts,
+              "num_jobs": args.num_jobs,
+              "checkpoint_dir": args.checkpoint_dir
               }
 
     return inputs
@@ -273,6 +390,26 @@ def get_create_validset():
         help="The number of candidates from the Hammersley sequence"
     )
 
+    # The objective function
+    parser.add_argument(
+        "-obj", "--objective",
+        type=str,
+        choices=sorted(OBJECTIVE_FUNCTIONS),
+        required=False,
+        default="w2_discrepancy",
+        help="The objective function of the design (default: %(default)s)"
+    )
+
+    # The number of test points selected per round
+    parser.add_argument(
+        "-q", "--batch_size",
+        type=int,
+        required=False,
+        default=1,
+        help="The number of test points selected per round "
+             "(default: %(default)s)"
+    )
+
     # Get the command line arguments
     args = parser.parse_args()
 
@@ -286,6 +423,10 @@ def get_create_validset():
     if args.num_candidates <= 0:
         raise ValueError
 
+    # Check the validity of the batch size
+    if args.batch_size <= 0:
+        raise ValueError
+
     # Determine the delimiter inside the file
     delimiter = args.dm_fullname.split("/")[-1].split(".")[-1]
     if delimiter == "csv":
@@ -303,12 +444,19 @@ def get_create_validset():
     else:
         output_file = args.output_file
 
+    # The output format from the extension, by default the same as the input
+    output_format = ext_to_format(
+        output_file, {",": "csv", "\t": "tsv"}.get(str_delimiter, "txt"))
+
     # Return the parsed command line arguments as a dictionary
     inputs = {"dm_fullname": args.dm_fullname,
               "num_tests": args.num_tests,
               "num_candidates": args.num_candidates,
               "filename": output_file,
-              "str_delimiter": str_delimiter
+              "str_delimiter": str_delimiter,
+              "output_format": output_format,
+              "objective": args.objective,
+              "batch_size": args.batch_size
               }
 
     return inputs
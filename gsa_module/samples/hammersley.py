@@ -1,31 +1,55 @@
 # -*- coding: utf-8 -*-
-"""hammersley.py: python module to generate Hammersley sequence. The
-implementation below is taken verbatim from (1) based on algorithm in (2)
+"""hammersley.py: python module to generate Hammersley and Halton sequences.
+The implementation of the radical inverse was originally taken from (1) based
+on algorithm in (2), it is now vectorized over all the indices of a base.
 
-It is not recommended to generate a Hammersley sequence more than 10 dimension
+It is not recommended to generate a Hammersley sequence more than 10 dimension,
+the randomized (random-start or scrambled) Halton sequence behaves better in
+higher dimension (3).
 
  **References**
 
  (1) https://github.com/PhaethonPrime/hammersley
  (2) T-T. Wong, W-S. Luk, and P-A. Heng, "Sampling with Hammersley and Halton
      Points," Journal of Graphics Tools, vol. 2, no. 2, 1997, pp. 9 - 24.
+ (3) X. Wang and F.J. Hickernell, "Randomized Halton Sequences," Mathematical
+     and Computer Modelling, vol. 32, 2000, pp. 887 - 899.
 """
+import math
 import numpy as np
-from six import moves, iteritems
 
-# this list of primes allows up to a size 120 vector
-saved_primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53,
-                59, 61, 67, 71, 73, 79, 83, 89, 97, 101, 103, 107, 109, 113,
-                127, 131, 137, 139, 149, 151, 157, 163, 167, 173, 179, 181, 191,
-                193, 197, 199, 211, 223, 227, 229, 233, 239, 241, 251, 257, 263,
-                269, 271, 277, 281, 283, 293, 307, 311, 313, 317, 331, 337, 347,
-                349, 353, 359, 367, 373, 379, 383, 389, 397, 401, 409, 419, 421,
-                431, 433, 439, 443, 449, 457, 461, 463, 467, 479, 487, 491, 499,
-                503, 509, 521, 523, 541, 547, 557, 563, 569, 571, 577, 587, 593,
-                599, 601, 607, 613, 617, 619, 631, 641, 643, 647, 653, 659]
+__author__ = "Damar Wicaksono"
+
+
+def first_primes(num_primes: int) -> np.ndarray:
+    """Get the first prime numbers using the sieve of Eratosthenes
+
+    :param num_primes: the number of prime numbers
+    :return: the first `num_primes` prime numbers
+    """
+    # Upper bound of the num_primes-th prime number (Rosser's theorem)
+    if num_primes < 6:
+        limit = 15
+    else:
+        limit = int(num_primes * (math.log(num_primes) +
+                                  math.log(math.log(num_primes)))) + 1
+
+    sieve = np.ones(limit + 1, dtype=bool)
+    sieve[:2] = False
+    for i in range(2, int(math.sqrt(limit)) + 1):
+        if sieve[i]:
+            sieve[i*i::i] = False
+
+    return np.nonzero(sieve)[0][:num_primes]
+
+
+# this list of primes is kept for backward compatibility, any number of primes
+# can be obtained from first_primes()
+saved_primes = first_primes(120).tolist()
 
 
 def get_phi(p, k):
+    """Compute the radical inverse of a single index k in base p"""
     p_ = p
     k_ = k
     phi = 0
@@ -37,20 +61,162 @@ def get_phi(p, k):
     return phi
 
 
-def generate_hammersley(n_points=100, n_dims=2,  primes=None):
-    primes = primes if primes is not None else saved_primes
-    for k in moves.range(n_points):
-        points = [k/n_points] + \
-                 [get_phi(primes[d], k) for d in moves.range(n_dims-1)]
-        yield points
+def radical_inverse(indices: np.ndarray, base: int,
+                    permutations: np.ndarray = None) -> np.ndarray:
+    """Compute the radical inverse of all the indices in a given base at once
 
+    The digits of the indices in the given base are mirrored around the
+    decimal point, one digit position at a time for all the indices. The
+    result is the same as :func:`get_phi` for each index.
+
+    If digit permutations are given, the digit at each position is permuted
+    before being mirrored (random digit scrambling). All the positions given
+    are then used, including the leading zeros of the indices.
+
+    :param indices: the non-negative integer indices
+    :param base: the base of the radical inverse, a prime number
+    :param permutations: the permutations of the digits (0, ..., base-1), one
+        row per digit position starting from the least significant one
+    :return: the radical inverse of the indices
+    """
+    k = np.array(indices, dtype=np.int64)
+    phi = np.zeros(k.shape)
+    p = float(base)
 
-def create(n_points=100, n_dims=2):
+    if permutations is None:
+        while np.any(k > 0):
+            phi += (k % base) / p
+            k //= base
+            p *= base
+    else:
+        for permutation in permutations:
+            phi += permutation[k % base] / p
+            k //= base
+            p *= base
+
+    return phi
+
+
+def create(n_points=100, n_dims=2, primes=None):
     """Wrapper function to generate Hammersley sequence
+
+    The first dimension is the regular grid k/n, the other dimensions are the
+    radical inverse of the indices in successive prime bases.
+
+    :param n_points: the number of points
+    :param n_dims: the number of dimension
+    :param primes: the bases of the dimensions after the first, by default the
+        successive prime numbers starting from 2
+    :return: the `n_points`-by-`n_dims` Hammersley sequence
     """
-    hammersley_gen = generate_hammersley(n_points, n_dims)
-    hammersley_points = []
-    for point in hammersley_gen:
-        hammersley_points.append(point)
+    if primes is None:
+        primes = first_primes(max(n_dims - 1, 1))
 
-    return np.array(hammersley_points)
+    indices = np.arange(n_points)
+    hammersley_points = np.empty([n_points, n_dims])
+    hammersley_points[:, 0] = indices / n_points
+    for d in range(n_dims - 1):
+        hammersley_points[:, d+1] = radical_inverse(indices, primes[d])
+
+    return hammersley_points
+
+
+def generate_hammersley(n_points=100, n_dims=2, primes=None):
+    """Generate the Hammersley sequence one point at a time
+
+    :return: a generator of the points of the Hammersley sequence, as lists
+    """
+    for points in create(n_points, n_dims, primes).tolist():
+        yield points
+
+
+class HaltonEngine:
+    """Generator of the Halton sequence, drawing the points in blocks
+
+    Dimension j of the sequence is the radical inverse of the indices in the
+    j-th prime base. The sequence can be randomized either by starting each
+    dimension at a random index (random-start, see (3)) or by scrambling
+    the digits of each dimension with random permutations. The randomization
+    is fixed at the creation of the engine, successive blocks of points are
+    the continuation of the same randomized sequence.
+
+    :param d: the number of dimension
+    :param random_start: flag to start each dimension at a random index
+    :param scramble: flag to scramble the digits with random permutations
+    :param seed: the random seed number of the randomization
+    """
+    def __init__(self, d: int,
+                 random_start: bool = False,
+                 scramble: bool = False,
+                 seed: int = None):
+        self.d = d
+        self.primes = first_primes(d)
+        self.num_generated = 0
+
+        rng = np.random.RandomState(seed)
+        if random_start:
+            # Up to 2**32 for the start index of each dimension
+            self._start = rng.randint(0, 2**32, size=d, dtype=np.int64)
+        else:
+            self._start = np.zeros(d, dtype=np.int64)
+
+        self._permutations = [None] * d
+        if scramble:
+            for j, base in enumerate(self.primes):
+                # Enough digit positions to cover the double precision
+                num_digits = int(math.ceil(53 / math.log2(base)))
+                self._permutations[j] = np.array(
+                    [rng.permutation(base) for _ in range(num_digits)])
+
+    def reset(self):
+        """Restart the sequence from its first point
+
+        :return: the engine itself
+        """
+        self.num_generated = 0
+
+        return self
+
+    def fast_forward(self, k: int):
+        """Skip the next `k` points of the sequence
+
+        :param k: the number of points to skip
+        :return: the engine itself
+        """
+        self.num_generated += k
+
+        return self
+
+    def draw(self, m: int) -> np.ndarray:
+        """Draw the next `m` points of the sequence
+
+        :param m: the number of points
+        :return: the `m`-by-`d` next points of the Halton sequence
+        """
+        indices = np.arange(self.num_generated, self.num_generated + m,
+                            dtype=np.int64)
+        points = np.empty([m, self.d])
+        for j, base in enumerate(self.primes):
+            points[:, j] = radical_inverse(indices + self._start[j], base,
+                                           self._permutations[j])
+        self.num_generated += m
+
+        return points
+
+
+def create_halton(n: int, d: int,
+                  random_start: bool = False,
+                  scramble: bool = False,
+                  seed: int = None) -> np.ndarray:
+    """Generate `n` points of the `d`-dimensional Halton sequence
+
+    The first point is the origin for the deterministic sequence.
+
+    :param n: the number of points
+    :param d: the number of dimension
+    :param random_start: flag to start each dimension at a random index
+    :param scramble: flag to scramble the digits with random permutations
+    :param seed: the random seed number of the randomization
+    :return: the `n`-by-`d` Halton sequence
+    """
+    return HaltonEngine(d, random_start, scramble, seed).draw(n)
@@ -6,7 +6,8 @@ import numpy as np
 __author__ = "Damar Wicaksono"
 
 
-def create(n: int, d: int, seed: int) -> np.ndarray:
+def create(n: int, d: int, seed: int,
+           num_replicates: int = None) -> np.ndarray:
     """Generate `n` samples of `d` dimension design matrix
 
     The function returns a numpy array of n-row and d-dimension filled with
@@ -14,6 +15,11 @@ def create(n: int, d: int, seed: int) -> np.ndarray:
     The sampling is done in stratified manner to ensure that each 1/n interval
     is represented by the samples, see [1] for additional detail.
 
+    The design is generated without loop: a uniform jitter is added to the
+    grid of strata and the strata are randomly permuted in each column
+    (except the first) by sorting a matrix of uniform random numbers.
+    Several independent designs can be generated at once by `num_replicates`.
+
     **Reference**:
 
     (1) Michael D. McKay, R. J. Beckman, and W. J. Conover, "A Comparison of
@@ -24,20 +30,27 @@ def create(n: int, d: int, seed: int) -> np.ndarray:
     :param n: (int) the number of samples
     :param d: (int) the number of dimension
     :param seed: (int) the random seed number
+    :param num_replicates: (int) the number of independent designs, if None
+        (default) a single design matrix is returned
     :returns: (ndarray) a numpy array of `n`-by-`d` filled with randomly
-        generated random numbers of uniform variate in LHS class
+        generated random numbers of uniform variate in LHS class, or
+        `num_replicates`-by-`n`-by-`d` array if `num_replicates` is given
     """
     if seed is not None:
         np.random.seed(seed)
 
-    dm = np.empty([n, d])
+    num_reps = 1 if num_replicates is None else num_replicates
+
+    # Random point within each of the 1/n strata, in ascending order
+    strata = np.arange(n).reshape(1, n, 1)
+    dm = (strata + np.random.rand(num_reps, n, d)) / n
 
-    for j in range(d):
-        for i in range(n):
-            dm[i, j] = np.random.uniform(low=i/n, high=(i+1)/n)
+    if d > 1:
+        # Shuffle only the d-1 dimension, each column independently
+        perm = np.argsort(np.random.rand(num_reps, n, d-1), axis=1)
+        dm[:, :, 1:] = np.take_along_axis(dm[:, :, 1:], perm, axis=1)
 
-        if j > 0:
-            # Shuffle only the d-1 dimension
-            np.random.shuffle(dm[:, j])
+    if num_replicates is None:
+        return dm[0]
 
     return dm
@@ -2,6 +2,7 @@
 """lhs_opt.py: Module to generate design matrix from an optimized
 Latin Hypercube design
 """
+import os
 import numpy as np
 from . import lhs
 
@@ -14,7 +15,15 @@ def create_ese(n: int, d: int, seed: int, max_outer: int,
                num_exchanges: int=0,
                max_inner: int = 0,
                improving_params: list = [0.1, 0.8],
-               exploring_params: list = [0.1, 0.8, 0.9, 0.7]) -> np.ndarray:
+               exploring_params: list = [0.1, 0.8, 0.9, 0.7],
+               checkpoint: str = None,
+               checkpoint_every: int = 1,
+               callback=None,
+               max_time: float = None,
+               max_evaluations: int = None,
+               stall_outer: int = None,
+               stall_tol: float = 1e-6,
+               max_evol: int = 1000) -> np.ndarray:
     """Generate an optimized LHS using Enhanced Stochastic Evolutionary Alg.
 
     The default parameters of the optimization can be overridden, if necessary.
@@ -35,6 +44,18 @@ def create_ese(n: int, d: int, seed: int, max_outer: int,
         (b) the cut-off value of acceptance, start decreasing the threshold
         (c) the cooling multiplier for the threshold
         (d) the warming multiplier for the threshold
+    :param checkpoint: the checkpoint filename to save and resume the
+        optimization, None for no checkpoint
+    :param checkpoint_every: the number of outer iterations between checkpoints
+    :param callback: the function called with the record of each outer
+        iteration, e.g., a `Telemetry` instance
+    :param max_time: the maximum wall time in seconds
+    :param max_evaluations: the maximum number of objective function evaluations
+    :param stall_outer: the number of outer iterations without improvement of
+        the best design to stop the optimization
+    :param stall_tol: the relative improvement below which there is none
+    :param max_evol: the number of last accepted and best objective function
+        values kept in the evolution, None for all
     """
     from .opt_alg.stochastic_evolutionary import optimize
 
@@ -50,6 +71,135 @@ def create_ese(n: int, d: int, seed: int, max_outer: int,
 
     # Optimize the LHD sample
     dm_opt = optimize(dm, obj_function, threshold_init, num_exchanges,
-                      max_inner, max_outer, improving_params, exploring_params)
+                      max_inner, max_outer, improving_params, exploring_params,
+                      checkpoint, checkpoint_every, callback, max_time,
+                      max_evaluations, stall_outer, stall_tol, max_evol)
 
     return dm_opt.dm_best
+
+
+def create_sa(n: int, d: int, seed: int, max_outer: int,
+              obj_function: str = "w2_discrepancy",
+              temperature_init: float = 0,
+              cooling_factor: float = 0.8,
+              max_inner: int = 0) -> np.ndarray:
+    """Generate an optimized LHS using Simulated Annealing Algorithm
+
+    The cost of an iteration does not depend on the number of candidates as in
+    the ESE algorithm, for large designs a good design is obtained faster.
+
+    :param n: the number of samples
+    :param d: the number of dimension
+    :param seed: the random seed number
+    :param max_outer: the maximum number of outer iterations (temperatures)
+    :param obj_function: the objective function to optimize
+    :param temperature_init: the initial temperature, 0 to calculate from the
+        recommended value
+    :param cooling_factor: the multiplier to decrease the temperature
+    :param max_inner: the number of inner iterations at each temperature, 0 to
+        calculate from the recommended value
+    """
+    from .opt_alg.simulated_annealing import optimize
+
+    # If dimension is less than 2, abort optimization
+    if d < 2:
+        raise ValueError("Dimension less than 2, optimization irrelevant!")
+
+    if seed is not None:
+        np.random.seed(seed)
+
+    # Create initial LHD sample
+    dm = lhs.create(n, d, seed=seed)
+
+    # Optimize the LHD sample
+    dm_opt = optimize(dm, obj_function, temperature_init, cooling_factor,
+                      max_inner, max_outer)
+
+    return dm_opt.dm_best
+
+
+def _create_ese_chain(n: int, d: int, seed: int, max_outer: int,
+                      obj_function: str, checkpoint: str,
+                      kwargs: dict) -> tuple:
+    """Run a single chain of the multi-start ESE optimization
+
+    :return: a tuple of the objective function of the best design and the
+        best design
+    """
+    from .opt_alg.stochastic_evolutionary import pick_obj_function
+
+    dm_best = create_ese(n, d, seed, max_outer, obj_function,
+                         checkpoint=checkpoint, **kwargs)
+
+    return pick_obj_function(obj_function)(dm_best), dm_best
+
+
+def create_ese_multistart(n: int, d: int, seed: int, max_outer: int,
+                          num_starts: int = 4,
+                          n_jobs: int = 1,
+                          obj_function: str = "w2_discrepancy",
+                          checkpoint_dir: str = None,
+                          max_evol: int = 1000,
+                          **kwargs) -> np.ndarray:
+    """Generate an optimized LHS from several independent ESE optimizations
+
+    Each optimization (chain) starts from its own initial LHS and uses its own
+    random stream, seeded by spawning `num_starts` independent seeds from the
+    given seed. The chains run on a pool of `n_jobs` worker processes and the
+    best of the optimized designs is returned. The result does not depend on
+    the number of worker processes.
+
+    If a checkpoint directory is given, each chain saves its state in the file
+    `ese_chain_{i}.npz` of that directory and resumes from it if the file
+    exists, e.g., after an interrupted run.
+
+    :param n: the number of samples
+    :param d: the number of dimension
+    :param seed: the random seed number
+    :param max_outer: the maximum number of outer iterations of each chain
+    :param num_starts: the number of independent chains
+    :param n_jobs: the number of worker processes, -1 to use all the CPUs
+    :param obj_function: the objective function to optimize
+    :param checkpoint_dir: the directory of the checkpoint files, None for no
+        checkpoint
+    :param max_evol: the number of last accepted and best objective function
+        values kept in the evolution of each chain, None for all
+    :param kwargs: the other parameters of the optimization, see `create_ese()`
+    :return: the best optimized design among all the chains
+    """
+    if n_jobs is None or n_jobs == 0:
+        n_jobs = 1
+    elif n_jobs < 0:
+        n_jobs = os.cpu_count()
+    n_jobs = min(n_jobs, num_starts)
+
+    # Independent random streams for each chain
+    seed_seqs = np.random.SeedSequence(seed).spawn(num_starts)
+    seeds = [int(seed_seq.generate_state(1)[0]) for seed_seq in seed_seqs]
+
+    if checkpoint_dir is not None:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        checkpoints = [os.path.join(checkpoint_dir,
+                                    "ese_chain_{}.npz" .format(i))
+                       for i in range(num_starts)]
+    else:
+        checkpoints = [None] * num_starts
+
+    kwargs = dict(kwargs, max_evol=max_evol)
+    args = [(n, d, seeds[i], max_outer, obj_function, checkpoints[i], kwargs)
+            for i in range(num_starts)]
+
+    if n_jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [executor.submit(_create_ese_chain, *arg)
+                       for arg in args]
+            results = [future.result() for future in futures]
+    else:
+        results = [_create_ese_chain(*arg) for arg in args]
+
+    # Select the best design, the first one in case of ties
+    best = int(np.argmin([result[0] for result in results]))
+
+    return results[best][1]
@@ -1,7 +1,172 @@
 # -*- coding: utf-8 -*-
-"""simulated_annealing.py: Module containing various objective functions used to
-optimize a given Latin Hypercube Design using an implementation of Simulated
-Annealing Algorithm
+"""simulated_annealing.py: Module containing functionalities to optimize a
+given Latin Hypercube Design using an implementation of Simulated Annealing
+Algorithm (1), as applied to Latin Hypercube Design in (2).
+
+Each iteration exchanges two randomly selected elements of a randomly selected
+column of the current design. A worse design is accepted with a probability
+that decreases with the temperature, which is lowered geometrically after each
+outer iteration. Only a single exchange is evaluated per iteration, the cost
+of an iteration is O(n) for evaluating and O(n*k) for accepting the exchange.
+
+The exchanges following the current one are evaluated in blocks against the
+current design, up to the first accepted exchange. As the exchanges before it
+are all rejected, this is the same as evaluating them one at a time, but the
+per-iteration overhead is much lower when most exchanges are rejected. The
+block size grows while no exchange is accepted and shrinks otherwise.
+
+**References**
+
+ (1) S. Kirkpatrick, C.D. Gelatt, and M.P. Vecchi, "Optimization by Simulated
+     Annealing," Science, vol. 220(4598), pp. 671-680, 1983.
+ (2) M.D. Morris and T.J. Mitchell, "Exploratory Designs for Computational
+     Experiments," Journal of Statistical Planning and Inference, vol. 43,
+     pp. 381-402, 1995.
 """
+import numpy as np
+from .stochastic_evolutionary import pick_obj_state
 
 __author__ = "Damar Wicaksono"
+
+
+def init_temperature(obj_state,
+                     num_trials: int = 100,
+                     acceptance: float = 1e-6) -> float:
+    """Calculate the initial temperature from random exchanges
+
+    The initial temperature is selected such that a worsening exchange of
+    average magnitude is accepted with the given probability. The average is
+    taken from random exchanges of the initial design, the design is not
+    modified. Starting cold, i.e., with a small probability, is more efficient
+    for the discrepancy of LHS as most of the worsening exchanges are small.
+
+    :param obj_state: the state of the objective function of the initial design
+    :param num_trials: the number of random exchanges to evaluate
+    :param acceptance: the initial probability to accept an average worsening
+        exchange
+    :return: the initial temperature
+    """
+    n, k = obj_state.D.shape
+    cols = np.random.randint(0, k, size=num_trials)
+    rows_1 = np.random.randint(0, n, size=num_trials)
+    rows_2 = (rows_1 + np.random.randint(1, n, size=num_trials)) % n
+    delta = obj_state.try_swaps(cols, rows_1, rows_2) - obj_state.value
+
+    if np.any(delta > 0):
+        return -1 * np.mean(delta[delta > 0]) / np.log(acceptance)
+    else:
+        # All the exchanges improve the design, start very cold
+        return np.finfo(float).tiny
+
+
+MAX_BLOCK = 256     # the maximum number of exchanges evaluated at once
+
+
+def calc_max_inner(n: int, k: int) -> int:
+    """Calculate the number of iterations at a given temperature
+
+    Each element of the design is, on average, exchanged once at each
+    temperature.
+
+    :param n: the number of samples in the design
+    :param k: the number of design dimension
+    :return: the number of inner iterations/loop
+    """
+    return n * k
+
+
+def optimize(dm_init: np.ndarray,
+             obj_func_name: str,
+             temperature_init: float,
+             cooling_factor: float,
+             max_inner: int,
+             max_outer: int):
+    """Optimize a given design using Simulated Annealing Algorithm
+
+    :param dm_init: the initial design matrix
+    :param obj_func_name: the objective function used in the optimization
+    :param temperature_init: the initial temperature, if equal or less than
+        zero, then calculate from the recommended value
+    :param cooling_factor: the multiplier to decrease the temperature after
+        each outer iteration, between 0 and 1
+    :param max_inner: the number of inner iterations at each temperature, 0 or
+        less means calculate from the recommended value
+    :param max_outer: the maximum number of outer iterations (temperatures),
+        served as the stopping criterion for the optimization algorithm
+    :return: a collection of obj_function evolution and best design
+    """
+    import collections
+
+    # Initialize output structure, the same as the ESE algorithm
+    OptSolution = collections.namedtuple("OptSolution",
+                                         "dm_init dm_best best_evol try_evol")
+
+    if not 0.0 < cooling_factor < 1.0:
+        raise ValueError("Cooling factor must be between 0 and 1!")
+
+    # Initialization of Outer Iteration
+    n = dm_init.shape[0]     # number of samples
+    k = dm_init.shape[1]     # number of dimension
+    obj_class = pick_obj_state(obj_func_name)   # Choose objective function
+
+    dm = dm_init.copy()                     # the current design
+    obj_state = obj_class(dm)               # the state of obj.func. of design
+    dm_best = dm.copy()                     # the best design so far
+    obj_func_best = obj_state.value         # the best value of obj.func. so far
+    if temperature_init <= 0.0:
+        temperature = init_temperature(obj_state)   # Initial temperature
+    else:
+        temperature = temperature_init
+    if max_inner <= 0:                      # number of inner iterations
+        max_inner = calc_max_inner(n, k)
+
+    best_evol = []                      # Keep track the best solution
+    try_evol = []                       # Keep track the accepted trial solution
+
+    # Begin Outer Iteration
+    for outer in range(max_outer):
+        # The random exchanges of the whole inner iteration, drawn at once
+        cols = np.random.randint(0, k, size=max_inner)
+        rows_1 = np.random.randint(0, n, size=max_inner)
+        rows_2 = (rows_1 + np.random.randint(1, n, size=max_inner)) % n
+        log_rand = np.log(np.random.rand(max_inner))
+
+        # Begin Inner Iteration, by blocks of exchanges
+        inner = 0
+        block = 1
+        while inner < max_inner:
+            trials = slice(inner, min(inner + block, max_inner))
+            obj_func_try = obj_state.try_swaps(cols[trials], rows_1[trials],
+                                               rows_2[trials])
+            # Metropolis criterion, always accept a better solution
+            accepted = np.nonzero(obj_func_try - obj_state.value <=
+                                  -temperature * log_rand[trials])[0]
+            if accepted.shape[0] == 0:
+                # All rejected, continue with a larger block
+                inner = trials.stop
+                block = min(2 * block, MAX_BLOCK)
+                continue
+
+            # Accept solution, exchange the elements in the current design
+            inner += accepted[0]
+            obj_func_try = obj_state.swap(cols[inner], rows_1[inner],
+                                          rows_2[inner])
+            try_evol.append(obj_func_try)
+            if obj_func_try < obj_func_best:
+                # Best solution found
+                dm_best = dm.copy()
+                obj_func_best = obj_func_try
+                best_evol.append(obj_func_best)
+            inner += 1
+            block = max(block // 2, 1)
+
+        # Remove the round-off errors accumulated by the incremental update
+        obj_state.refresh()
+
+        # Cool down
+        temperature *= cooling_factor
+
+    output = OptSolution(dm_init=dm_init, dm_best=dm_best,
+                         best_evol=best_evol, try_evol=try_evol)
+
+    return output
@@ -15,7 +15,9 @@ version.
      Evolution," IEEE Transactions on Computer-Aided Design, vol. 10(4), 1981.
 """
 import types
-import math
+import os
+import time
+import collections
 import numpy as np
 from . import objective_functions
 
@@ -26,11 +28,26 @@ __author__ = "Damar Wicaksono"
 def pick_obj_function(obj_function: str) -> types.FunctionType:
     """Function to select by name the objective function to optimize
 
-    :param obj_function: the name of the objective function
+    :param obj_function: the name of the objective function, registered in
+        `objective_functions.OBJECTIVE_FUNCTIONS`
     :return: the objective function (FunctionType data type)
     """
-    if obj_function == "w2_discrepancy":
-        return objective_functions.w2_discrepancy_fast
+    if obj_function in objective_functions.OBJECTIVE_FUNCTIONS:
+        return objective_functions.OBJECTIVE_FUNCTIONS[obj_function][0]
+    else:
+        raise TypeError("Unsupported objective function")
+
+
+def pick_obj_state(obj_function: str) -> type:
+    """Function to select by name the objective function with incremental update
+
+    :param obj_function: the name of the objective function, registered in
+        `objective_functions.OBJECTIVE_FUNCTIONS`
+    :return: the class keeping the state of the objective function of a design
+        and updating it for column-wise exchanges
+    """
+    if obj_function in objective_functions.OBJECTIVE_FUNCTIONS:
+        return objective_functions.OBJECTIVE_FUNCTIONS[obj_function][1]
     else:
         raise TypeError("Unsupported objective function")
 
@@ -52,6 +69,15 @@ def init_threshold(dm: np.ndarray,
     return multiplier*obj_func(dm)
 
 
+def calc_num_pairs(n: int) -> int:
+    """Calculate the number of distinct pairs of elements, n choose 2
+
+    :param n: the number of elements
+    :return: the number of distinct pairs of elements
+    """
+    return n * (n - 1) // 2
+
+
 def calc_num_candidate(n: int) -> int:
     """Calculate the number of candidates from perturbing the current design
 
@@ -59,16 +85,16 @@ def calc_num_candidate(n: int) -> int:
     given column divided by a factor of 5.
 
     It is also recommended that the number of candidates to be evaluated does
-    not exceed 50
+    not exceed 50. At least one candidate is evaluated.
 
     :param n: the number of elements to be permuted
     :return: the number of candidates from perturbing the current design
         column-wise
     """
-    pairs = math.factorial(n) / math.factorial(n-2) / math.factorial(2)
+    pairs = calc_num_pairs(n)
     fac = 5 # The factor recommended in the article
 
-    return min(int(pairs/fac), 50)
+    return max(min(pairs // fac, 50), 1)
 
 
 def calc_max_inner(n: int, k: int) -> int:
@@ -81,50 +107,67 @@ def calc_max_inner(n: int, k: int) -> int:
     :param k: the number of design dimension
     :return: the maximum number of inner iterations/loop
     """
-    pairs = math.factorial(n) / math.factorial(n-2) / math.factorial(2)
+    pairs = calc_num_pairs(n)
 
     return min(int(2*pairs*k/calc_num_candidate(n)), 100)
 
 
-def perturb(dm: np.ndarray,
+def sample_pairs(n: int, num_pairs: int) -> np.ndarray:
+    """Randomly select distinct pairs of elements, without replacement
+
+    The pairs are drawn directly as pairs of random indices, duplicates are
+    discarded and new pairs drawn until enough distinct pairs are obtained.
+    The cost is proportional to the number of requested pairs, the list of all
+    the possible pairs is never created.
+
+    :param n: the number of elements
+    :param num_pairs: the number of distinct pairs to select
+    :return: num_pairs-by-2 array of indices, in each pair the first index is
+        smaller than the second
+    """
+    num_pairs = min(num_pairs, calc_num_pairs(n))
+    pairs = np.empty([0, 2], dtype=int)
+    while pairs.shape[0] < num_pairs:
+        new_pairs = np.random.randint(0, n, size=[num_pairs, 2])
+        new_pairs = new_pairs[new_pairs[:, 0] != new_pairs[:, 1]]
+        new_pairs.sort(axis=1)
+        pairs = np.vstack((pairs, new_pairs))
+        # Remove duplicates, keep the order in which the pairs were drawn
+        _, idx = np.unique(pairs[:, 0] * n + pairs[:, 1], return_index=True)
+        pairs = pairs[np.sort(idx)]
+
+    return pairs[:num_pairs]
+
+
+def perturb(obj_state,
             num_dimension: int,
-            num_exchanges: int,
-            obj_func: types.FunctionType) -> np.ndarray:
-    """Create new configuration of a design matrix according to ESE algorithm
+            num_exchanges: int) -> tuple:
+    """Find the best exchange in a column of a design according to ESE algorithm
 
     According to the algorithm, a distinct `num_candidate` designs have to be
     generated from the current design by carrying out a column-wise perturbation
     on a given column `num_dimension`. The best design according to the select
-    `obj_function` will be selected as the "perturbed" design
+    objective function will be selected as the "perturbed" design.
+
+    The candidate designs are not created, the objective function of all the
+    candidate exchanges are computed at once and incrementally from the state
+    of the current design. The current design is not modified.
 
-    :param dm: the current design matrix
+    :param obj_state: the state of the objective function of the current design
     :param num_dimension: the column of design matrix to be perturbed
     :param num_exchanges: the number of distinct candidates to be generated
-    :param obj_func: the select objective function
-    :return: the perturbed state of the current design
+    :return: a tuple of the pair of rows of the best exchange, the value of
+        the objective function after that exchange, and the number of
+        evaluated exchanges (at most the number of distinct pairs of rows)
     """
-    import itertools
-
-    # Create pairs of all possible combination
-    num_samples = dm.shape[0]
-    pairs = list(itertools.combinations([_ for _ in range(num_samples)], 2))
     # Create random choices for the pair of perturbation, w/o replacement
-    rand_choices = np.random.choice(len(pairs), num_exchanges, replace=False)
-    # Initialize the search
-    obj_func_current = np.inf
-    dm_current = dm.copy()
-    for i in rand_choices:
-        dm_try = dm.copy() # Always perturb from the design passed in argument
-        # Do column-wise operation in a given column 'num_dimension'
-        dm_try[pairs[i][0], num_dimension] = dm[pairs[i][1], num_dimension]
-        dm_try[pairs[i][1], num_dimension] = dm[pairs[i][0], num_dimension]
-        obj_func_try = obj_func(dm_try)
-        if obj_func_try < obj_func_current:
-            # Select the best trial from all the perturbation trials
-            obj_func_current = obj_func_try
-            dm_current = dm_try.copy()
-
-    return dm_current
+    rows = sample_pairs(obj_state.D.shape[0], num_exchanges)
+    # Evaluate all the trials, always perturbed from the current design
+    obj_func_try = obj_state.try_swaps(num_dimension, rows[:, 0], rows[:, 1])
+    # Select the best trial from all the perturbation trials
+    best = np.argmin(obj_func_try)
+
+    return (rows[best, 0], rows[best, 1]), obj_func_try[best], rows.shape[0]
 
 
 def adjust_threshold(threshold: float,
@@ -186,6 +229,77 @@ def adjust_threshold(threshold: float,
     return flag_explore, threshold
 
 
+def save_checkpoint(filename: str, state: dict):
+    """Save the state of an optimization to a checkpoint file
+
+    Together with the optimization variables, the state of the global random
+    number generator is saved so that the optimization can be resumed exactly.
+    The file is first written to a temporary file and then renamed, an
+    interruption while writing does not corrupt a previous checkpoint.
+
+    :param filename: the checkpoint filename (numpy `.npz` format)
+    :param state: the dictionary of the optimization variables
+    """
+    rng_state = np.random.get_state()
+    tmp_filename = "{}.tmp.npz" .format(filename)
+    np.savez(tmp_filename,
+             rng_keys=rng_state[1], rng_pos=rng_state[2],
+             rng_has_gauss=rng_state[3], rng_cached_gaussian=rng_state[4],
+             **state)
+    os.replace(tmp_filename, filename)
+
+
+def load_checkpoint(filename: str) -> dict:
+    """Load the state of an optimization from a checkpoint file
+
+    The state of the global random number generator is restored as well.
+
+    :param filename: the checkpoint filename
+    :return: the dictionary of the optimization variables
+    """
+    with np.load(filename) as data:
+        state = {key: data[key] for key in data.files}
+
+    np.random.set_state(("MT19937", state.pop("rng_keys"),
+                         int(state.pop("rng_pos")),
+                         int(state.pop("rng_has_gauss")),
+                         float(state.pop("rng_cached_gaussian"))))
+
+    return state
+
+
+class Telemetry:
+    """Record of the progress of an optimization, one record per outer iteration
+
+    An instance is passed as the `callback` of :func:`optimize`. The last
+    `maxlen` records are kept in memory (`records`), all of them are appended
+    to a comma-separated file if a filename is given.
+
+    :param maxlen: the maximum number of records kept in memory, None for all
+    :param filename: the file to append the records to, None for no file
+    """
+    FIELDS = ["outer", "obj_func", "obj_func_best", "threshold", "n_accepted",
+              "n_improved", "num_evaluations", "time", "elapsed_time"]
+
+    def __init__(self, maxlen: int = 1000, filename: str = None):
+        self.records = collections.deque(maxlen=maxlen)
+        self.filename = filename
+        if filename is not None and \
+                (not os.path.exists(filename) or os.path.getsize(filename) == 0):
+            with open(filename, "wt") as f:
+                f.write(",".join(self.FIELDS) + "\n")
+
+    def __call__(self, record: dict) -> bool:
+        """Add a record, never requests to stop the optimization"""
+        self.records.append(record)
+        if self.filename is not None:
+            with open(self.filename, "at") as f:
+                f.write(",".join(str(record[field])
+                                 for field in self.FIELDS) + "\n")
+
+        return False
+
+
 def optimize(dm_init: np.ndarray,
              obj_func_name: str,
              threshold_init: float,
@@ -193,9 +307,39 @@ def optimize(dm_init: np.ndarray,
              max_inner: int,
              max_outer: int,
              improving_params: list,
-             exploring_params: list):
+             exploring_params: list,
+             checkpoint: str = None,
+             checkpoint_every: int = 1,
+             callback=None,
+             max_time: float = None,
+             max_evaluations: int = None,
+             stall_outer: int = None,
+             stall_tol: float = 1e-6,
+             max_evol: int = None):
     """Optimize a given design using Enhanced Evolutionary Algorithm
 
+    If a checkpoint filename is given, the state of the optimization is saved
+    every `checkpoint_every` outer iterations and at the end. If the file
+    already exists, the optimization is resumed from the saved state (the
+    initial design passed is then ignored) and continues up to `max_outer`
+    outer iterations in total. The resumed optimization gives the same result
+    as an uninterrupted one. The stalling window and the wall time
+    (`max_time`, `elapsed_time`) continue from the saved ones.
+
+    After each outer iteration, `callback` (e.g., a :class:`Telemetry`) is
+    called with a dictionary of the objective function of the current and of
+    the best design, the threshold, the numbers of accepted and improved
+    trials, the number of objective function evaluations so far, and the wall
+    time of the iteration and of the optimization (see `Telemetry.FIELDS`).
+    The optimization stops if the callback returns True.
+
+    Besides `max_outer`, the optimization stops once the wall time
+    (`max_time`, in seconds) or the number of objective function evaluations
+    (`max_evaluations`, one per candidate exchange) is exceeded, or if the best
+    objective function has not improved by more than `stall_tol` (relative)
+    during the last `stall_outer` outer iterations. The stopping rules are
+    checked after each outer iteration.
+
     :param dm_init: the initial design matrix
     :param obj_func_name: the objective function used in the optimization
     :param threshold_init: the initial threshold, if equal or less than zero,
@@ -214,10 +358,20 @@ def optimize(dm_init: np.ndarray,
         (2) the cut-off value of acceptance to start decreasing the threshold
         (3) the cooling multiplier for the threshold
         (4) the warming multiplier for the threshold
+    :param checkpoint: the checkpoint filename (`.npz`), None for no checkpoint
+    :param checkpoint_every: the number of outer iterations between checkpoints
+    :param callback: the function called with the record of each outer iteration
+    :param max_time: the maximum wall time in seconds, None for no limit
+    :param max_evaluations: the maximum number of evaluations of the objective
+        function, None for no limit
+    :param stall_outer: the number of outer iterations without improvement to
+        stop the optimization, None for no limit
+    :param stall_tol: the relative improvement of the best objective function
+        below which there is no improvement
+    :param max_evol: the number of last accepted and best objective function
+        values kept in the evolution, None for all
     :return: a collection of obj_function evolution and best design
     """
-    import collections
-
     # Initialize output structure
     OptSolution = collections.namedtuple("OptSolution",
                                          "dm_init dm_best best_evol try_evol")
@@ -226,6 +380,7 @@ def optimize(dm_init: np.ndarray,
     n = dm_init.shape[0]     # number of samples
     k = dm_init.shape[1]     # number of dimension
     obj_function = pick_obj_function(obj_func_name)  # Choose objective function
+    obj_class = pick_obj_state(obj_func_name)        # with incremental update
     if threshold_init <= 0.0:
         threshold = init_threshold(dm_init, obj_function)   # Initial threshold
     else:
@@ -236,29 +391,68 @@ def optimize(dm_init: np.ndarray,
         max_inner = calc_max_inner(n, k)
 
     dm = dm_init.copy()                     # the current design
-    obj_func_best = obj_function(dm)        # the best value of obj.func. so far
-    obj_func_best_old = obj_function(dm)    # the old value of obj.func.
+    obj_state = obj_class(dm)               # the state of obj.func. of design
+    dm_best = dm.copy()                     # the best design so far
+    obj_func_best = obj_state.value         # the best value of obj.func. so far
+    obj_func_best_old = obj_state.value     # the old value of obj.func.
     flag_explore = False                    # improved flag
 
     best_evol = []                      # Keep track the best solution
     try_evol = []                       # Keep track the accepted trial solution
+    outer_start = 0                     # the first outer iteration
+    num_evaluations = 0                 # number of obj. func. evaluations
+    best_history = [obj_func_best]      # the best obj. func. per outer iter.
+    elapsed_time = 0.0                  # the wall time of previous runs
+
+    if checkpoint is not None and os.path.exists(checkpoint):
+        # Resume the optimization from the saved state
+        state = load_checkpoint(checkpoint)
+        dm_init = state["dm_init"]
+        dm = state["dm"]
+        obj_state = obj_class(dm)
+        dm_best = state["dm_best"]
+        obj_func_best = float(state["obj_func_best"])
+        obj_func_best_old = float(state["obj_func_best_old"])
+        threshold = float(state["threshold"])
+        flag_explore = bool(state["flag_explore"])
+        num_exchanges = int(state["num_exchanges"])
+        max_inner = int(state["max_inner"])
+        best_evol = state["best_evol"].tolist()
+        try_evol = state["try_evol"].tolist()
+        outer_start = int(state["outer"])
+        num_evaluations = int(state.get("num_evaluations", 0))
+        best_history = state.get("best_history",
+                                 np.array([obj_func_best])).tolist()
+        elapsed_time = float(state.get("elapsed_time", 0.0))
+
+    # Bounded evolution, keep only the last values
+    best_evol = collections.deque(best_evol, maxlen=max_evol)
+    try_evol = collections.deque(try_evol, maxlen=max_evol)
+    # The best objective function at the last outer iterations, for stalling
+    best_history = collections.deque(
+        best_history, maxlen=None if stall_outer is None else stall_outer+1)
+    # The wall time continues from the one of the resumed optimization
+    time_start = time.perf_counter() - elapsed_time
 
     # Begin Outer Iteration
-    for outer in range(max_outer):
+    for outer in range(outer_start, max_outer):
         # Initialization of Inner Iteration
         n_accepted = 0              # number of accepted trial
         n_improved = 0              # number of improved trial
+        time_outer = time.perf_counter()
 
         # Begin Inner Iteration
         for inner in range(max_inner):
-            obj_func = obj_function(dm)
+            obj_func = obj_state.value
             # Perturb current design
-            dm_try = perturb(dm, inner % k, num_exchanges, obj_function)
-            obj_func_try = obj_function(dm_try)
+            col = inner % k
+            pair, obj_func_try, num_evaluated = perturb(obj_state, col,
+                                                        num_exchanges)
+            num_evaluations += num_evaluated
             # Check whether solution is acceptable
             if (obj_func_try - obj_func) <= threshold * np.random.rand():
-                # Accept solution
-                dm = dm_try.copy()
+                # Accept solution, exchange the elements in the current design
+                obj_func_try = obj_state.swap(col, *pair)
                 n_accepted += 1
                 try_evol.append(obj_func_try)
                 if obj_func_try < obj_func_best:
@@ -268,6 +462,9 @@ def optimize(dm_init: np.ndarray,
                     best_evol.append(obj_func_best)
                     n_improved += 1
 
+        # Remove the round-off errors accumulated by the incremental update
+        obj_state.refresh()
+
         # Accept/Reject as Best Solution for convergence checking
         if ((obj_func_best_old - obj_func_best)/obj_func_best) > 1e-6:
             # Improvement found
@@ -286,7 +483,53 @@ def optimize(dm_init: np.ndarray,
                                                    improving_params,
                                                    exploring_params)
 
+        # Report the progress and check the stopping rules
+        time_now = time.perf_counter()
+        stop = False
+        if callback is not None:
+            stop = bool(callback({"outer": outer + 1,
+                                  "obj_func": obj_state.value,
+                                  "obj_func_best": obj_func_best,
+                                  "threshold": threshold,
+                                  "n_accepted": n_accepted,
+                                  "n_improved": n_improved,
+                                  "num_evaluations": num_evaluations,
+                                  "time": time_now - time_outer,
+                                  "elapsed_time": time_now - time_start}))
+        if max_time is not None and time_now - time_start >= max_time:
+            stop = True
+        if max_evaluations is not None and num_evaluations >= max_evaluations:
+            stop = True
+        best_history.append(obj_func_best)
+        if stall_outer is not None and len(best_history) > stall_outer:
+            # Relative improvement, guarded against a zero objective
+            scale = max(abs(obj_func_best), np.finfo(float).tiny)
+            if (best_history[0] - obj_func_best) / scale <= stall_tol:
+                stop = True
+
+        if checkpoint is not None and \
+                ((outer + 1) % checkpoint_every == 0 or
+                 outer + 1 == max_outer or stop):
+            save_checkpoint(checkpoint,
+                            {"dm_init": dm_init, "dm": dm, "dm_best": dm_best,
+                             "obj_func_best": obj_func_best,
+                             "obj_func_best_old": obj_func_best_old,
+                             "threshold": threshold,
+                             "flag_explore": flag_explore,
+                             "num_exchanges": num_exchanges,
+                             "max_inner": max_inner,
+                             "best_evol": list(best_evol),
+                             "try_evol": list(try_evol),
+                             "num_evaluations": num_evaluations,
+                             "best_history": list(best_history),
+                             "elapsed_time": time_now - time_start,
+                             "outer": outer + 1})
+
+        if stop:
+            break
+
     output = OptSolution(dm_init = dm_init, dm_best = dm_best,
-                         best_evol = best_evol, try_evol = try_evol)
+                         best_evol = list(best_evol),
+                         try_evol = list(try_evol))
 
     return output
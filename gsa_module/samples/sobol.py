@@ -57,12 +57,20 @@ included direction number files in "./dirnumfiles/new-joe-kuo-6.21201"::
     dimensional projections," SIAM Journal of Scientific Computing,
     vol. 30, pp. 2635-2654 (2008).
 """
+import os
 import numpy as np
 
 __author__ = "Damar Wicaksono"
 
+# The built-in direction numbers file
+DIRNUMFILE = os.path.join(os.path.dirname(__file__),
+                          "dirnumfiles", "new-joe-kuo-6.21201")
 
-def read_dirnumfile(dirnumfile: str, d: int) -> np.ndarray:
+# The direction number tables already loaded, keyed by the cache identifier
+_direction_tables = dict()
+
+
+def read_dirnumfile(dirnumfile: str, d: int = None) -> np.ndarray:
     r"""Parser to read direction number file provided by Joe & Kuo
 
     The parser read direction number file to get parameters "s", "a", and
@@ -82,156 +90,514 @@ def read_dirnumfile(dirnumfile: str, d: int) -> np.ndarray:
     with dimension 2. Dimension 1 is irrelevant as it can be generated without
     direction number. The first column is just the dimension number
 
+    The file is read line by line, only up to the requested dimension, and the
+    output array is allocated once the largest "s" is known.
+
     :param dirnumfile: the fullname of the text file containing dir. number
-    :param d: the requested dimension number, >= 2
+    :param d: the requested dimension number, >= 2. If None, read all the
+        dimensions available in the file
     :return: structured array with columns correspond to params s, a, and m_i
     """
-    # Prepare the output (d, s, a, m_i)
-    dirnum = np.zeros(d-1,
-                      dtype=[("s", "uint32"),
-                             ("a", "uint32"),
-                             ("m", "(1,)uint32")])
-
     # Open and read the file
-    i = 0
-    j = 0
+    lines = []
     with open(dirnumfile, "rt") as f:
-        lines = f.readlines()
-        while j < d-1:
-            if lines[i].startswith(("#", "d")):
+        for line in f:
+            if d is not None and len(lines) >= d-1:
+                break
+            if line.startswith(("#", "d")) or not line.strip():
                 # Ignore copyright lines and header
-                i += 1
-            else:
-                line = list(map(int, lines[i].strip().split()))
-                for k in range(2):
-                    dirnum[j][k] = line[k + 1]
-                # recast the structured array to add more m_i values
-                dirnum = dirnum.astype(
-                    [("s", "uint32"),
-                     ("a", "uint32"),
-                     ("m", "({},)uint32" .format(line[1]))])
-                for k in range(line[1]):
-                    dirnum[j][2][k] = line[k + 3]
-                i += 1
-                j += 1
+                continue
+            lines.append(list(map(int, line.split())))
+
+    # Prepare the output (d, s, a, m_i)
+    s_max = max([line[1] for line in lines], default=1)
+    dirnum = np.zeros(len(lines),
+                      dtype=[("s", "uint32"),
+                             ("a", "uint32"),
+                             ("m", "({},)uint32" .format(s_max))])
+    for j, line in enumerate(lines):
+        dirnum["s"][j] = line[1]
+        dirnum["a"][j] = line[2]
+        dirnum["m"][j, :line[1]] = line[3:3+line[1]]
 
     return dirnum
 
 
+def load_direction_table(dirnumfile: str = None,
+                         cache_dir: str = None,
+                         bits: int = 32) -> np.ndarray:
+    """Load the expanded direction numbers of all dimensions in a file
+
+    Parsing the direction numbers file and expanding the direction numbers by
+    recurrence is done only once per file. The resulting table is cached as a
+    binary `.npy` file and subsequently opened as a memory-mapped array, so
+    that only the rows of the requested dimensions are actually read.
+
+    The cache file is identified by the full path, the size, and the
+    modification time of the direction numbers file; a modified or a different
+    (custom) file gets its own cache file.
+    The cache directory is taken from, in order of precedence, `cache_dir`,
+    the environment variable `GSA_MODULE_CACHE`, and `~/.cache/gsa_module`.
+    If the cache cannot be written, the table is kept in memory only.
+
+    :param dirnumfile: the fullname of the direction numbers file, by default
+        the built-in "new-joe-kuo-6.21201"
+    :param cache_dir: the directory to store the cached table
+    :param bits: the number of bits of the direction numbers, 32 or 64
+    :return: (D, bits) array of direction numbers V[1] to V[bits] scaled by
+        2**bits, D is the number of dimensions available in the file
+    """
+    import hashlib
+    import tempfile
+
+    if dirnumfile is None:
+        dirnumfile = DIRNUMFILE
+    dirnumfile = os.path.abspath(dirnumfile)
+
+    # Key of the cache, changes if the file is replaced or modified
+    stat = os.stat(dirnumfile)
+    key = hashlib.sha1("{}|{}|{}|{}" .format(dirnumfile, stat.st_size,
+                                             stat.st_mtime_ns,
+                                             bits).encode()).hexdigest()
+    if key in _direction_tables:
+        return _direction_tables[key]
+
+    if cache_dir is None:
+        cache_dir = os.environ.get(
+            "GSA_MODULE_CACHE",
+            os.path.join(os.path.expanduser("~"), ".cache", "gsa_module"))
+    cache_file = os.path.join(cache_dir, "dirnum_{}.npy" .format(key[:16]))
+
+    try:
+        table = np.load(cache_file, mmap_mode="r")
+    except (OSError, ValueError):
+        # Build the table from the text file
+        dirnum = read_dirnumfile(dirnumfile)
+        table = direction_numbers(dirnum, dirnum.shape[0] + 1, bits,
+                                  bits=bits)[:, 1:]
+        try:
+            # Write to a temporary file first to be safe against concurrency
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_file = tempfile.mkstemp(suffix=".npy", dir=cache_dir)
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, table)
+            os.replace(tmp_file, cache_file)
+            table = np.load(cache_file, mmap_mode="r")
+        except OSError:
+            pass
+
+    _direction_tables[key] = table
+
+    return table
+
+
 def create(n: int, d: int,
-           dirnum: np.ndarray = None,
+           dirnum=None,
            excl_nom: bool = False,
            randomize: bool = False,
-           seed: int = None) -> np.ndarray:
+           seed: int = None,
+           bits: int = 32,
+           columns: tuple = None,
+           n_jobs: int = 1) -> np.ndarray:
     r"""Sobol points generator based on graycode order
 
-    This implementation is a verbatim copy of a C++ source code by Joe and Kuo.
+    This implementation follows the C++ source code by Joe and Kuo, but the
+    loop over the samples is vectorized. The index of the direction number used
+    at every step of the graycode is computed for all samples at once and each
+    column of the design is obtained as a cumulative XOR of these direction
+    numbers. The output is identical to the original scalar implementation.
     See the module header for complete copyright and references.
 
-    :param n: Number of samples (cannot be greater than 2**32)
+    The points are drawn from a fresh :class:`SobolEngine`, use the engine
+    directly to generate the sequence in blocks or to extend an existing design.
+
+    :param n: Number of samples (cannot be greater than 2**bits)
     :param d: Number of dimensions
-    :param dirnum: the parameters from direction numbers file ("s", "a", "m")
+    :param dirnum: the parameters from direction numbers file ("s", "a", "m"),
+        or the fullname of a direction numbers file (see :class:`SobolEngine`)
     :param excl_nom: flag to exclude nominal value
     :param randomize: Randomize Sobol' sequence by random shifting
     :param seed: seed number for random shifting randomization
+    :param bits: the number of bits of the generator, 32 (default) or 64
+    :param columns: the range (j0, j1) of columns of the d-dimensional design
+        to generate, by default all the columns. The generated columns are
+        identical to the same columns of the full design
+    :param n_jobs: the number of worker processes to generate the columns,
+        -1 means using all processors (default: 1, no parallelization)
     :return: 2-dimensional design matrix of quasi-random Sobol' sequence
     """
-    import math
-    import os
-
-    # Use default value for direction number file
-    if dirnum is None:
-        dirnum = read_dirnumfile(os.path.join(os.path.dirname(__file__),
-                                 "./dirnumfiles/new-joe-kuo-6.21201"), d)
-
     if excl_nom:
         # Add additional point if {0.5} is to be excluded
         n += 1
 
     # Check if requested number of samples is too large
-    if n > 2**32:
-        raise ValueError("Number of samples too large (>2**32)!")
-
-    # Check if dirnum is in accordance with the requested dimension
-    if d > dirnum.shape[0] + 1:
-        raise ValueError("More dimension is asked than the available data!")
-
-    # Copy dirnum structured array to local variable
-    s = dirnum["s"]
-    a = dirnum["a"]
-    m = dirnum["m"]
-
-    # L = Maximum number of bits needed
-    L = math.ceil(math.log(float(n))/math.log(2.0))
-
-    # C[i] = index from the right of the first zero bit of i (samples)
-    C = np.empty(n, dtype=np.uint32)
-    C[0] = 1
-    for i in range(1, n):
-        C[i] = 1
-        value = i
-        while value & 1:
-            value >>= 1  # (bitwise) right-shift value by 1
-            C[i] += 1
+    if n > 2**bits:
+        raise ValueError("Number of samples too large (>2**{})!" .format(bits))
 
     # POINTS[i][j] = the jth component of the ith point with the i indexed from
     #                zero to n-1 and j indexed from 0 to d-1
-    # Initialize
-    POINTS = np.empty([n,d], dtype=np.float64)
-    # First sample is zero
-    POINTS[0,:] = 0
+    # Randomization draws the same shift as random_shift() would do
+    engine = SobolEngine(d, dirnum, randomize=randomize and n > 1, seed=seed,
+                         bits=bits, columns=columns)
+    POINTS = engine.draw(n, n_jobs=n_jobs)
 
     if n > 1:
 
-        # ----- Compute the first dimension -----
-
-        # Compute direction numbers V[1] to V[L], scaled by 2**32
-        V = np.empty(L+1, dtype=np.uint32)
-        for i in range(1, L+1):
-            V[i] = 1 << (32 - i)    # (bitwise) left-shift value by 31
-
-        # Evaluate X[0] to X[n-1], scaled by 2**32, the values of
-        # first dimension from i = 1 to i = n-1
-        X = np.empty(n, dtype=np.uint32)
-        X[0] = 0
-        for i in range(1, n):
-            X[i] = X[i-1] ^ V[C[i-1]]
-            POINTS[i,0] = np.float64(X[i]/2.0**32)
-
-        # ----- Compute the remaining dimension -----
-        for j in range(1, d):
-            # Outer: loop over dimensions
-
-            # Compute direction numbers V[1] to V[L], scaled by 2**32
-            V = np.empty(L+1, dtype=np.uint32)
-            if L <= s[j-1]:
-                for i in range(1, L+1):
-                    V[i] = m[j-1,i-1] << (32 - i)
-            else:
-                for i in range(1, s[j-1]+1):
-                    V[i] = m[j-1,i-1] << (32 - i)
-                for i in range(s[j-1]+1, L+1):
-                    V[i] = V[i - s[j-1]] ^ (V[i - s[j-1]] >> s[j-1])
-                    for k in range(1, s[j-1]):
-                        V[i] ^= (((a[j-1] >> s[j-1] - 1 - k) & 1) * V[i-k])
-
-            # Evaluate X[0] to X[N-1], scaled by 2**32
-            X = np.empty(n, dtype=np.uint32)
-            X[0] = 0
-            for i in range(1, n):
-                # Inner: loop over samples
-                X[i] = X[i - 1] ^ V[C[i - 1]]
-                POINTS[i,j] = np.float64(X[i]/2.0**32)
-
         if excl_nom:
             # Remove the second as it was only the "nominal" set of parameters
             POINTS = np.delete(POINTS, 1, 0)
 
-        # Randomize the design if requested
+    return POINTS
+
+
+class SobolEngine:
+    """Stateful Sobol' sequence generator based on graycode order
+
+    The engine keeps the graycode state (the index and the scaled integer
+    values of the next point) so that the sequence can be generated in blocks
+    of bounded size, skipped forward, or extended without regenerating the
+    points already drawn. Drawing the points in several blocks gives exactly
+    the same points as drawing them at once with :func:`create`.
+
+    Usage::
+
+        engine = SobolEngine(d=10)
+        block_1 = engine.draw(1024)     # points 0 to 1023
+        block_2 = engine.draw(1024)     # points 1024 to 2047
+        engine.reset().fast_forward(1024)
+        block_2 = engine.draw(1024)     # points 1024 to 2047, again
+
+    The 64-bit generator uses 64-bit direction numbers and gives the points
+    with the full 53-bit resolution of double precision floating point. It
+    can generate up to 2**64 points and its first 2**32 points are identical
+    to the ones of the 32-bit generator.
+
+    The engine can be restricted to a range of `columns` of the d-dimensional
+    sequence, e.g., to split the generation of a large design across nodes.
+
+    :param d: Number of dimensions
+    :param dirnum: the parameters from direction numbers file ("s", "a", "m"),
+        or the fullname of a direction numbers file. By default, the cached
+        table of the built-in "new-joe-kuo-6.21201" is used
+    :param randomize: Randomize Sobol' sequence by random shifting, the same
+        shift is applied to all the drawn points
+    :param seed: seed number for random shifting randomization
+    :param bits: the number of bits of the generator, 32 (default) or 64
+    :param columns: the range (j0, j1) of the columns to generate, by default
+        all the d columns
+    """
+    def __init__(self, d: int,
+                 dirnum=None,
+                 randomize: bool = False,
+                 seed: int = None,
+                 bits: int = 32,
+                 columns: tuple = None):
+        if bits == 32:
+            self._dtype = np.uint32
+        elif bits == 64:
+            self._dtype = np.uint64
+        else:
+            raise ValueError("Only 32- or 64-bit generator is supported!")
+
+        # The maximum number of bits, i.e., at most 2**bits points
+        self.max_bits = bits
+
+        if dirnum is None or isinstance(dirnum, str):
+            # Use the cached direction numbers table (default or custom file)
+            table = load_direction_table(dirnum, bits=bits)
+            num_dims = table.shape[0]
+        else:
+            num_dims = dirnum.shape[0] + 1
+
+        # Check if dirnum is in accordance with the requested dimension
+        if d > num_dims:
+            raise ValueError("More dimension is asked than the available data!")
+
+        # Check the requested range of columns
+        if columns is None:
+            j0, j1 = 0, d
+        else:
+            j0, j1 = columns
+            if not 0 <= j0 <= j1 <= d:
+                raise ValueError("Column range must be within [0, d]!")
+
+        self.d = j1 - j0
+
+        # Direction numbers V[j, 1] to V[j, bits] of the requested columns
+        if dirnum is None or isinstance(dirnum, str):
+            self._v = np.zeros([self.d, bits+1], dtype=self._dtype)
+            self._v[:, 1:] = table[j0:j1]
+        else:
+            self._v = direction_numbers(dirnum, j1, bits, bits=bits)[j0:j1]
+
+        # Random shift, identical to the one drawn by random_shift()
         if randomize:
-            return random_shift(POINTS, seed)
+            if seed is not None:
+                np.random.seed(seed)
+            self._shift = np.random.rand(d)[j0:j1]
+        else:
+            self._shift = None
+
+        self.reset()
+
+    def reset(self):
+        """Reset the engine to the first point of the sequence
+
+        :return: the engine itself
+        """
+        self.num_generated = 0
+        self._x = np.zeros(self.d, dtype=self._dtype)
+
+        return self
+
+    def fast_forward(self, k: int):
+        """Skip the next `k` points of the sequence without generating them
+
+        The state at the new index is computed directly from its graycode,
+        i.e., the cost does not depend on `k`.
+
+        :param k: the number of points to skip
+        :return: the engine itself
+        """
+        if k < 0:
+            raise ValueError("Cannot fast forward a negative number of points!")
+
+        index = self.num_generated + k
+        if index > 2**self.max_bits:
+            raise ValueError("Number of samples too large (>2**{})!"
+                             .format(self.max_bits))
+
+        # X[index] is the XOR of V[b+1] for all bits b set in the graycode
+        graycode = index ^ (index >> 1)
+        x = np.zeros(self.d, dtype=self._dtype)
+        for b in range(self.max_bits):
+            if (graycode >> b) & 1:
+                x ^= self._v[:, b+1]
+
+        self._x = x
+        self.num_generated = index
+
+        return self
+
+    def draw(self, m: int, n_jobs: int = 1) -> np.ndarray:
+        """Draw the next `m` points of the sequence
+
+        The columns are independent of each other given their direction
+        numbers. With `n_jobs` other than 1, blocks of columns are generated
+        by worker processes directly into a shared memory buffer.
+
+        :param m: the number of points to draw
+        :param n_jobs: the number of worker processes to generate the columns,
+            -1 means using all processors (default: 1, no parallelization)
+        :return: m-by-d design matrix of quasi-random Sobol' sequence
+        """
+        if m < 0:
+            raise ValueError("Cannot draw a negative number of points!")
+
+        i0 = self.num_generated
+        if i0 + m > 2**self.max_bits:
+            raise ValueError("Number of samples too large (>2**{})!"
+                             .format(self.max_bits))
+
+        if m == 0:
+            return np.empty([m, self.d], dtype=np.float64)
+
+        if n_jobs is None or n_jobs == 0:
+            n_jobs = 1
+        elif n_jobs < 0:
+            n_jobs = os.cpu_count()
+        n_jobs = min(n_jobs, self.d)
+
+        if n_jobs > 1:
+            points, self._x = _draw_columns_parallel(self._x, self._v, i0, m,
+                                                     n_jobs)
+        else:
+            points = np.empty([m, self.d], dtype=np.float64)
+            self._x = _draw_columns(points, self._x, self._v, i0)
+
+        self.num_generated = i0 + m
+
+        # Randomize the points if requested
+        if self._shift is not None:
+            points += self._shift
+            points %= 1
+
+        return points
+
+
+def _draw_columns(points: np.ndarray,
+                  x0: np.ndarray,
+                  v: np.ndarray,
+                  i0: int) -> np.ndarray:
+    """Generate the points of a block of columns of the Sobol' sequence
+
+    :param points: m-by-d output array, filled in place
+    :param x0: the scaled integer values of point i0 of the d columns
+    :param v: (d, bits+1) direction numbers of the d columns
+    :param i0: the index of the first point to generate
+    :return: the scaled integer values of point i0+m, i.e., the new state
+    """
+    m = points.shape[0]
+    bits = v.dtype.itemsize * 8
 
-    return POINTS
+    # C[i] = index from the right of the first zero bit of i (samples)
+    c = graycode_index(m, start=i0)
+    # The state after the last point (not needed at the end of sequence)
+    has_next = i0 + m < 2**bits
+
+    x_next = x0.copy()
+    x = np.empty(m, dtype=v.dtype)
+    for j in range(points.shape[1]):
+        # Evaluate X[i0] to X[i0+m-1], scaled by 2**bits, as the cumulative
+        # XOR of the direction numbers selected by the graycode
+        x[0] = x0[j]
+        x[1:] = v[j, c[:-1]]
+        np.bitwise_xor.accumulate(x, out=x)
+        if bits == 32:
+            points[:, j] = x / 2.0**32
+        else:
+            # Keep the 53 leading bits, exactly representable as float
+            points[:, j] = (x >> np.uint64(11)) * 2.0**-53
+        if has_next:
+            x_next[j] = x[-1] ^ v[j, c[-1]]
+
+    return x_next
+
+
+def _draw_columns_worker(shm_name: str, shape: tuple,
+                         j0: int, j1: int,
+                         x0: np.ndarray,
+                         v: np.ndarray,
+                         i0: int) -> np.ndarray:
+    """Generate columns j0 to j1-1 into a shared memory design matrix
+
+    :param shm_name: the name of the shared memory block of the design matrix
+    :param shape: the shape (m, d) of the whole design matrix
+    :param j0: the first column to generate
+    :param j1: the last column to generate (exclusive)
+    :param x0: the scaled integer values of point i0 of the columns
+    :param v: direction numbers of the columns
+    :param i0: the index of the first point to generate
+    :return: the scaled integer values of point i0+m of the columns
+    """
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        points = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        x_next = _draw_columns(points[:, j0:j1], x0, v, i0)
+        del points
+    finally:
+        shm.close()
+
+    return x_next
+
+
+def _draw_columns_parallel(x0: np.ndarray,
+                           v: np.ndarray,
+                           i0: int,
+                           m: int,
+                           n_jobs: int) -> tuple:
+    """Generate the points of the Sobol' sequence by blocks of columns
+
+    Each worker process writes its block of columns directly into a shared
+    memory buffer, only the (small) states and direction numbers are passed
+    between the processes.
+
+    :param x0: the scaled integer values of point i0 of all columns
+    :param v: (d, bits+1) direction numbers of all columns
+    :param i0: the index of the first point to generate
+    :param m: the number of points to generate
+    :param n_jobs: the number of worker processes
+    :return: a tuple of the m-by-d design matrix and the scaled integer
+        values of point i0+m of all columns, i.e., the new state
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    d = v.shape[0]
+    shape = (m, d)
+    bounds = np.linspace(0, d, n_jobs + 1).astype(int)
+    x_next = x0.copy()
+
+    shm = shared_memory.SharedMemory(create=True, size=m * d * 8)
+    try:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [executor.submit(_draw_columns_worker, shm.name, shape,
+                                       j0, j1, x0[j0:j1], v[j0:j1], i0)
+                       for j0, j1 in zip(bounds[:-1], bounds[1:])]
+            for (j0, j1), future in zip(zip(bounds[:-1], bounds[1:]),
+                                        futures):
+                x_next[j0:j1] = future.result()
+        points = np.ndarray(shape, dtype=np.float64, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return points, x_next
+
+
+def graycode_index(n: int, start: int = 0) -> np.ndarray:
+    """Compute the index of the first zero bit (from the right) of a range
+
+    The index, starting from 1, selects the direction number to be XOR-ed
+    when going from the i-th to the (i+1)-th point in graycode order.
+    The lowest zero bit of `i` is isolated as `~i & (i+1)`, a power of two,
+    whose binary exponent is exactly the requested index.
+
+    :param n: the number of indices to compute
+    :param start: the first integer of the range
+    :return: numpy array of length n with the 1-based index of the first zero
+        bit of start, start+1, ..., start+n-1
+    """
+    i = np.arange(start, start + n, dtype=np.uint64)
+    lowest_zero_bit = ~i & (i + np.uint64(1))
+
+    # frexp returns exponent e such that 2**p = 0.5 * 2**e, i.e., e = p + 1
+    return np.frexp(lowest_zero_bit.astype(np.float64))[1]
+
+
+def direction_numbers(dirnum: np.ndarray, d: int, L: int,
+                      bits: int = 32) -> np.ndarray:
+    """Compute the direction numbers V[1] to V[L] for the first d dimensions
+
+    The first dimension does not require the parameters from the direction
+    numbers file, the rest is computed from the primitive polynomial
+    parameters ("s", "a") and the initial values ("m") by recurrence.
+    The recurrence is carried out simultaneously for all the dimensions
+    sharing the same degree "s".
+
+    :param dirnum: the parameters from direction numbers file ("s", "a", "m")
+    :param d: Number of dimensions
+    :param L: Maximum number of bits needed
+    :param bits: the number of bits of the direction numbers, 32 or 64
+    :return: (d, L+1) array of direction numbers scaled by 2**bits, the first
+        column is unused so that V[j, i] corresponds to V[i] of dimension j
+    """
+    dtype = np.uint32 if bits == 32 else np.uint64
+    V = np.zeros([d, L+1], dtype=dtype)
+
+    # ----- Compute the first dimension -----
+    for i in range(1, L+1):
+        V[0, i] = 1 << (bits - i)    # (bitwise) left-shift value by 31
+
+    # ----- Compute the remaining dimension -----
+    s_all = dirnum["s"][:d-1]
+    for s in np.unique(s_all):
+        s = int(s)
+        rows = np.nonzero(s_all == s)[0]
+        a = dirnum["a"][rows].astype(dtype)
+        m = dirnum["m"][rows].astype(dtype)
+        v = np.zeros([rows.shape[0], L+1], dtype=dtype)
+        for i in range(1, min(L, s)+1):
+            v[:, i] = m[:, i-1] << dtype(bits - i)
+        for i in range(s+1, L+1):
+            v[:, i] = v[:, i - s] ^ (v[:, i - s] >> dtype(s))
+            for k in range(1, s):
+                v[:, i] ^= ((a >> dtype(s - 1 - k)) & dtype(1)) * v[:, i-k]
+        V[rows + 1, :] = v
+
+    return V
 
 
 def random_shift(dm: np.ndarray, seed: int) -> np.ndarray:
@@ -253,8 +619,153 @@ def random_shift(dm: np.ndarray, seed: int) -> np.ndarray:
     if seed is not None:
         np.random.seed(seed)
 
-    # Generate random shift matrix from uniform distribution
-    shift = np.repeat(np.random.rand(1, dm.shape[1]), dm.shape[0], axis=0)
+    # Generate random shift vector from uniform distribution
+    shift = np.random.rand(1, dm.shape[1])
 
-    # Return the shifted Sobol' design
+    # Return the shifted Sobol' design, the shift is broadcast over the rows
     return (dm + shift) % 1
+
+
+def scramble(dm: np.ndarray,
+             method: str = "owen",
+             num_replicates: int = 1,
+             seed: int = None) -> np.ndarray:
+    """Randomize a given Sobol' design by scrambling its binary digits
+
+    Contrary to random shifting, scrambling preserves the digital net
+    property of the Sobol' sequence (e.g., the stratification of the first
+    2**m points). Two scrambling methods are available:
+
+    1. "owen", nested uniform scrambling [1]: the i-th bit of a coordinate is
+       flipped at random depending on all the preceding bits of that
+       coordinate, i.e., each node of the binary tree of elementary intervals
+       has its own random flip.
+    2. "lms", linear matrix scrambling with digital shift [2]: the digits of
+       each coordinate are multiplied by a random non-singular lower triangular
+       binary matrix and shifted by a random digit vector (modulo 2).
+
+    `num_replicates` independently scrambled copies of the design are
+    generated in one call. The spread of an estimate across the replicates
+    can be used to estimate its quasi-MC error [3].
+
+    **References:**
+
+    (1) A. B. Owen, "Randomly Permuted (t,m,s)-Nets and (t,s)-Sequences,"
+        in Monte Carlo and Quasi-Monte Carlo Methods in Scientific Computing,
+        Lecture Notes in Statistics 106, Springer, pp. 299-317, 1995
+    (2) J. Matousek, "On the L2-discrepancy for anchored boxes," Journal of
+        Complexity, vol. 14, pp. 527-556, 1998
+    (3) C. Lemieux, "Monte Carlo and Quasi-Monte Carlo Sampling," Springer
+        Series in Statistics 692, Springer Science+Business Media, New York,
+        2009
+
+    :param dm: Original (unrandomized) Sobol' design matrix, n-by-d
+    :param method: the scrambling method, "owen" or "lms"
+    :param num_replicates: the number of independently scrambled replicates
+    :param seed: seed number for randomization
+    :returns: the scrambled Sobol' designs, num_replicates-by-n-by-d
+    """
+    if seed is not None:
+        np.random.seed(seed)
+
+    if num_replicates < 1:
+        raise ValueError("Number of replicates must be > 0!")
+
+    # The points of the sequence are integers scaled by 2**-32
+    x = (dm * 2.0**32).astype(np.uint64).astype(np.uint32)
+
+    if method == "owen":
+        y = _owen_scramble(x, num_replicates)
+    elif method == "lms":
+        y = _linear_matrix_scramble(x, num_replicates)
+    else:
+        raise ValueError("Scrambling method not supported!")
+
+    return y / 2.0**32
+
+
+def _random_bits(size) -> np.ndarray:
+    """Draw random 32-bit unsigned integers"""
+    return np.random.randint(0, 2**32, size=size, dtype=np.uint32)
+
+
+def _owen_scramble(x: np.ndarray, num_replicates: int) -> np.ndarray:
+    """Apply nested uniform scrambling to integer coordinates
+
+    The coordinates in a given dimension are sorted once, such that the points
+    sharing the same leading bits (the same node in the binary tree) are
+    contiguous. A random flip is then drawn per node and per replicate.
+    Once all the points are separated, the remaining bits are flipped at once.
+
+    :param x: the coordinates scaled by 2**32, n-by-d
+    :param num_replicates: the number of independently scrambled replicates
+    :return: the scrambled coordinates, num_replicates-by-n-by-d
+    """
+    n, d = x.shape
+    y = np.empty([num_replicates, n, d], dtype=np.uint32)
+
+    for j in range(d):
+        order = np.argsort(x[:, j], kind="stable")
+        xs = x[order, j]
+
+        flips = np.zeros([num_replicates, n], dtype=np.uint32)
+        is_new_node = np.empty(n, dtype=bool)
+        is_new_node[0] = True
+        for k in range(32):
+            # Nodes at level k are identified by the k leading bits
+            if k == 0:
+                is_new_node[1:] = False
+            else:
+                prefix = xs >> np.uint32(32 - k)
+                is_new_node[1:] = prefix[1:] != prefix[:-1]
+            node = np.cumsum(is_new_node) - 1
+            if node[-1] + 1 == n:
+                # Every point is in its own node, the remaining bits of all
+                # points are flipped independently
+                flips ^= _random_bits([num_replicates, n]) & \
+                    np.uint32((1 << (32 - k)) - 1)
+                break
+            node_flips = np.random.randint(0, 2, size=[num_replicates,
+                                                       node[-1] + 1],
+                                           dtype=np.uint32)
+            flips ^= node_flips[:, node] << np.uint32(31 - k)
+
+        y[:, order, j] = xs ^ flips
+
+    return y
+
+
+def _linear_matrix_scramble(x: np.ndarray, num_replicates: int) -> np.ndarray:
+    """Apply linear matrix scrambling and digital shift to integer coordinates
+
+    The product of the binary matrix and the digits is a XOR of the matrix
+    columns selected by the digits. The XOR of all possible selections within
+    each byte are tabulated, so that the product requires four table lookups.
+
+    :param x: the coordinates scaled by 2**32, n-by-d
+    :param num_replicates: the number of independently scrambled replicates
+    :return: the scrambled coordinates, num_replicates-by-n-by-d
+    """
+    n, d = x.shape
+
+    # Columns of the lower triangular matrices with unit diagonal, the l-th
+    # column (from the most significant bit) has random bits below bit l
+    diag = np.uint32(1) << np.arange(31, -1, -1, dtype=np.uint32)
+    cols = diag | (_random_bits([num_replicates, d, 32]) & (diag - 1))
+    shift = _random_bits([num_replicates, 1, d])
+
+    # Tables of the XOR of the columns for all the values of each byte
+    tables = np.zeros([num_replicates, d, 4, 256], dtype=np.uint32)
+    for p in range(4):
+        for t in range(8):
+            size = 1 << t
+            tables[:, :, p, size:2*size] = \
+                tables[:, :, p, :size] ^ cols[:, :, 8*p + 7 - t, np.newaxis]
+
+    y = np.repeat(shift, n, axis=1)
+    dims = np.arange(d)[np.newaxis, :]
+    for p in range(4):
+        byte = (x >> np.uint32(24 - 8*p)) & np.uint32(255)
+        y ^= tables[:, dims, p, byte]
+
+    return y
@@ -10,7 +10,9 @@ __author__ = "Damar Wicaksono"
 def create_sequential(dm: np.ndarray,
                       num_tests: int,
                       num_candidates: int,
-                      obj_function: str = "w2_discrepancy"):
+                      obj_function: str = "w2_discrepancy",
+                      batch_size: int = 1,
+                      lazy: bool = True):
     """Generate sequential validation data set for GP metamodel validation
 
         Below is the implementation of the GP validation process proposed in (1)
@@ -33,6 +35,19 @@ def create_sequential(dm: np.ndarray,
         new design and decide whether to accept the new point as validation
         point. Accept the
 
+        The candidates are scored incrementally (see
+        `opt_alg.objective_functions.CandidateScores`), adding a point
+        to the design only adds its terms with the other points. All the
+        candidates are scored at once in O(C) and the scores are updated in
+        O(C*k) after each validation point, C being the number of candidates.
+        An objective function registered without incremental scoring is
+        evaluated for each augmented design.
+
+        By default, the candidates are selected lazily (see
+        :func:`select_lazy_greedy`), only the best candidates are rescored.
+        Several validation points can be selected at once (`batch_size`), they
+        are the best candidates for the design of the previous rounds.
+
     **References**
 
     (1) B. Iooss, L. Boussouf, V. Feuillard, and A. Marrel, "Numerical studies
@@ -43,44 +58,167 @@ def create_sequential(dm: np.ndarray,
     :param dm: the original design matrix
     :param num_tests: the number of requested validation points
     :param num_candidates: the number of candidates from the Hammersley sequence
-    :param obj_function: the objective function or the discrepancy measure used
+    :param obj_function: the objective function or the discrepancy measure used,
+        any of the objective functions to optimize LHS, see
+        `opt_alg.objective_functions.OBJECTIVE_FUNCTIONS`
+    :param batch_size: the number of validation points selected per round
+    :param lazy: flag to select the candidates lazily, otherwise all the
+        candidates are rescored after each round
     :returns: the validation data set of size `num_points`
     """
     from . import hammersley
     from . import opt_alg
 
+    if batch_size < 1:
+        raise ValueError("Batch size must be at least 1!")
+    if num_tests > num_candidates:
+        raise ValueError("Number of validation points ({}) larger than the"
+                         " number of candidates ({})!"
+                         .format(num_tests, num_candidates))
+
     # Initialization
     d = dm.shape[1]     # the number of dimension
     # create large number of test point candidates from Hammersley sequence
     candidates = hammersley.create(num_candidates, d)
-    train_data = dm.copy()
-    valid_data = np.empty((0, d))
 
-    if obj_function == "w2_discrepancy":
-        obj_func = opt_alg.objective_functions.w2_discrepancy_fast
+    if obj_function in opt_alg.objective_functions.OBJECTIVE_FUNCTIONS:
+        obj_func, obj_class = opt_alg.objective_functions.OBJECTIVE_FUNCTIONS[
+            obj_function]
     else:
         raise TypeError("Discrepancy measure not supported!")
 
-    # Iterate the requested number of validation points
-    for i in range(num_tests):
-        obj_values = []
-
-        # Iterate the candidates in the low-discrepancy sequence
-        for j in range(candidates.shape[0]):
-
-            train_valid = np.vstack((train_data, candidates[j]))
-            obj_values.append(obj_func(train_valid) - obj_func(train_data))
+    if hasattr(obj_class, "candidate_scores"):
+        # Score all the candidates at once, incrementally updated
+        scores = obj_class.candidate_scores(dm, candidates)
+        if lazy:
+            selected = select_lazy_greedy(scores, num_tests, batch_size)
+        else:
+            selected = select_greedy(scores, num_tests, batch_size)
+
+        return candidates[selected]
+
+    # Otherwise, evaluate the objective function of each augmented design
+    valid_data = np.empty((num_tests, d))
+    train_data = np.empty((dm.shape[0] + num_tests, d))
+    train_data[:dm.shape[0]] = dm
+    available = np.ones(num_candidates, dtype=bool)
+    obj_values = np.empty(num_candidates)
+    for i in range(0, num_tests, batch_size):
+        n = dm.shape[0] + i
+        obj_values[:] = np.inf
+        for j in np.nonzero(available)[0]:
+            train_data[n] = candidates[j]
+            obj_values[j] = obj_func(train_data[:n+1])
+
+        # Get the arguments of the minimum of the objective values
+        batch = np.argsort(obj_values, kind="stable")[:min(batch_size,
+                                                           num_tests - i)]
+        train_data[n:n+batch.shape[0]] = candidates[batch]
+        valid_data[i:i+batch.shape[0]] = candidates[batch]
+        available[batch] = False
 
-        # Get the argument of the minimum of the objective values
-        ind_min = np.argmin(obj_values)
+    return valid_data
 
-        # Update the training_data
-        train_data = np.vstack((train_data, candidates[ind_min]))
 
-        # Update the validation_data
-        valid_data = np.vstack((valid_data, candidates[ind_min]))
+def select_greedy(scores, num_points: int, batch_size: int = 1) -> np.ndarray:
+    """Select the candidates to add to a design, rescoring all of them
 
-        # Remove the selected point from the candidates
-        candidates = np.delete(candidates, ind_min, 0)
+    At each round, the candidates with the best scores are added to the
+    design and all the candidates are rescored.
 
-    return valid_data
+    :param scores: the scores of the candidates, see
+        `opt_alg.objective_functions.CandidateScores`
+    :param num_points: the number of candidates to select
+    :param batch_size: the number of candidates selected per round
+    :return: the indices of the selected candidates, in order of selection
+    """
+    _check_num_points(scores, num_points)
+
+    selected = np.empty(num_points, dtype=int)
+    for i in range(0, num_points, batch_size):
+        # The selected candidates have an infinite score
+        batch = np.argsort(scores.values, kind="stable")[:min(batch_size,
+                                                              num_points - i)]
+        for j, ind in enumerate(batch):
+            scores.add(ind, rescore=(j == batch.shape[0] - 1))
+        selected[i:i+batch.shape[0]] = batch
+
+    return selected
+
+
+def select_lazy_greedy(scores, num_points: int,
+                       batch_size: int = 1) -> np.ndarray:
+    """Select the candidates to add to a design, rescoring only the best ones
+
+    The candidates are kept in a priority queue by a lower bound of their
+    keys (see `opt_alg.objective_functions.CandidateScores`). The bound of
+    a key computed before some points were added is the key corrected by the
+    smallest possible change per added point, the correction being the same
+    for all the candidates, the order of the queue is kept. At each round,
+    the candidates at the front of the queue are rescored, in blocks of
+    growing size (starting from the size needed in the previous round), until
+    the front candidates have up to date keys. They are
+    then better than all the others and are selected. The selection is the
+    same as :func:`select_greedy` (up to round-off errors) but only the
+    promising candidates are rescored.
+
+    The queue is an array of the bounds, its front is found by a partial sort
+    in O(C) for all the candidates at once.
+
+    :param scores: the scores of the candidates, see
+        `opt_alg.objective_functions.CandidateScores`
+    :param num_points: the number of candidates to select
+    :param batch_size: the number of candidates selected per round
+    :return: the indices of the selected candidates, in order of selection
+    """
+    _check_num_points(scores, num_points)
+
+    num_candidates = scores.candidates.shape[0]
+    num_added = 0       # the number of points added to the design
+    # The lower bounds of the keys, and the number of points added when scored
+    bounds = scores.keys(np.arange(num_candidates))
+    num_scored = np.zeros(num_candidates, dtype=int)
+
+    selected = np.empty(num_points, dtype=int)
+    block = 1
+    for i in range(0, num_points, batch_size):
+        num_batch = min(batch_size, num_points - i)
+        # Start from about the block size needed in the previous round
+        block = min(max(block // 2, num_batch), num_candidates)
+        while True:
+            front = np.argpartition(bounds, num_batch - 1)[:num_batch]
+            if np.all(num_scored[front] >= num_added):
+                break
+            # Rescore a block of the best candidates, larger each time
+            rescored = np.argpartition(bounds, block - 1)[:block]
+            rescored = rescored[(num_scored[rescored] < num_added) &
+                                ~scores.selected[rescored]]
+            bounds[rescored] = scores.keys(rescored) - \
+                num_added * scores.key_bound
+            num_scored[rescored] = num_added
+            block = min(2 * block, num_candidates)
+
+        # The best first, the same order as the greedy selection
+        front = front[np.lexsort((front, bounds[front]))]
+        for ind in front:
+            scores.add(ind, rescore=False)
+        # The selected candidates are never rescored nor selected again
+        bounds[front] = np.inf
+        num_scored[front] = num_points
+        num_added += num_batch
+        selected[i:i+num_batch] = front
+
+    return selected
+
+
+def _check_num_points(scores, num_points: int):
+    """Check that enough candidates are left to select the points
+
+    :param scores: the scores of the candidates
+    :param num_points: the number of candidates to select
+    """
+    num_available = scores.candidates.shape[0] - np.sum(scores.selected)
+    if num_points > num_available:
+        raise ValueError("Number of points to select ({}) larger than the"
+                         " number of available candidates ({})!"
+                         .format(num_points, num_available))
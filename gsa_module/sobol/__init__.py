@@ -11,7 +11,10 @@ from . import cmdln_args
 from . import sobol_saltelli
 from . import indices_1st
 from . import indices_total
+from . import indices_all
 from . import misc
+from . import online
+from . import adaptive
 
 
 __author__ = 'Damar Wicaksono'
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+    gsa_module.sobol.adaptive
+    *************************
+
+    Module with the adaptive Sobol'-Saltelli design, the number of samples is
+    doubled until the Sobol' indices are estimated within a tolerance
+
+    The base sample is extended in steps n -> 2n, keeping the samples already
+    evaluated. With the "sobol" scheme, the new samples are the continuation
+    of the Sobol' sequence and the extended design is the same as the design
+    created at once with `sobol_saltelli.create()`, with the "srs" scheme,
+    the random stream is continued. Only the runs of the new samples are
+    emitted at each step, the outputs of the completed runs are kept as the
+    sufficient statistics of `online.SobolAccumulator` and the confidence
+    intervals come from its online bootstrap.
+
+    Usage::
+
+        adaptive = AdaptiveSobolSaltelli(num_dimensions=10, num_samples=128,
+                                         tolerance=0.05, max_runs=50000)
+        design = adaptive.next_design()
+        while design is not None:
+            y_dict = {key: model(design[key]) for key in design}
+            adaptive.update(y_dict)
+            design = adaptive.next_design()
+        si, si_bootstrap = adaptive.estimate("saltelli")
+"""
+import numpy as np
+from . import misc
+from .online import SobolAccumulator
+from .sobol_saltelli import SobolSaltelliDesign
+
+__author__ = "Damar Wicaksono"
+
+
+class AdaptiveSobolSaltelli:
+    """Sobol'-Saltelli design extended until a confidence target is reached
+
+    After each step, the width of the bootstrap percentile confidence
+    intervals of the indices of all the parameters and of the selected
+    estimators is compared with the tolerance. The design stops growing when
+    the largest width is within the tolerance ("converged") or when the
+    next step would exceed the budget of runs ("budget").
+
+    :param num_dimensions: the number of dimensions (or parameters)
+    :param num_samples: the number of samples of the first step
+    :param sampling_scheme: the sampling scheme, "sobol" or "srs"
+    :param seed_number: the random seed number of the "srs" scheme and of the
+        bootstrap weights, None to use the global numpy random state
+    :param dirnum: the direction numbers for Sobol' sequence (array of
+        parameters or the fullname of a direction numbers file)
+    :param estimators: the estimators whose confidence intervals are checked,
+        any of "saltelli", "janon", "jansen", "sobol"
+    :param tolerance: the target width of the confidence intervals
+    :param max_runs: the maximum total number of runs, None for no budget
+    :param num_bootstrap: the number of online bootstrap replicates
+    :param pct: the percentile confidence interval
+    :param n_jobs: the number of worker processes to generate the Sobol'
+        sequence (-1 means using all processors)
+    """
+    def __init__(self, num_dimensions: int, num_samples: int,
+                 sampling_scheme: str = "sobol",
+                 seed_number: int = None,
+                 dirnum=None,
+                 estimators: tuple = ("saltelli", "jansen"),
+                 tolerance: float = 0.05,
+                 max_runs: int = None,
+                 num_bootstrap: int = 1000,
+                 pct: float = 95.,
+                 n_jobs: int = 1):
+        from ..samples.sobol import SobolEngine
+        from .online import ESTIMATORS
+
+        if num_samples < 1:
+            raise ValueError("Number of samples must be at least 1!")
+        for str_estimator in estimators:
+            if str_estimator not in ESTIMATORS:
+                raise ValueError("Estimator not supported!")
+
+        self.num_dimensions = num_dimensions
+        self.initial_samples = num_samples
+        self.estimators = list(estimators)
+        self.tolerance = tolerance
+        self.max_runs = max_runs
+        self.pct = pct
+        self.n_jobs = n_jobs
+
+        d = num_dimensions
+        if sampling_scheme == "sobol":
+            # Exclude the first two points, as in sobol_saltelli.create()
+            self._engine = SobolEngine(2*d, dirnum).fast_forward(2)
+        elif sampling_scheme == "srs":
+            self._rng = np.random if seed_number is None else \
+                np.random.RandomState(seed_number)
+        else:
+            raise ValueError("Sampling scheme {} can't be extended!"
+                             " (Use sobol or srs)" .format(sampling_scheme))
+        self.sampling_scheme = sampling_scheme
+
+        self.accumulator = SobolAccumulator(d, num_bootstrap, seed_number)
+        self.num_samples = 0    # the number of samples of the emitted steps
+        self.pending = None     # the design of the step to evaluate
+        self.status = "running"
+        self.history = []
+
+    @property
+    def runs_per_sample(self) -> int:
+        """The number of runs per sample, A, B, and the AB_i"""
+        return self.num_dimensions + 2
+
+    @property
+    def num_runs(self) -> int:
+        """The number of runs of the emitted steps"""
+        return self.num_samples * self.runs_per_sample
+
+    def next_design(self):
+        """Get the design of the next step, only its new samples
+
+        The same design is returned until its outputs are given to
+        :meth:`update`.
+
+        :return: (SobolSaltelliDesign) the design of the new samples, their
+            indices in the extended base sample start at `num_samples`
+            before the step, None if the design has stopped growing
+        """
+        if self.pending is not None:
+            return self.pending
+        if self.status != "running":
+            return None
+
+        if self.num_samples == 0:
+            m = self.initial_samples
+        else:
+            if self.history[-1]["max_width"] <= self.tolerance:
+                self.status = "converged"
+                return None
+            m = self.num_samples    # double the base sample
+        if self.max_runs is not None and \
+                (self.num_samples + m) * self.runs_per_sample > self.max_runs:
+            self.status = "budget"
+            return None
+
+        d = self.num_dimensions
+        if self.sampling_scheme == "sobol":
+            ab = self._engine.draw(m, n_jobs=self.n_jobs)
+        else:
+            ab = self._rng.rand(m, 2*d)
+        self.pending = SobolSaltelliDesign(ab[:, :d], ab[:, d:])
+        self._first_index = self.num_samples
+        self.num_samples += m
+
+        return self.pending
+
+    def update(self, y_dict: dict):
+        """Add the outputs of the design of the current step
+
+        :param y_dict: a dictionary of numpy array of model outputs of the
+            design returned by :meth:`next_design`, with the keys "a", "b",
+            "ab_1", etc.
+        :return: the adaptive design itself
+        """
+        if self.pending is None:
+            raise ValueError("No design is waiting for its outputs!")
+        m = self.pending.num_samples
+        if np.shape(y_dict["a"])[0] != m:
+            raise ValueError("The outputs are not the ones of the last design!")
+
+        self.accumulator.update(y_dict, self._first_index + np.arange(m))
+        self.pending = None
+        self.history.append({"num_samples": self.num_samples,
+                             "num_runs": self.num_runs,
+                             "max_width": float(self.max_width())})
+
+        return self
+
+    def estimate(self, str_estimator: str) -> tuple:
+        """Calculate the Sobol' indices of the evaluated samples
+
+        :param str_estimator: the estimator, any of "saltelli", "janon",
+            "jansen", "sobol"
+        :return: a tuple of two elements, the indices (length num_dims) and
+            the bootstrap samples (num_bootstrap * num_dims)
+        """
+        return self.accumulator.estimate(str_estimator)
+
+    def max_width(self) -> float:
+        """Get the largest width of the confidence intervals of the indices
+
+        :return: the largest width among the parameters and the selected
+            estimators, infinite without bootstrap replicates
+        """
+        if self.accumulator.num_bootstrap == 0:
+            return np.inf
+
+        widths = []
+        for str_estimator in self.estimators:
+            ci = misc.bootstrap_ci(self.estimate(str_estimator)[1],
+                                   pct=self.pct)
+            widths.append(ci[:, 2] - ci[:, 1])
+        max_width = np.max(widths)
+
+        return max_width if np.isfinite(max_width) else np.inf
+
+    def run(self, func):
+        """Evaluate the steps with a function until the design stops growing
+
+        :param func: the function of the runs, an n-by-k array, returning the
+            n outputs
+        :return: the adaptive design itself
+        """
+        design = self.next_design()
+        while design is not None:
+            self.update({key: func(design[key]) for key in design})
+            design = self.next_design()
+
+        return self
@@ -9,7 +9,7 @@
 """
 import argparse
 import os
-from ..util import ext_to_delimiter
+from ..util import OUTPUT_FORMATS, TEXT_FORMATS, ext_to_delimiter
 from .._version import __version__
 
 
@@ -43,16 +43,22 @@ def get_create_sample():
     |                  | matrix file. By default: "csv" or parse directly if  |
     |                  | filename with extension is specified.                |
     +------------------+------------------------------------------------------+
+    | output_format    | ("csv", "tsv", "txt", "npy", "npz") the format of    |
+    |                  | the design matrix files. By default: the delimiter.  |
+    |                  | The output header "-" writes all the runs into the   |
+    |                  | standard output                                      |
+    +------------------+------------------------------------------------------+
+    | float_format     | (str) the print format of the number in the text     |
+    |                  | formats. By default: "%1.6e"                         |
+    +------------------+------------------------------------------------------+
     | seed_number      | (None or int, >= 0) Seed number for random number    |
     |                  | generation if using srs or lhs for the design matrix |
     +------------------+------------------------------------------------------+
-    | direction_numbers| (None or np.ndarray) the contents of a direction     |
-    |                  | number file for Sobol' sequence generator            |
+    | direction_numbers| (None or str) the fullname (file+path) of a          |
+    |                  | direction number file for Sobol' sequence generator  |
     |                  | (default: built-in new-joe-kuo-6.21201)              |
     +------------------+------------------------------------------------------+
     """
-    from ..samples import sobol
-
     parser = argparse.ArgumentParser(
         description="%(prog)s - gsa-module, Generate DOE for Sobol' "
                     " Variance Decomposition"
@@ -96,6 +102,24 @@ def get_create_sample():
         default="csv",
         help="The delimiter for the output files (default: %(default)s)"
     )
+    # The output format
+    parser.add_argument(
+        "-of", "--output_format",
+        type=str,
+        choices=OUTPUT_FORMATS,
+        required=False,
+        help="The format of the output files, text or numpy binary "
+             "(default: the delimiter)"
+    )
+    # The print format of the number
+    parser.add_argument(
+        "-fmt", "--float_format",
+        type=str,
+        required=False,
+        default="%1.6e",
+        help="The print format of the number in the text formats "
+             "(default: %(default)s)"
+    )
     # Flag to include matrices to estimate second-order interaction
     parser.add_argument(
         "-int", "--interaction",
@@ -149,6 +173,14 @@ def get_create_sample():
     # Assign the delimiter
     delimiter = ext_to_delimiter(args.delimiter)
 
+    # Assign the output format
+    if args.output_format is None:
+        output_format = args.delimiter
+    else:
+        output_format = args.output_format
+    if args.output_header == "-" and output_format not in TEXT_FORMATS:
+        raise ValueError("Only text can be written to standard output")
+
     # Create a default filename header if not passed
     if args.output_header is None:
         output_header = "{}_{}_{}" .format(args.sampling_scheme,
@@ -169,8 +201,8 @@ def get_create_sample():
     if args.sampling_scheme == "sobol":
         if args.direction_numbers is not None:
             if os.path.exists(args.direction_numbers):
-                direction_numbers = sobol.read_dirnumfile(
-                    args.direction_numbers, args.num_dimensions)
+                # Parsed and cached when the Sobol' generator is created
+                direction_numbers = args.direction_numbers
             else:
                 raise ValueError(
                     "Specified direction numbers file does not exist!")
@@ -187,6 +219,8 @@ def get_create_sample():
         "interaction": args.interaction,
         "output_header": output_header,
         "delimiter": delimiter,
+        "output_format": output_format,
+        "float_format": args.float_format,
         "seed_number": seed_number,
         "direction_numbers": direction_numbers
     }
@@ -4,15 +4,23 @@
     ****************************
     
     Module with functions to calculate the 1st-order Sobol' indices
+
+    The outputs given to the estimators may be arrays of any shape, with the
+    samples along the last axis (e.g., one row per parameter and bootstrap
+    replicate), an index is then computed for each of the leading indices.
 """
 import numpy as np
+from . import misc
+from ..util import bootstrap
 
 __author__ = "Damar Wicaksono"
 
 
 def estimate(y_dict: dict,
              str_estimator: str="saltelli",
-             num_bootstrap: int=10000) -> tuple:
+             num_bootstrap: int=10000,
+             seed=None,
+             n_jobs: int=1) -> tuple:
     """Calculate the 1st-order Sobol' sensitivity indices and create a dict
 
     This is a driver function to call several choices of 1st-order sensitivity
@@ -29,13 +37,16 @@ def estimate(y_dict: dict,
     :param y_dict: a dictionary of numpy array of model outputs
     :param str_estimator: which estimator to use
     :param num_bootstrap: the size of bootstrap sample
+    :param seed: the random seed number of the bootstrap, None to use the
+        global numpy random state (see `gsa_module.util.bootstrap()`)
+    :param n_jobs: the number of threads to compute the bootstrap samples,
+        -1 to use all the CPUs
     :return: a tuple of two elements, the first is a numpy array of all the 
         first-order indices (length num_dims) and the second is the bootstrap
         samples of the estimates (num_bootstrap * num_dims)
     """
     # Get some common parameters
-    num_dims = len(y_dict) - 2
-    num_smpl = y_dict["a"].shape[0]
+    num_dims = misc.num_dimensions(y_dict)
 
     # Select the estimator
     if str_estimator == "saltelli":
@@ -45,29 +56,21 @@ def estimate(y_dict: dict,
     else:
         raise ValueError("Estimator not supported!")
 
-    # Compute the 1st-order sensitivity indices
-    si_estimates = np.empty(num_dims)
-    for i in range(num_dims):
-        key = "ab_{}".format(i + 1)
-        si_estimates[i] = estimator(y_dict["b"], y_dict[key], y_dict["a"])
+    # Compute the 1st-order sensitivity indices, all dimensions at once
+    fab = misc.stack_outputs(y_dict, num_dims)
+    si_estimates = estimator(y_dict["b"], fab, y_dict["a"])
 
-    # Conduct the bootstrapping
+    # Conduct the bootstrapping, by chunks of replicates
     if num_bootstrap > 0:
-        si_bootstrap = np.empty([num_bootstrap, num_dims])
-        for i in range(num_bootstrap):
-            idx = np.random.choice(num_smpl, num_smpl, replace=True)
-            for j in range(num_dims):
-                key = "ab_{}".format(j + 1)
-                si_bootstrap[i, j] = estimator(y_dict["b"][idx],
-                                               y_dict[key][idx],
-                                               y_dict["a"][idx])
+        si_bootstrap = bootstrap(estimator, [y_dict["b"], fab, y_dict["a"]],
+                                 num_bootstrap, seed=seed, n_jobs=n_jobs)
     else:
         si_bootstrap = None
 
     return si_estimates, si_bootstrap
 
 
-def janon(fb: np.ndarray, fab_i: np.ndarray, fa: np.ndarray=None) -> float:
+def janon(fb: np.ndarray, fab_i: np.ndarray, fa: np.ndarray=None):
     """Calculate the 1st-order Sobol' indices using the Janon estimator
 
     This function is an implementation of Janon's second estimator given by
@@ -85,17 +88,17 @@ def janon(fb: np.ndarray, fab_i: np.ndarray, fa: np.ndarray=None) -> float:
     :return: (float) the 1st-order index for parameter-i
     """
     # Compute the squared mean according to Janon et al. formulation
-    mean_squared = (np.mean((fb + fab_i)/2))**2
+    mean_squared = (np.mean((fb + fab_i)/2, axis=-1))**2
 
-    nominator = np.mean(fb * fab_i) - mean_squared
-    denominator = np.mean((fb**2 + fab_i**2)/2) - mean_squared
+    nominator = np.mean(fb * fab_i, axis=-1) - mean_squared
+    denominator = np.mean((fb**2 + fab_i**2)/2, axis=-1) - mean_squared
 
     si = nominator / denominator
 
     return si
 
 
-def saltelli(fb: np.ndarray, fab_i: np.ndarray, fa: np.ndarray) -> float:
+def saltelli(fb: np.ndarray, fab_i: np.ndarray, fa: np.ndarray):
     """Calculate the 1st-order index for parameter-i using Saltelli estimator
 
     The implementation below is based on the Sobol'-Saltelli Design given in
@@ -117,12 +120,12 @@ def saltelli(fb: np.ndarray, fab_i: np.ndarray, fa: np.ndarray) -> float:
     :return: the first order sensitivity of parameter i
     """
     # Compute the Squared Mean (f(a) * f(b))
-    mean_squared = np.mean(fa * fb)
+    mean_squared = np.mean(fa * fb, axis=-1)
 
     # Compute the Variance
-    var = np.var(fa, ddof=1)
+    var = np.var(fa, ddof=1, axis=-1)
 
     # Compute the first order sensitivity
-    si = (np.mean(fb * fab_i) - mean_squared) / var
+    si = (np.mean(fb * fab_i, axis=-1) - mean_squared) / var
 
     return si
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+    gsa_module.sobol.indices_all
+    ****************************
+
+    Module with the joint estimation of the 1st-order and the total-effect
+    Sobol' indices
+
+    All the estimators of `indices_1st` and `indices_total` share the means of
+    the same outputs and the same products of outputs, e.g., the variance of
+    f(a) or the products f(b)*f(ab_i). Computing them together, the outputs of
+    A, B, and AB_i are resampled once per bootstrap replicate for all the
+    estimators, and the bootstrap samples of the different indices come from
+    the same resamples.
+"""
+import numpy as np
+from . import misc
+from ..util import bootstrap
+
+__author__ = "Damar Wicaksono"
+
+
+# The estimators, in the order of the rows of all_estimators()
+ESTIMATORS = ["saltelli", "janon", "jansen", "sobol"]
+
+
+def estimate_all(y_dict: dict,
+                 num_bootstrap: int = 10000,
+                 seed=None,
+                 n_jobs: int = 1) -> dict:
+    """Calculate the Sobol' indices with all the estimators at once
+
+    The estimates are the same as the ones of `indices_1st.estimate()` and
+    `indices_total.estimate()`, up to round-off errors. The bootstrap samples
+    of all the estimators come from the same resamples, e.g., replicate j of
+    the 1st-order and of the total-effect indices is from the same samples.
+
+    :param y_dict: a dictionary of numpy array of model outputs
+    :param num_bootstrap: the number of bootstrap samples
+    :param seed: the random seed number of the bootstrap, None to use the
+        global numpy random state (see `gsa_module.util.bootstrap()`)
+    :param n_jobs: the number of threads to compute the bootstrap samples,
+        -1 to use all the CPUs
+    :return: a dictionary with the estimators ("saltelli", "janon", "jansen",
+        "sobol") as keys, each value is a tuple of two elements, the indices
+        (length num_dims) and the bootstrap samples (num_bootstrap * num_dims)
+    """
+    num_dims = misc.num_dimensions(y_dict)
+
+    # Compute all the indices, all dimensions at once
+    fab = misc.stack_outputs(y_dict, num_dims)
+    outputs = [y_dict["a"], y_dict["b"], fab]
+    estimates = all_estimators(*outputs).reshape(len(ESTIMATORS), num_dims)
+
+    # Conduct the bootstrapping, the same resamples for all the estimators
+    if num_bootstrap > 0:
+        estimates_bootstrap = bootstrap(
+            all_estimators, outputs, num_bootstrap, seed=seed,
+            n_jobs=n_jobs).reshape(num_bootstrap, len(ESTIMATORS), num_dims)
+    else:
+        estimates_bootstrap = None
+
+    return {str_estimator: (estimates[i], None if estimates_bootstrap is None
+                            else estimates_bootstrap[:, i])
+            for i, str_estimator in enumerate(ESTIMATORS)}
+
+
+def all_estimators(fa: np.ndarray, fb: np.ndarray, fab: np.ndarray):
+    """Calculate the Sobol' indices of all the estimators from shared products
+
+    The formulas are the ones of `indices_1st.saltelli()`,
+    `indices_1st.janon()`, `indices_total.jansen()`, and
+    `indices_total.sobol()`.
+
+    :param fa: numpy array of model output evaluated with input matrix A,
+        of shape (..., num_samples)
+    :param fb: numpy array of model output evaluated with input matrix B,
+        of the same shape
+    :param fab: numpy array of model output with the matrices AB_i, of shape
+        (num_dims, ..., num_samples)
+    :return: the indices, of shape (4 * num_dims, ...), rows i*num_dims to
+        (i+1)*num_dims - 1 are of the i-th estimator of `ESTIMATORS`
+    """
+    # The shared means and products
+    var = np.var(fa, ddof=1, axis=-1)
+    mean_b_ab = np.mean(fb * fab, axis=-1)
+    diff = fa - fab
+
+    # Saltelli, 1st-order
+    saltelli = (mean_b_ab - np.mean(fa * fb, axis=-1)) / var
+
+    # Janon, 1st-order
+    mean_squared = (np.mean((fb + fab)/2, axis=-1))**2
+    janon = (mean_b_ab - mean_squared) / \
+        (np.mean((fb**2 + fab**2)/2, axis=-1) - mean_squared)
+
+    # Jansen, total-effect
+    jansen = 0.5 * np.mean(diff**2, axis=-1) / var
+
+    # Sobol, total-effect (f(a)**2 - f(a)*f(ab_i) = f(a) * (f(a) - f(ab_i)))
+    sobol = np.mean(fa * diff, axis=-1) / var
+
+    return np.concatenate([saltelli, janon, jansen, sobol])
@@ -4,27 +4,38 @@
     ******************************
     
     Module with functions to calculate the total-effect Sobol' indices
+
+    The estimators take the means along the last axis of the outputs, the
+    indices of all the parameters and of many bootstrap replicates are
+    computed at once when they are stacked in the leading axes.
 """
 import numpy as np
+from . import misc
+from ..util import bootstrap
 
 __author__ = "Damar Wicaksono"
 
 
 def estimate(y_dict: dict,
              str_estimator: str="jansen",
-             num_bootstrap: int=10000) -> tuple:
+             num_bootstrap: int=10000,
+             seed=None,
+             n_jobs: int=1) -> tuple:
     """Calculate the total-effect Sobol' sensitivity indices
     
     :param y_dict: a dictionary of numpy array of model outputs
     :param str_estimator: which estimator to use
     :param num_bootstrap: the number of bootstrap samples
+    :param seed: the random seed number of the bootstrap, None to use the
+        global numpy random state (see `gsa_module.util.bootstrap()`)
+    :param n_jobs: the number of threads to compute the bootstrap samples,
+        -1 to use all the CPUs
     :return: a tuple of two elements, first is a numpy array of all the 
         total-effect indices (length num_dims) and the second is the numpy 
         array of the bootstrap samples (num_bootstrap * num_dims)
     """
     # Get some common parameters
-    num_dims = len(y_dict) - 2
-    num_smpl = y_dict["a"].shape[0]
+    num_dims = misc.num_dimensions(y_dict)
 
     # Select the estimator
     if str_estimator == "jansen":
@@ -34,28 +45,21 @@ def estimate(y_dict: dict,
     else:
         raise ValueError("Estimator not supported!")
 
-    # Compute the total-effect sensitivity indices
-    sti = np.empty(num_dims)
-    for i in range(num_dims):
-        key = "ab_{}" .format(i+1)
-        sti[i] = estimator(y_dict["a"], y_dict[key])
+    # Compute the total-effect sensitivity indices, all dimensions at once
+    fab = misc.stack_outputs(y_dict, num_dims)
+    sti = estimator(y_dict["a"], fab)
 
-    # Conduct the bootstrapping
+    # Conduct the bootstrapping, by chunks of replicates
     if num_bootstrap > 0:
-        sti_bootstrap = np.empty([num_bootstrap, num_dims])
-        for i in range(num_bootstrap):
-            idx = np.random.choice(num_smpl, num_smpl, replace=True)
-            for j in range(num_dims):
-                key = "ab_{}".format(j + 1)
-                sti_bootstrap[i, j] = estimator(y_dict["a"][idx],
-                                                y_dict[key][idx])
+        sti_bootstrap = bootstrap(estimator, [y_dict["a"], fab],
+                                  num_bootstrap, seed=seed, n_jobs=n_jobs)
     else:
         sti_bootstrap = None
 
     return sti, sti_bootstrap
 
 
-def jansen(fa: np.ndarray, fab_i: np.ndarray) -> float:
+def jansen(fa: np.ndarray, fab_i: np.ndarray):
     """Calculate the total-effect Sobol' sensitivity indices using Jansen est.
     
     See the explanation in the last paragraph of pp. 37 in [1]
@@ -70,14 +74,14 @@ def jansen(fa: np.ndarray, fab_i: np.ndarray) -> float:
     :return: the total-effect sensitivity of parameter i
     """
     # Compute the Variance
-    var = np.var(fa, ddof=1)
+    var = np.var(fa, ddof=1, axis=-1)
 
-    sti = 0.5 * np.mean((fa - fab_i)**2) / var
+    sti = 0.5 * np.mean((fa - fab_i)**2, axis=-1) / var
 
     return sti
 
 
-def sobol(fa: np.ndarray, fab_i: np.ndarray) -> float:
+def sobol(fa: np.ndarray, fab_i: np.ndarray):
     """Calculate the total-effect Sobol' sensitivity indices using Sobol est.
     
     See Eq.(8) in [1] for the Sobol estimator 
@@ -101,8 +105,8 @@ def sobol(fa: np.ndarray, fab_i: np.ndarray) -> float:
     :return: the total-effect sensitivity index of parameter i
     """
     # Compute the variance
-    var = np.var(fa, ddof=1)
+    var = np.var(fa, ddof=1, axis=-1)
 
-    sti = np.mean(fa**2 - fa * fab_i) / var
+    sti = np.mean(fa**2 - fa * fab_i, axis=-1) / var
 
     return sti
@@ -43,3 +43,22 @@ def bootstrap_ci(si_bootstrap: np.ndarray,
                                           axis=0)
 
     return si_bootstrap_ci
+
+
+def num_dimensions(y_dict: dict) -> int:
+    """Get the number of dimensions of the model outputs of a design
+
+    :param y_dict: a dictionary of numpy array of model outputs
+    :return: the number of matrices AB_i, other keys (e.g., "ba_i") are ignored
+    """
+    return len([key for key in y_dict if key.startswith("ab_")])
+
+
+def stack_outputs(y_dict: dict, num_dims: int) -> np.ndarray:
+    """Stack the model outputs of the matrices AB_i into a single array
+
+    :param y_dict: a dictionary of numpy array of model outputs
+    :param num_dims: the number of dimensions
+    :return: the outputs, num_dims * num_samples, row i is for AB_(i+1)
+    """
+    return np.array([y_dict["ab_{}" .format(i+1)] for i in range(num_dims)])
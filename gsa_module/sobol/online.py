@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+    gsa_module.sobol.online
+    ***********************
+
+    Module with the streaming estimation of the Sobol' indices
+
+    The estimators of the 1st-order (Saltelli, Janon) and the total-effect
+    (Jansen, Sobol) indices are functions of the means and of the centered
+    second moments of the outputs of the matrices A, B, and AB_i. These
+    sufficient statistics are accumulated as the outputs of the runs become
+    available and two accumulations of disjoint sets of samples, e.g., from
+    different nodes, can be merged. The means and the moments are updated by
+    batches of samples with the pairwise update of [1], numerically stable
+    contrary to accumulating the sums of squares.
+
+    The accumulation can also keep the statistics of online Poisson bootstrap
+    replicates [2], each sample enters a replicate with a Poisson(1) weight
+    instead of being resampled, the bootstrap samples of the indices are then
+    available without storing the outputs.
+
+    **References:**
+
+    (1) T. F. Chan, G. H. Golub, and R. J. LeVeque, "Algorithms for Computing
+        the Sample Variance: Analysis and Recommendations," The American
+        Statistician, 37, pp. 242-247, 1983
+    (2) N. Chamandy, O. Muralidharan, A. Najmi, and S. Naidu, "Estimating
+        Uncertainty for Massive Data Streams," Technical Report, Google, 2012
+"""
+import numpy as np
+from . import misc
+from ..util import BOOTSTRAP_CHUNK_SIZE
+
+__author__ = "Damar Wicaksono"
+
+
+# The names of the sufficient statistics, the means and the centered moments
+# ("m2" for the second moment of an output, "c" for the co-moment of two)
+SCALAR_STATISTICS = ["weight", "mean_a", "mean_b", "m2_a", "m2_b", "c_a_b"]
+DIMENSION_STATISTICS = ["mean_ab", "m2_ab", "c_a_ab", "c_b_ab"]
+
+# The number of consecutive samples whose bootstrap weights are drawn at once
+WEIGHT_BLOCK_SIZE = 1024
+
+
+class SobolAccumulator:
+    """Streaming sufficient statistics of the Sobol'-Saltelli outputs
+
+    The statistics are kept for the samples (weight 1) and for each online
+    Poisson bootstrap replicate. The weights of the samples in the replicates
+    are drawn by blocks of `WEIGHT_BLOCK_SIZE` consecutive indices in the base
+    sample, from the random stream of the block spawned from the seed, so that
+    the statistics do not depend on the order and on the batches of the
+    updates, nor on how the samples are split between the accumulators to
+    merge.
+
+    :param num_dimensions: the number of dimensions (parameters)
+    :param num_bootstrap: the number of online bootstrap replicates
+    :param seed: the random seed number of the bootstrap weights, None to draw
+        it from the global numpy random state
+    """
+    def __init__(self, num_dimensions: int,
+                 num_bootstrap: int = 0,
+                 seed: int = None):
+        self.num_dimensions = num_dimensions
+        self.num_bootstrap = num_bootstrap
+        if seed is None:
+            seed = int(np.random.randint(0, 2**31))
+        self.seed = seed
+        self.num_samples = 0
+        self._weight_block = (None, None)   # the last block of weights drawn
+
+        # The estimate (index 0) and the bootstrap replicates
+        for key in SCALAR_STATISTICS:
+            setattr(self, key, np.zeros(num_bootstrap + 1))
+        for key in DIMENSION_STATISTICS:
+            setattr(self, key, np.zeros([num_bootstrap + 1, num_dimensions]))
+
+    def weights(self, indices: np.ndarray) -> np.ndarray:
+        """Get the weights of samples in the estimate and in the replicates
+
+        :param indices: the indices of the samples in the base sample
+        :return: the weights, (num_bootstrap + 1) * num_samples, the first row
+            is for the estimate (all ones)
+        """
+        indices = np.asarray(indices, dtype=int)
+        weights = np.ones([self.num_bootstrap + 1, len(indices)])
+        if self.num_bootstrap > 0:
+            blocks = indices // WEIGHT_BLOCK_SIZE
+            for block in np.unique(blocks):
+                j = blocks == block
+                weights[1:, j] = self._block_weights(int(block))[
+                    :, indices[j] % WEIGHT_BLOCK_SIZE]
+
+        return weights
+
+    def _block_weights(self, block: int) -> np.ndarray:
+        """Draw the weights of a block of samples in the replicates
+
+        :param block: the index of the block in the base sample
+        :return: the weights, num_bootstrap * WEIGHT_BLOCK_SIZE
+        """
+        if self._weight_block[0] != block:
+            rng = np.random.default_rng(np.random.SeedSequence(
+                self.seed, spawn_key=(block,)))
+            self._weight_block = (block, rng.poisson(
+                1.0, [self.num_bootstrap, WEIGHT_BLOCK_SIZE]))
+
+        return self._weight_block[1]
+
+    def update(self, y_dict: dict, indices: np.ndarray = None):
+        """Add the outputs of a batch of samples
+
+        :param y_dict: a dictionary of numpy array of model outputs with the
+            conventional keys "a", "b", "ab_1", etc. (other keys are ignored)
+        :param indices: the indices of the samples in the base sample, by
+            default the samples follow the ones already added. The indices
+            must be given if the accumulator is to be merged with another
+        :return: the accumulator itself
+        """
+        fa = np.asarray(y_dict["a"], dtype=float)
+        fb = np.asarray(y_dict["b"], dtype=float)
+        fab = misc.stack_outputs(y_dict, self.num_dimensions).astype(float)
+        if indices is None:
+            indices = self.num_samples + np.arange(fa.shape[0])
+        elif len(indices) != fa.shape[0]:
+            raise ValueError("The number of indices and samples differ!")
+
+        # Batches of bounded memory, all the replicates at once
+        num_rows = max(BOOTSTRAP_CHUNK_SIZE //
+                       ((self.num_bootstrap + 1) * (self.num_dimensions + 2)),
+                       1)
+        for i in range(0, fa.shape[0], num_rows):
+            j = slice(i, i + num_rows)
+            self._merge(_batch_statistics(self.weights(indices[j]),
+                                          fa[j], fb[j], fab[:, j]))
+        self.num_samples += fa.shape[0]
+
+        return self
+
+    def merge(self, other):
+        """Merge the statistics of another accumulation of different samples
+
+        :param other: the accumulator of the other samples, with the same
+            number of dimensions, of replicates, and seed
+        :return: the accumulator itself
+        """
+        if (other.num_dimensions != self.num_dimensions or
+                other.num_bootstrap != self.num_bootstrap or
+                other.seed != self.seed):
+            raise ValueError("Accumulators with different dimensions,"
+                             " bootstrap replicates or seeds can't be merged!")
+
+        self._merge({key: getattr(other, key)
+                     for key in SCALAR_STATISTICS + DIMENSION_STATISTICS})
+        self.num_samples += other.num_samples
+
+        return self
+
+    def _merge(self, stats: dict):
+        """Merge the statistics of a disjoint set of samples (see [1])
+
+        :param stats: the dictionary of the statistics of the other samples
+        """
+        weight = self.weight + stats["weight"]
+        # The fraction of the other samples, zero if both are empty
+        frac = np.divide(stats["weight"], weight,
+                         out=np.zeros_like(weight), where=weight > 0)
+        cross = self.weight * frac  # the product of the weights over the sum
+
+        delta_a = stats["mean_a"] - self.mean_a
+        delta_b = stats["mean_b"] - self.mean_b
+        delta_ab = stats["mean_ab"] - self.mean_ab
+
+        self.m2_a = self.m2_a + stats["m2_a"] + cross * delta_a**2
+        self.m2_b = self.m2_b + stats["m2_b"] + cross * delta_b**2
+        self.c_a_b = self.c_a_b + stats["c_a_b"] + cross * delta_a * delta_b
+        self.m2_ab = self.m2_ab + stats["m2_ab"] + \
+            cross[:, np.newaxis] * delta_ab**2
+        self.c_a_ab = self.c_a_ab + stats["c_a_ab"] + \
+            cross[:, np.newaxis] * delta_a[:, np.newaxis] * delta_ab
+        self.c_b_ab = self.c_b_ab + stats["c_b_ab"] + \
+            cross[:, np.newaxis] * delta_b[:, np.newaxis] * delta_ab
+
+        self.mean_a = self.mean_a + frac * delta_a
+        self.mean_b = self.mean_b + frac * delta_b
+        self.mean_ab = self.mean_ab + frac[:, np.newaxis] * delta_ab
+        self.weight = weight
+
+    def estimate(self, str_estimator: str) -> tuple:
+        """Calculate the Sobol' indices of the samples added so far
+
+        :param str_estimator: the estimator, "saltelli" or "janon" for the
+            1st-order indices, "jansen" or "sobol" for the total-effect ones
+        :return: a tuple of two elements, the indices (length num_dims) and
+            the bootstrap samples (num_bootstrap * num_dims), None without
+            bootstrap replicates
+        """
+        if str_estimator not in ESTIMATORS:
+            raise ValueError("Estimator not supported!")
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            indices = ESTIMATORS[str_estimator](self)
+
+        if self.num_bootstrap > 0:
+            return indices[0], indices[1:]
+        else:
+            return indices[0], None
+
+    def save(self, filename: str):
+        """Save the statistics into a numpy binary file (`.npz`)
+
+        :param filename: the filename
+        """
+        np.savez(filename,
+                 num_bootstrap=self.num_bootstrap, seed=self.seed,
+                 num_samples=self.num_samples,
+                 **{key: getattr(self, key)
+                    for key in SCALAR_STATISTICS + DIMENSION_STATISTICS})
+
+    @classmethod
+    def load(cls, filename: str):
+        """Load the statistics saved by :meth:`save`
+
+        :param filename: the filename
+        :return: the accumulator
+        """
+        with np.load(filename) as data:
+            accumulator = cls(data["mean_ab"].shape[1],
+                              int(data["num_bootstrap"]), int(data["seed"]))
+            accumulator.num_samples = int(data["num_samples"])
+            for key in SCALAR_STATISTICS + DIMENSION_STATISTICS:
+                setattr(accumulator, key, data[key])
+
+        return accumulator
+
+
+def _batch_statistics(weights: np.ndarray, fa: np.ndarray, fb: np.ndarray,
+                      fab: np.ndarray) -> dict:
+    """Compute the sufficient statistics of a batch of weighted samples
+
+    :param weights: the weights, num_replicates * num_samples
+    :param fa: numpy array of model output evaluated with input matrix A
+    :param fb: numpy array of model output evaluated with input matrix B
+    :param fab: the outputs of the matrices AB_i, num_dims * num_samples
+    :return: the dictionary of the statistics of each replicate
+    """
+    weight = np.sum(weights, axis=1)
+    scale = np.divide(1.0, weight, out=np.zeros_like(weight),
+                      where=weight > 0)
+
+    mean_a = weights @ fa * scale
+    mean_b = weights @ fb * scale
+    mean_ab = weights @ fab.T * scale[:, np.newaxis]
+
+    # Centered outputs, num_replicates * (num_dims) * num_samples
+    da = fa - mean_a[:, np.newaxis]
+    db = fb - mean_b[:, np.newaxis]
+    dab = fab - mean_ab[:, :, np.newaxis]
+    wda = weights * da
+    wdb = weights * db
+
+    return {"weight": weight,
+            "mean_a": mean_a,
+            "mean_b": mean_b,
+            "mean_ab": mean_ab,
+            "m2_a": np.sum(wda * da, axis=1),
+            "m2_b": np.sum(wdb * db, axis=1),
+            "c_a_b": np.sum(wda * db, axis=1),
+            "m2_ab": np.einsum("rm,rkm,rkm->rk", weights, dab, dab),
+            "c_a_ab": np.einsum("rm,rkm->rk", wda, dab),
+            "c_b_ab": np.einsum("rm,rkm->rk", wdb, dab)}
+
+
+def saltelli(acc: SobolAccumulator) -> np.ndarray:
+    """Calculate the 1st-order indices with the Saltelli estimator
+
+    The same as `indices_1st.saltelli()`, the means of the products being
+    the co-moments plus the products of the means
+
+    :param acc: the accumulator
+    :return: the indices, num_replicates * num_dims
+    """
+    weight = acc.weight[:, np.newaxis]
+    var = acc.m2_a[:, np.newaxis] / (weight - 1)
+
+    si = ((acc.c_b_ab - acc.c_a_b[:, np.newaxis]) / weight +
+          acc.mean_b[:, np.newaxis] *
+          (acc.mean_ab - acc.mean_a[:, np.newaxis])) / var
+
+    return si
+
+
+def janon(acc: SobolAccumulator) -> np.ndarray:
+    """Calculate the 1st-order indices with the Janon estimator
+
+    The same as `indices_1st.janon()`
+
+    :param acc: the accumulator
+    :return: the indices, num_replicates * num_dims
+    """
+    weight = acc.weight[:, np.newaxis]
+    delta_squared = (acc.mean_b[:, np.newaxis] - acc.mean_ab)**2 / 4
+
+    nominator = acc.c_b_ab / weight - delta_squared
+    denominator = (acc.m2_b[:, np.newaxis] + acc.m2_ab) / (2 * weight) + \
+        delta_squared
+
+    return nominator / denominator
+
+
+def jansen(acc: SobolAccumulator) -> np.ndarray:
+    """Calculate the total-effect indices with the Jansen estimator
+
+    The same as `indices_total.jansen()`
+
+    :param acc: the accumulator
+    :return: the indices, num_replicates * num_dims
+    """
+    weight = acc.weight[:, np.newaxis]
+    m2_a = acc.m2_a[:, np.newaxis]
+    var = m2_a / (weight - 1)
+
+    mean_squared_diff = (m2_a + acc.m2_ab - 2 * acc.c_a_ab) / weight + \
+        (acc.mean_a[:, np.newaxis] - acc.mean_ab)**2
+
+    return 0.5 * mean_squared_diff / var
+
+
+def sobol(acc: SobolAccumulator) -> np.ndarray:
+    """Calculate the total-effect indices with the Sobol estimator
+
+    The same as `indices_total.sobol()`
+
+    :param acc: the accumulator
+    :return: the indices, num_replicates * num_dims
+    """
+    weight = acc.weight[:, np.newaxis]
+    m2_a = acc.m2_a[:, np.newaxis]
+    mean_a = acc.mean_a[:, np.newaxis]
+    var = m2_a / (weight - 1)
+
+    sti = ((m2_a - acc.c_a_ab) / weight + mean_a * (mean_a - acc.mean_ab)) \
+        / var
+
+    return sti
+
+
+# The estimators of the indices from the accumulated statistics
+ESTIMATORS = {
+    "saltelli": saltelli,
+    "janon": janon,
+    "jansen": jansen,
+    "sobol": sobol
+}
@@ -8,8 +8,10 @@
     The design matrices will be used to evaluate model which outputs are used 
     to compute the Monte Carlo estimates of the Sobol' indices
 """
+import collections.abc
 import numpy as np
 from ..samples import srs, lhs, sobol
+from ..util import CHUNK_SIZE, ext_to_delimiter, write_text
 
 __author__ = "Damar Wicaksono"
 
@@ -18,7 +20,9 @@ def create(num_samples: int, num_dimensions: int,
            sampling_scheme: str="srs",
            seed_number: int=None,
            dirnum: np.ndarray=None,
-           interaction: bool=False):
+           interaction: bool=False,
+           n_jobs: int=1,
+           num_replicates: int=None):
     r"""Generate Sobol'-Saltelli design matrices
 
     Sobol'-Saltelli design matrices are used to calculate the Sobol' 
@@ -40,22 +44,34 @@ def create(num_samples: int, num_dimensions: int,
     :param num_dimensions: the number of dimensions (or parameters)
     :param sampling_scheme: the sampling scheme to generate the design
     :param seed_number: the random seed number if sampling_scheme == srs | lhs
-    :param dirnum: the direction numbers for Sobol' sequence
+    :param dirnum: the direction numbers for Sobol' sequence (array of
+        parameters or the fullname of a direction numbers file)
     :param interaction: flag to generate matrices used for 2nd order 
         interaction indices estimation
-    :return: (dict of ndarray) a dictionary containing pair of keys and numpy
-        arrays of which each rows correspond to the normalized (0, 1) parameter
-        values for model evaluation
+    :param n_jobs: the number of worker processes to generate the Sobol'
+        sequence (-1 means using all processors)
+    :param num_replicates: the number of independent designs generated at
+        once, only if sampling_scheme == lhs, None for a single design
+    :return: (SobolSaltelliDesign) a dictionary-like design containing pair of
+        keys and numpy arrays of which each rows correspond to the normalized
+        (0, 1) parameter values for model evaluation, only the matrices A and
+        B are stored. A list of `num_replicates` designs if it is given
     """
     # short names for local variables
     n = num_samples
     d = num_dimensions
 
+    if num_replicates is not None and sampling_scheme != "lhs":
+        raise ValueError("Replicated designs only with lhs sampling scheme!")
+
     if sampling_scheme == "lhs":
-        ab = lhs.create(n, 2*d, seed_number)
+        ab = lhs.create(n, 2*d, seed_number, num_replicates)
+        if num_replicates is not None:
+            return [SobolSaltelliDesign(ab_i[:, :d], ab_i[:, d:], interaction)
+                    for ab_i in ab]
     elif sampling_scheme == "sobol":
         # Exclude the first two rows because each has the same values
-        ab = sobol.create(n+2, 2*d, dirnum)
+        ab = sobol.create(n+2, 2*d, dirnum, n_jobs=n_jobs)
         ab = ab[2:]
     else:
         ab = srs.create(n, 2*d, seed_number)
@@ -63,42 +79,195 @@ def create(num_samples: int, num_dimensions: int,
     a = ab[:,:d]
     b = ab[:,d:]
 
-    sobol_saltelli = dict()
-    sobol_saltelli["a"] = a
-    sobol_saltelli["b"] = b
-
-    # AB_i: replace the i-th column of A matrix by i-th column of B matrix
-    # These sets of samples are used to calculate the first- and total-order
-    # Sobol' indices (together with A and B)
-    for i in range(num_dimensions):
-        key = "ab_{}" .format(str(i+1))
-        temp = np.copy(a)
-        temp[:, i] = b[:, i]
-        sobol_saltelli[key] = temp
-
-    if interaction:
-        # BA_i: replace the i-th column of B matrix by i-th column of A matrix
-        # these sets of samples are used to calculate the second-order Sobol'
-        # indices
-        for i in range(num_dimensions):
-            key = "ba_{}" .format(i+1)
-            temp = np.copy(b)
-            temp[:, i] = a[:, i]
-            sobol_saltelli[key] = temp
-
-    return sobol_saltelli
-
-
-def write(sobol_saltelli: dict, output_header: str, fmt="%1.6e"):
+    return SobolSaltelliDesign(a, b, interaction)
+
+
+class SobolSaltelliDesign(collections.abc.Mapping):
+    """Sobol'-Saltelli design matrices, stored as the matrices A and B only
+
+    The design behaves as a read-only dictionary of the design matrices with
+    the keys "a", "b", "ab_1", ..., "ab_k" (and "ba_1", ..., "ba_k" with
+    interaction). Only A and B carry information: AB_i is the matrix A with
+    its i-th column replaced by the i-th column of B, and BA_i is the matrix B
+    with its i-th column replaced by the i-th column of A. They are created
+    on demand when accessed, the memory of the design is 2*n*k instead of
+    (k+2)*n*k (or (2k+2)*n*k).
+
+    The runs of the design are numbered in the order of the keys, run
+    `j*n + i` is the i-th row of the j-th matrix. Any set of runs can be
+    created on demand without the matrices (:meth:`runs`).
+
+    :param a: the matrix A, n-by-k
+    :param b: the matrix B, n-by-k
+    :param interaction: flag to include the matrices BA_i used for the 2nd
+        order interaction indices estimation
+    """
+    def __init__(self, a: np.ndarray, b: np.ndarray,
+                 interaction: bool = False):
+        self.a = a
+        self.b = b
+        self.interaction = interaction
+
+        k = a.shape[1]
+        self._keys = ["a", "b"] + ["ab_{}" .format(i+1) for i in range(k)]
+        # The base matrix and the replaced column of each matrix, by key order
+        self._from_b = [False, True] + [False] * k
+        self._cols = [-1, -1] + list(range(k))
+        if interaction:
+            self._keys += ["ba_{}" .format(i+1) for i in range(k)]
+            self._from_b += [True] * k
+            self._cols += list(range(k))
+        self._index = {key: j for j, key in enumerate(self._keys)}
+
+    @property
+    def num_samples(self) -> int:
+        """The number of samples n, the rows of each matrix"""
+        return self.a.shape[0]
+
+    @property
+    def num_dimensions(self) -> int:
+        """The number of dimensions k, the columns of each matrix"""
+        return self.a.shape[1]
+
+    @property
+    def num_runs(self) -> int:
+        """The total number of runs of the design"""
+        return len(self._keys) * self.num_samples
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.block(key)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def block(self, key: str, rows=slice(None)) -> np.ndarray:
+        """Create the design matrix of a given key, or some of its rows
+
+        :param key: the key of the design matrix, e.g., "ab_1"
+        :param rows: the rows of the matrix, any numpy index, by default all
+        :return: the (rows of the) design matrix, a new array
+        """
+        if key not in self._index:
+            raise KeyError(key)
+        j = self._index[key]
+        base, other = (self.b, self.a) if self._from_b[j] else \
+            (self.a, self.b)
+
+        matrix = np.array(base[rows])
+        if self._cols[j] >= 0:
+            matrix[..., self._cols[j]] = other[rows, self._cols[j]]
+
+        return matrix
+
+    def runs(self, indices) -> np.ndarray:
+        """Create the runs of the design with the given global indices
+
+        :param indices: the global run indices, an integer, an array of
+            integers, or a slice
+        :return: the runs, one row per index (a single row for an integer)
+        """
+        if isinstance(indices, slice):
+            indices = np.arange(self.num_runs)[indices]
+        indices = np.asarray(indices)
+        if np.any((indices < 0) | (indices >= self.num_runs)):
+            raise IndexError("Run index out of range!")
+
+        j, rows = np.divmod(indices, self.num_samples)
+        from_b = np.array(self._from_b)[j]
+        cols = np.array(self._cols)[j]
+
+        runs = np.where(from_b[..., np.newaxis], self.b[rows], self.a[rows])
+        replaced = cols >= 0
+        # The replaced column comes from the other matrix
+        other = np.where(from_b[replaced], self.a[rows[replaced],
+                                                  cols[replaced]],
+                         self.b[rows[replaced], cols[replaced]])
+        runs[replaced, cols[replaced]] = other
+
+        return runs
+
+
+def write(sobol_saltelli: dict, output_header: str, fmt="%1.6e",
+          output_format: str = "csv",
+          chunk_size: int = CHUNK_SIZE):
     """Write Sobol'-Saltelli design matrices into set of files according to key
 
-    The files will be written in csv format, each is a complete design matrix
+    Each design matrix is written into its own file, "{header}_{key}.{ext}",
+    in a delimited text format ("csv", "tsv", "txt") or in the numpy binary
+    format ("npy", can be memory-mapped when read). With the "npz" format, all
+    the matrices are written into a single file "{header}.npz", one array per
+    key. The output header "-" writes all the runs, in the order of the keys,
+    into the standard output as delimited text, e.g., to pipe them into a run
+    launcher.
+
+    The matrices are written by chunks of rows, a matrix of a
+    :class:`SobolSaltelliDesign` is never created as a whole, except for "npz"
+    where one matrix at a time is.
 
     :param sobol_saltelli: (dict of np.ndArray) the Sobol'-Saltelli matrices
     :param output_header: the header for the  filenames, for identifier purpose
-    :param fmt: the print format of the number
+    :param fmt: the print format of the number for the text formats
+    :param output_format: ("csv", "tsv", "txt", "npy", "npz") the format of
+        the files
+    :param chunk_size: the approximate number of values written at once
     """
+    import sys
+    import zipfile
+
+    if isinstance(sobol_saltelli, SobolSaltelliDesign):
+        rows = sobol_saltelli.block
+        num_samples = sobol_saltelli.num_samples
+        num_dimensions = sobol_saltelli.num_dimensions
+    else:
+        def rows(key, index):
+            return sobol_saltelli[key][index]
+        num_samples, num_dimensions = np.shape(sobol_saltelli["a"])
+
+    keys = list(sobol_saltelli)
+    # The chunks of rows
+    num_rows = max(chunk_size // max(num_dimensions, 1), 1)
+    chunks = [slice(i, i + num_rows) for i in range(0, num_samples, num_rows)]
+
+    if output_format == "npz":
+        fname = "{}.npz" .format(output_header)
+        with zipfile.ZipFile(fname, "w", zipfile.ZIP_STORED,
+                             allowZip64=True) as zip_file:
+            for key in keys:
+                with zip_file.open("{}.npy" .format(key), "w",
+                                   force_zip64=True) as outfile:
+                    np.lib.format.write_array(outfile, sobol_saltelli[key],
+                                              allow_pickle=False)
+        return
+
+    if output_format == "npy":
+        for key in keys:
+            fname = "{}_{}.{}" .format(output_header, key, output_format)
+            matrix = np.lib.format.open_memmap(
+                fname, mode="w+", shape=(num_samples, num_dimensions))
+            for chunk in chunks:
+                matrix[chunk] = rows(key, chunk)
+            matrix.flush()
+            del matrix
+        return
+
+    delimiter = ext_to_delimiter(output_format)
+    if output_header == "-":
+        for key in keys:
+            for chunk in chunks:
+                write_text(sys.stdout, rows(key, chunk), delimiter, fmt,
+                           chunk_size)
+        sys.stdout.flush()
+        return
 
-    for key in sobol_saltelli:
-        fname = "{}_{}.csv" .format(output_header, key)
-        np.savetxt(fname, sobol_saltelli[key], fmt=fmt, delimiter=",")
+    for key in keys:
+        fname = "{}_{}.{}" .format(output_header, key, output_format)
+        with open(fname, "wt") as outfile:
+            for chunk in chunks:
+                write_text(outfile, rows(key, chunk), delimiter, fmt,
+                           chunk_size)
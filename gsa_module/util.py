@@ -5,6 +5,8 @@
 
     Module with collection of utilities
 """
+import numpy as np
+
 
 def sniff_delimiter(input_file: str):
     """Detect the delimiter in a file"""
@@ -38,3 +40,254 @@ def ext_to_delimiter(extension: str) -> str:
                          " (Use txt, tsv, or csv)")
 
     return delimiter
+
+
+# The output formats of the design matrices, delimited text and numpy binary
+TEXT_FORMATS = ["csv", "tsv", "txt"]
+BINARY_FORMATS = ["npy", "npz"]
+OUTPUT_FORMATS = TEXT_FORMATS + BINARY_FORMATS
+
+# The approximate number of values formatted at once in the text output
+CHUNK_SIZE = 2**16
+
+
+def ext_to_format(filename: str, default: str = "csv") -> str:
+    """Get the output format of a file from its extension
+
+    :param filename: the filename, "-" for the standard output
+    :param default: the output format if the extension is not recognized
+    :return: the output format ("csv", "tsv", "txt", "npy", "npz")
+    """
+    extension = filename.split("/")[-1].split(".")[-1]
+    if filename != "-" and extension in OUTPUT_FORMATS:
+        return extension
+    elif default in OUTPUT_FORMATS:
+        return default
+    else:
+        raise ValueError("Output format not recognized!"
+                         " (Use txt, tsv, csv, npy, or npz)")
+
+
+def write_text(outfile, array: np.ndarray,
+               delimiter: str = ",",
+               fmt: str = "%1.6e",
+               chunk_size: int = CHUNK_SIZE):
+    """Write an array as delimited text, by chunks of rows
+
+    The output is the same as `np.savetxt()`, but each chunk of rows is
+    formatted at once instead of one row at a time.
+
+    :param outfile: the opened text file object
+    :param array: the array, a 1-D array is written as a single column
+    :param delimiter: the delimiter between the columns
+    :param fmt: the print format of the number
+    :param chunk_size: the approximate number of values in a chunk
+    """
+    array = np.asarray(array)
+    array = array.reshape(array.shape[0], -1)
+    num_rows = max(chunk_size // max(array.shape[1], 1), 1)
+
+    row_format = delimiter.join([fmt] * array.shape[1]) + "\n"
+    for i in range(0, array.shape[0], num_rows):
+        chunk = array[i:i+num_rows]
+        outfile.write((row_format * chunk.shape[0]) %
+                      tuple(chunk.ravel().tolist()))
+
+
+def write_array(filename: str, array: np.ndarray,
+                output_format: str = None,
+                fmt: str = "%1.6e"):
+    """Write an array into a file, in a text or numpy binary format
+
+    The binary formats keep the full precision, an `.npy` file can be
+    memory-mapped when read (`np.load(filename, mmap_mode="r")`), in an `.npz`
+    file the array is named "dm". The text formats are written by chunks
+    of rows (see :func:`write_text`). The filename "-" writes the array into
+    the standard output (text or `.npy`), e.g., to pipe it into another
+    program.
+
+    :param filename: the filename, "-" for the standard output
+    :param array: the array to write
+    :param output_format: ("csv", "tsv", "txt", "npy", "npz") by default
+        from the extension of the filename
+    :param fmt: the print format of the number for the text formats
+    """
+    import sys
+
+    if output_format is None:
+        output_format = ext_to_format(filename)
+
+    if output_format == "npy":
+        if filename == "-":
+            sys.stdout.flush()
+            np.save(sys.stdout.buffer, array)
+            sys.stdout.buffer.flush()
+        else:
+            np.save(filename, array)
+    elif output_format == "npz":
+        if filename == "-":
+            raise ValueError("npz format can't be written to standard output")
+        np.savez(filename, dm=array)
+    elif filename == "-":
+        write_text(sys.stdout, array, ext_to_delimiter(output_format), fmt)
+        sys.stdout.flush()
+    else:
+        with open(filename, "wt") as outfile:
+            write_text(outfile, array, ext_to_delimiter(output_format), fmt)
+
+
+# The approximate number of resampled values kept in memory at once
+BOOTSTRAP_CHUNK_SIZE = 2**22
+
+# The number of bootstrap replicates drawn from one spawned random stream
+BOOTSTRAP_BLOCK_SIZE = 500
+
+
+def bootstrap(statistic, outputs: list, num_bootstrap: int,
+              seed=None,
+              n_jobs: int = 1,
+              backend: str = "thread",
+              chunk_size: int = BOOTSTRAP_CHUNK_SIZE) -> np.ndarray:
+    """Compute the bootstrap samples of a statistic of the outputs
+
+    The samples are resampled with replacement, the same resampling for all
+    the outputs. The resampled indices of a chunk of bootstrap replicates are
+    drawn at once as a num_replicates * num_samples array and the statistic
+    is computed for all the replicates of the chunk as array operations. The
+    chunks are sized to keep about `chunk_size` resampled values in memory.
+
+    With a seed, the replicates are split into blocks of
+    `BOOTSTRAP_BLOCK_SIZE` replicates, each block drawing its indices from its
+    own random stream spawned from the seed (`np.random.SeedSequence`).
+    Without a seed, the indices are drawn in order from the global numpy
+    random state, the same as drawn one replicate at a time with
+    `np.random.choice(num_samples, num_samples)`. The blocks or the chunks
+    can be computed by a pool of `n_jobs` workers, in both cases the
+    bootstrap samples do not depend on the number of workers.
+
+    :param statistic: the function of the resampled outputs, each of shape
+        (..., num_replicates, num_samples), returning the statistics of each
+        replicate, num_stats * num_replicates. It must be picklable (e.g., a
+        module-level function) for the "process" backend
+    :param outputs: the list of outputs, each of shape (..., num_samples)
+    :param num_bootstrap: the number of bootstrap samples
+    :param seed: the random seed number or `np.random.SeedSequence`, None to
+        use the global numpy random state
+    :param n_jobs: the number of workers, -1 to use all the CPUs
+    :param backend: the pool of workers, "thread" (numpy releases the GIL in
+        the array operations) or "process"
+    :param chunk_size: the approximate number of resampled values in a chunk
+    :return: the bootstrap samples of the statistic, num_bootstrap * num_stats
+    """
+    import os
+
+    if backend not in ["thread", "process"]:
+        raise ValueError("Backend not supported! (Use thread or process)")
+
+    if n_jobs is None or n_jobs == 0:
+        n_jobs = 1
+    elif n_jobs < 0:
+        n_jobs = os.cpu_count()
+
+    num_smpl = outputs[0].shape[-1]
+    num_rows = sum(int(np.prod(output.shape[:-1])) for output in outputs)
+    num_replicates = max(chunk_size // (num_rows * num_smpl), 1)
+
+    if seed is None:
+        # Chunks of indices drawn in order from the global random state
+        starts = range(0, num_bootstrap, num_replicates)
+        tasks = ((_bootstrap_indices,
+                  (statistic, outputs,
+                   np.random.randint(0, num_smpl,
+                                     size=(min(num_replicates,
+                                               num_bootstrap - i),
+                                           num_smpl))))
+                 for i in starts)
+    else:
+        # Blocks of replicates with their own random streams
+        starts = range(0, num_bootstrap, BOOTSTRAP_BLOCK_SIZE)
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        tasks = ((_bootstrap_block,
+                  (statistic, outputs,
+                   min(BOOTSTRAP_BLOCK_SIZE, num_bootstrap - i),
+                   num_replicates, seed_seq))
+                 for i, seed_seq in zip(starts, seed.spawn(len(starts))))
+
+    stat_bootstrap = None
+    for i, stat in zip(starts, _run_tasks(tasks, n_jobs, backend)):
+        if stat_bootstrap is None:
+            stat_bootstrap = np.empty([num_bootstrap, stat.shape[1]])
+        stat_bootstrap[i:i+stat.shape[0]] = stat
+
+    return stat_bootstrap
+
+
+def _run_tasks(tasks, n_jobs: int, backend: str):
+    """Run the tasks on a pool of workers and yield their results in order
+
+    The tasks are taken from the iterable as the workers are available, at
+    most two tasks per worker are submitted in advance.
+
+    :param tasks: the iterable of (function, arguments) tuples
+    :param n_jobs: the number of workers
+    :param backend: the pool of workers, "thread" or "process"
+    :return: the generator of the results of the tasks
+    """
+    from collections import deque
+
+    if n_jobs == 1:
+        for func, args in tasks:
+            yield func(*args)
+        return
+
+    if backend == "thread":
+        from concurrent.futures import ThreadPoolExecutor as Executor
+    else:
+        from concurrent.futures import ProcessPoolExecutor as Executor
+
+    with Executor(max_workers=n_jobs) as executor:
+        futures = deque()
+        for func, args in tasks:
+            futures.append(executor.submit(func, *args))
+            if len(futures) >= 2 * n_jobs:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+
+def _bootstrap_indices(statistic, outputs: list,
+                       idx: np.ndarray) -> np.ndarray:
+    """Compute the statistic of the outputs resampled by a chunk of indices
+
+    :param statistic: the function of the resampled outputs
+    :param outputs: the list of outputs, each of shape (..., num_samples)
+    :param idx: the resampled indices, num_replicates * num_samples
+    :return: the statistic, num_replicates * num_stats
+    """
+    return np.atleast_2d(statistic(*[output[..., idx]
+                                     for output in outputs])).T
+
+
+def _bootstrap_block(statistic, outputs: list, num_bootstrap: int,
+                     num_replicates: int,
+                     seed_seq: np.random.SeedSequence) -> np.ndarray:
+    """Compute the statistic for a block of replicates with its own stream
+
+    :param statistic: the function of the resampled outputs
+    :param outputs: the list of outputs, each of shape (..., num_samples)
+    :param num_bootstrap: the number of replicates in the block
+    :param num_replicates: the number of replicates in a chunk
+    :param seed_seq: the seed sequence of the random stream of the block
+    :return: the statistic, num_bootstrap * num_stats
+    """
+    rng = np.random.default_rng(seed_seq)
+    num_smpl = outputs[0].shape[-1]
+
+    return np.vstack([
+        _bootstrap_indices(statistic, outputs,
+                           rng.integers(0, num_smpl,
+                                        size=(min(num_replicates,
+                                                  num_bootstrap - i),
+                                              num_smpl)))
+        for i in range(0, num_bootstrap, num_replicates)])
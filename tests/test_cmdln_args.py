@@ -0,0 +1,37 @@
+"""Unit test class to test the parsing of the command line arguments
+"""
+import unittest
+from unittest import mock
+from gsa_module.samples import cmdln_args as samples_cmdln_args
+from gsa_module.morris import cmdln_args as morris_cmdln_args
+
+__author__ = "Damar Wicaksono"
+
+
+class CmdlnArgsTestCase(unittest.TestCase):
+    """Tests for the command line arguments of gsa_module"""
+
+    def parse(self, get_inputs, argv: list) -> dict:
+        """Parse the command line arguments of a command line interface"""
+        with mock.patch("sys.argv", ["gsa"] + argv):
+            return get_inputs()
+
+    def test_does_output_format_option_win_over_extension(self):
+        """Is the output format option used instead of the extension?"""
+        for get_inputs, argv in [
+                (samples_cmdln_args.get_create_sample,
+                 ["-n", "10", "-d", "2"]),
+                (morris_cmdln_args.get_create_sample,
+                 ["-r", "4", "-d", "2"])]:
+            inputs = self.parse(get_inputs,
+                                argv + ["-of", "npy", "-o", "design.csv"])
+            self.assertEqual(inputs["output_format"], "npy")
+            inputs = self.parse(get_inputs, argv + ["-o", "design.npz"])
+            self.assertEqual(inputs["output_format"], "npz")
+            inputs = self.parse(get_inputs,
+                                argv + ["-sep", "tsv", "-o", "design.dat"])
+            self.assertEqual(inputs["output_format"], "tsv")
+
+
+if __name__ == "__main__":
+    unittest.main()
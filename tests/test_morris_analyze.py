@@ -0,0 +1,61 @@
+"""Unit test class to test the analysis of the Morris experimental runs
+"""
+import unittest
+import numpy as np
+from gsa_module.morris import analyze, sample
+
+__author__ = "Damar Wicaksono"
+
+
+class MorrisAnalyzeTestCase(unittest.TestCase):
+    """Tests for gsa_module.morris.analyze"""
+
+    def setUp(self):
+        """Test fixture build"""
+        self.r = 20
+        self.k = 5
+        self.xx = sample.trajectory(self.r, self.k, 4, 1597)
+        self.xx_rescaled = 2.0 * self.xx - 1.0
+        self.y = np.sum(self.xx**2 * np.arange(1, self.k+1), axis=1) + \
+            self.xx[:, 0] * self.xx[:, 1]
+        self.num_bootstrap = 200
+
+    def test_is_bootstrap_the_same_as_loop(self):
+        """Is the vectorized bootstrap the same as one sample at a time?"""
+        for xx_rescaled in [None, self.xx_rescaled]:
+            ee, see = analyze.trajectory_ee(self.xx, self.y, xx_rescaled)
+            np.random.seed(1597)
+            expected = np.empty([self.num_bootstrap, self.k, 6])
+            for i in range(self.num_bootstrap):
+                idx = np.random.choice(self.r, self.r, replace=True)
+                expected[i] = analyze.ee_statistics(
+                    ee[idx], None if see is None else see[idx])
+            np.random.seed(1597)
+            estimates, bootstrap = analyze.ee(self.xx, self.y,
+                                              self.num_bootstrap, xx_rescaled)
+            self.assertTrue(np.allclose(estimates,
+                                        analyze.ee_statistics(ee, see)))
+            self.assertTrue(np.allclose(bootstrap, expected,
+                                        rtol=1e-10, atol=1e-12))
+
+    def test_is_bootstrap_independent_of_jobs(self):
+        """Is the seeded bootstrap the same for any number of threads?"""
+        expected = analyze.ee(self.xx, self.y, self.num_bootstrap,
+                              self.xx_rescaled, seed=1597)[1]
+        for n_jobs in [2, -1]:
+            bootstrap = analyze.ee(self.xx, self.y, self.num_bootstrap,
+                                   self.xx_rescaled, seed=1597,
+                                   n_jobs=n_jobs)[1]
+            self.assertTrue(np.array_equal(bootstrap, expected))
+        self.assertEqual(expected.shape, (self.num_bootstrap, self.k, 6))
+
+    def test_are_missing_standardized_statistics_zero(self):
+        """Are the standardized statistics zero without rescaled inputs?"""
+        estimates, bootstrap = analyze.ee(self.xx, self.y, self.num_bootstrap)
+        self.assertTrue(np.all(estimates[:, 3:] == 0.0))
+        self.assertTrue(np.all(bootstrap[:, :, 3:] == 0.0))
+        self.assertTrue(np.all(estimates[:, 1] > 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
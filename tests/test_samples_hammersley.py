@@ -0,0 +1,69 @@
+"""Unit test class to test the vectorized Hammersley and Halton sequences
+"""
+import unittest
+import numpy as np
+from gsa_module.samples import hammersley
+
+__author__ = "Damar Wicaksono"
+
+
+class HammersleyTestCase(unittest.TestCase):
+    """Tests for gsa_module.samples.hammersley"""
+
+    def setUp(self):
+        """Test fixture build"""
+        self.n = 200
+        self.d = 6
+
+    def test_are_primes_correct(self):
+        """Are the prime numbers from the sieve correct?"""
+        primes = hammersley.first_primes(1000)
+        self.assertEqual(primes.shape[0], 1000)
+        self.assertEqual(primes[-1], 7919)
+        for p in primes[:100]:
+            self.assertTrue(all(p % q != 0 for q in range(2, p)))
+        self.assertEqual(hammersley.first_primes(1).tolist(), [2])
+
+    def test_is_radical_inverse_same_as_scalar(self):
+        """Is the vectorized radical inverse the same as one at a time?"""
+        indices = np.arange(1000)
+        for base in [2, 3, 7, 659, 7919]:
+            phi = hammersley.radical_inverse(indices, base)
+            for k in indices:
+                self.assertEqual(phi[k], hammersley.get_phi(base, k))
+
+    def test_is_hammersley_correct(self):
+        """Is the Hammersley sequence made of the grid and radical inverses?"""
+        dm = hammersley.create(self.n, 150)
+        self.assertTrue(np.array_equal(dm[:, 0], np.arange(self.n) / self.n))
+        self.assertEqual(dm[7, 149], hammersley.get_phi(859, 7))
+        self.assertEqual(list(hammersley.generate_hammersley(self.n, 3)),
+                         dm[:, :3].tolist())
+
+    def test_is_halton_engine_draw_in_blocks_same_as_create(self):
+        """Is drawing the Halton points in blocks the same as at once?"""
+        for random_start, scramble in [(False, False), (True, False),
+                                       (False, True), (True, True)]:
+            dm = hammersley.create_halton(self.n, self.d, random_start,
+                                          scramble, seed=1357)
+            engine = hammersley.HaltonEngine(self.d, random_start, scramble,
+                                             seed=1357)
+            dm_blocks = np.vstack([engine.draw(m) for m in [1, 99, 0, 100]])
+            self.assertTrue(np.array_equal(dm, dm_blocks))
+            engine.reset().fast_forward(50)
+            self.assertTrue(np.array_equal(engine.draw(10), dm[50:60]))
+            self.assertTrue(np.all(dm >= 0.0) and np.all(dm < 1.0))
+
+    def test_is_scrambled_halton_stratified(self):
+        """Is the scrambled Halton sequence still stratified in each base?"""
+        dm = hammersley.create_halton(3**5, 2, scramble=True, seed=2468)
+        self.assertFalse(np.array_equal(
+            dm, hammersley.create_halton(3**5, 2)))
+        strata = np.sort(np.floor(dm[:3**5, 1] * 3**5))
+        self.assertTrue(np.array_equal(strata, np.arange(3**5)))
+        strata = np.sort(np.floor(dm[:2**7, 0] * 2**7))
+        self.assertTrue(np.array_equal(strata, np.arange(2**7)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""Unit test class to test the vectorized Latin Hypercube design generator
+"""
+import unittest
+import numpy as np
+from gsa_module.samples import lhs
+
+__author__ = "Damar Wicaksono"
+
+
+class LHSTestCase(unittest.TestCase):
+    """Tests for gsa_module.samples.lhs"""
+
+    def setUp(self):
+        """Test fixture build"""
+        self.seed = 7893457     # Seed number
+        self.n = 100            # Number of samples
+        self.d = 20             # Number of dimension
+        self.dm = lhs.create(self.n, self.d, self.seed)
+
+    def test_is_shape_correct(self):
+        """Is the design n-by-d?"""
+        self.assertEqual(self.dm.shape, (self.n, self.d))
+
+    def test_is_dm_stratified(self):
+        """Is each 1/n interval represented exactly once in every column?"""
+        for j in range(self.d):
+            strata = np.sort(np.floor(self.dm[:, j] * self.n))
+            self.assertTrue(np.array_equal(strata, np.arange(self.n)))
+
+    def test_is_dm_repeatable(self):
+        """Is the design matrix repeatable given the same seed number?"""
+        dm = lhs.create(self.n, self.d, self.seed)
+        self.assertTrue(np.array_equal(dm, self.dm))
+
+    def test_is_replicates_independent_lhs(self):
+        """Are the replicates independent designs each in LHS class?"""
+        dm = lhs.create(self.n, self.d, self.seed, num_replicates=5)
+        self.assertEqual(dm.shape, (5, self.n, self.d))
+        for r in range(5):
+            for j in range(self.d):
+                strata = np.sort(np.floor(dm[r, :, j] * self.n))
+                self.assertTrue(np.array_equal(strata, np.arange(self.n)))
+        self.assertFalse(np.array_equal(dm[0], dm[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,346 @@
+"""Unit test class to test the optimization of Latin Hypercube design
+"""
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+from gsa_module.samples import lhs, lhs_opt
+from gsa_module.samples.opt_alg import objective_functions
+from gsa_module.samples.opt_alg import stochastic_evolutionary
+from gsa_module.samples.opt_alg import simulated_annealing
+
+__author__ = "Damar Wicaksono"
+
+
+class LHSOptTestCase(unittest.TestCase):
+    """Tests for gsa_module.samples.lhs_opt and gsa_module.samples.opt_alg"""
+
+    def setUp(self):
+        """Test fixture build"""
+        self.seed = 43576       # Seed number
+        self.n = 30             # Number of samples
+        self.d = 4              # Number of dimension
+        self.dm = lhs.create(self.n, self.d, self.seed)
+
+    def test_is_w2_incremental_update_correct(self):
+        """Is the incremental discrepancy the same as the full evaluation?"""
+        obj_state = objective_functions.W2Discrepancy(self.dm.copy())
+        self.assertAlmostEqual(
+            obj_state.value,
+            objective_functions.w2_discrepancy_fast(self.dm), places=12)
+        rng = np.random.RandomState(self.seed)
+        for _ in range(50):
+            col = rng.randint(self.d)
+            row_1, row_2 = rng.choice(self.n, 2, replace=False)
+            dm_try = obj_state.D.copy()
+            dm_try[[row_1, row_2], col] = dm_try[[row_2, row_1], col]
+            obj_func_try = objective_functions.w2_discrepancy_fast(dm_try)
+            self.assertAlmostEqual(obj_state.try_swap(col, row_1, row_2),
+                                   obj_func_try, places=12)
+            self.assertAlmostEqual(obj_state.swap(col, row_1, row_2),
+                                   obj_func_try, places=12)
+            self.assertTrue(np.array_equal(obj_state.D, dm_try))
+
+    def test_is_w2_batched_update_correct(self):
+        """Is the batched evaluation of exchanges the same as one by one?"""
+        obj_state = objective_functions.W2Discrepancy(self.dm.copy())
+        rows_1 = np.array([0, 5, 7, 29, 3])
+        rows_2 = np.array([1, 2, 20, 0, 4])
+        obj_func_try = obj_state.try_swaps(2, rows_1, rows_2)
+        for i in range(rows_1.shape[0]):
+            dm_try = self.dm.copy()
+            dm_try[[rows_1[i], rows_2[i]], 2] = dm_try[[rows_2[i], rows_1[i]], 2]
+            self.assertAlmostEqual(
+                obj_func_try[i],
+                objective_functions.w2_discrepancy_fast(dm_try), places=12)
+        self.assertTrue(np.array_equal(obj_state.D, self.dm))
+
+    def test_is_w2_blocked_same_as_full(self):
+        """Is the discrepancy computed by tiles the same for any tile size?"""
+        w2_ref = objective_functions.w2_discrepancy(self.dm)
+        for block_size in [1, 7, 30, 100]:
+            for n_jobs in [1, 3]:
+                self.assertAlmostEqual(
+                    objective_functions.w2_discrepancy_fast(
+                        self.dm, block_size, n_jobs), w2_ref, places=14)
+
+    def test_are_objective_functions_correct(self):
+        """Are the objective functions the same as their definitions?"""
+        dm = self.dm[:10]
+        z = np.abs(dm - 0.5)
+        pairs = [(i, j) for i in range(10) for j in range(10)]
+        cd_ref = (13/12)**self.d - 2/10 * np.sum(
+            np.prod(1 + 0.5*z - 0.5*z**2, axis=1)) + 1/100 * sum(
+            np.prod(1 + 0.5*z[i] + 0.5*z[j] - 0.5*np.abs(dm[i] - dm[j]))
+            for i, j in pairs)
+        md_ref = (19/12)**self.d - 2/10 * np.sum(
+            np.prod(5/3 - 0.25*z - 0.25*z**2, axis=1)) + 1/100 * sum(
+            np.prod(15/8 - 0.25*z[i] - 0.25*z[j] -
+                    0.75*np.abs(dm[i] - dm[j]) + 0.5*(dm[i] - dm[j])**2)
+            for i, j in pairs)
+        phi_p_ref = sum(np.linalg.norm(dm[i] - dm[j])**-50
+                        for i, j in pairs if i < j)**(1/50)
+        self.assertAlmostEqual(
+            objective_functions.centered_l2_discrepancy(dm), cd_ref, places=12)
+        self.assertAlmostEqual(
+            objective_functions.mixture_discrepancy(dm), md_ref, places=12)
+        self.assertAlmostEqual(objective_functions.phi_p(dm, block_size=3),
+                               phi_p_ref, delta=1e-12*phi_p_ref)
+
+    def test_are_incremental_updates_correct(self):
+        """Is the incremental update of all the objective functions correct?"""
+        rng = np.random.RandomState(self.seed)
+        for name, (obj_func, obj_class) in \
+                objective_functions.OBJECTIVE_FUNCTIONS.items():
+            for obj_state in [obj_class(self.dm.copy())] + \
+                    ([obj_class(self.dm.copy(), full_matrix=False)]
+                     if name == "phi_p" else []):
+                cols = rng.randint(self.d, size=20)
+                rows_1 = rng.randint(self.n, size=20)
+                rows_2 = (rows_1 + rng.randint(1, self.n, size=20)) % self.n
+                obj_func_try = obj_state.try_swaps(cols, rows_1, rows_2)
+                for i in range(20):
+                    dm_try = self.dm.copy()
+                    dm_try[[rows_1[i], rows_2[i]], cols[i]] = \
+                        dm_try[[rows_2[i], rows_1[i]], cols[i]]
+                    obj_func_ref = obj_func(dm_try)
+                    self.assertAlmostEqual(obj_func_try[i], obj_func_ref,
+                                           delta=1e-8*obj_func_ref)
+                # Accepted exchanges are always exact
+                for i in range(50):
+                    col = rng.randint(self.d)
+                    row_1, row_2 = rng.choice(self.n, 2, replace=False)
+                    dm_try = obj_state.D.copy()
+                    dm_try[[row_1, row_2], col] = dm_try[[row_2, row_1], col]
+                    obj_func_ref = obj_func(dm_try)
+                    self.assertAlmostEqual(obj_state.swap(col, row_1, row_2),
+                                           obj_func_ref,
+                                           delta=1e-12*obj_func_ref)
+
+    def test_are_pairwise_products_symmetric(self):
+        """Are the updated products exactly the ones of a new state?"""
+        for obj_func, obj_class in \
+                objective_functions.OBJECTIVE_FUNCTIONS.values():
+            if not issubclass(obj_class,
+                              objective_functions.ProductDiscrepancy):
+                continue
+            product = obj_class.pair_products(self.dm, self.dm)
+            self.assertTrue(np.array_equal(product, product.T))
+            obj_state = obj_class(self.dm.copy())
+            for col, row_1, row_2 in [(0, 3, 17), (2, 5, 29), (1, 0, 3)]:
+                obj_state.swap(col, row_1, row_2)
+            obj_state.refresh()
+            new_state = obj_class(obj_state.D.copy())
+            self.assertTrue(np.array_equal(obj_state._product,
+                                           new_state._product))
+            self.assertEqual(obj_state.value, new_state.value)
+
+    def test_is_optimized_maximin_design_better(self):
+        """Is the design optimized with phi_p criterion better?"""
+        for create in [lhs_opt.create_ese, lhs_opt.create_sa]:
+            dm_opt = create(self.n, self.d, self.seed, max_outer=3,
+                            obj_function="phi_p")
+            self.assertLess(objective_functions.phi_p(dm_opt),
+                            objective_functions.phi_p(self.dm))
+        self.assertRaises(TypeError, lhs_opt.create_ese, self.n, self.d,
+                          self.seed, 3, "other")
+
+    def test_are_sampled_pairs_distinct(self):
+        """Are the sampled pairs of rows distinct and valid?"""
+        np.random.seed(self.seed)
+        for n, num_pairs in [(self.n, 50), (4, 6), (4, 10), (10**6, 50)]:
+            pairs = stochastic_evolutionary.sample_pairs(n, num_pairs)
+            self.assertEqual(pairs.shape,
+                             (min(num_pairs, n * (n - 1) // 2), 2))
+            self.assertTrue(np.all(pairs[:, 0] < pairs[:, 1]))
+            self.assertTrue(np.all(pairs >= 0) and np.all(pairs < n))
+            self.assertEqual(np.unique(pairs[:, 0] * n + pairs[:, 1]).shape[0],
+                             pairs.shape[0])
+
+    def test_is_number_of_pairs_correct(self):
+        """Are the number of candidates and inner iterations correct?"""
+        self.assertEqual(stochastic_evolutionary.calc_num_pairs(self.n), 435)
+        self.assertEqual(stochastic_evolutionary.calc_num_candidate(self.n), 50)
+        self.assertEqual(stochastic_evolutionary.calc_num_candidate(3), 1)
+        self.assertEqual(stochastic_evolutionary.calc_max_inner(self.n, 4), 69)
+        # No overflow for large designs
+        self.assertEqual(stochastic_evolutionary.calc_max_inner(10**5, 10), 100)
+
+    def test_is_w2_multi_column_update_correct(self):
+        """Is the evaluation of exchanges in different columns correct?"""
+        obj_state = objective_functions.W2Discrepancy(self.dm.copy())
+        cols = np.array([0, 3, 1, 3, 2])
+        rows_1 = np.array([0, 5, 7, 29, 3])
+        rows_2 = np.array([1, 2, 20, 0, 4])
+        obj_func_try = obj_state.try_swaps(cols, rows_1, rows_2)
+        for i in range(rows_1.shape[0]):
+            self.assertAlmostEqual(
+                obj_func_try[i],
+                obj_state.try_swap(cols[i], rows_1[i], rows_2[i]), places=12)
+
+    def test_is_annealing_same_as_one_exchange_at_a_time(self):
+        """Is the block evaluation of exchanges the same as one at a time?"""
+        temperature, cooling_factor, max_inner, max_outer = 1e-5, 0.8, 200, 3
+        np.random.seed(self.seed)
+        opt_sol = simulated_annealing.optimize(self.dm, "w2_discrepancy",
+                                               temperature, cooling_factor,
+                                               max_inner, max_outer)
+        # Reference, evaluate and accept the exchanges one at a time
+        np.random.seed(self.seed)
+        obj_state = objective_functions.W2Discrepancy(self.dm.copy())
+        try_evol = []
+        for _ in range(max_outer):
+            cols = np.random.randint(0, self.d, size=max_inner)
+            rows_1 = np.random.randint(0, self.n, size=max_inner)
+            rows_2 = (rows_1 + np.random.randint(1, self.n, size=max_inner)) \
+                % self.n
+            log_rand = np.log(np.random.rand(max_inner))
+            for i in range(max_inner):
+                obj_func_try = obj_state.try_swap(cols[i], rows_1[i],
+                                                  rows_2[i])
+                if obj_func_try - obj_state.value <= \
+                        -temperature * log_rand[i]:
+                    try_evol.append(
+                        obj_state.swap(cols[i], rows_1[i], rows_2[i]))
+            obj_state.refresh()
+            temperature *= cooling_factor
+        self.assertGreater(len(try_evol), 0)
+        self.assertTrue(np.allclose(opt_sol.try_evol, try_evol,
+                                    rtol=0, atol=1e-12))
+
+    def test_is_annealed_design_better(self):
+        """Is the design optimized by simulated annealing a better LHS?"""
+        dm_opt = lhs_opt.create_sa(self.n, self.d, self.seed, max_outer=5)
+        for j in range(self.d):
+            self.assertTrue(np.array_equal(np.sort(dm_opt[:, j]),
+                                           np.sort(self.dm[:, j])))
+        self.assertLess(objective_functions.w2_discrepancy_fast(dm_opt),
+                        objective_functions.w2_discrepancy_fast(self.dm))
+
+    def test_is_optimized_design_better(self):
+        """Is the optimized design a LHS with lower discrepancy?"""
+        dm_opt = lhs_opt.create_ese(self.n, self.d, self.seed, max_outer=5)
+        for j in range(self.d):
+            self.assertTrue(np.array_equal(np.sort(dm_opt[:, j]),
+                                           np.sort(self.dm[:, j])))
+        self.assertLess(objective_functions.w2_discrepancy_fast(dm_opt),
+                        objective_functions.w2_discrepancy_fast(self.dm))
+
+    def test_is_resumed_optimization_same_as_uninterrupted(self):
+        """Is the optimization resumed from a checkpoint exactly?"""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            for obj_function in objective_functions.OBJECTIVE_FUNCTIONS:
+                checkpoint = os.path.join(tmp_dir,
+                                          "ese_{}.npz" .format(obj_function))
+                dm_ref = lhs_opt.create_ese(self.n, self.d, self.seed,
+                                            max_outer=6,
+                                            obj_function=obj_function)
+                # Interrupted after 3 outer iterations, then resumed
+                lhs_opt.create_ese(self.n, self.d, self.seed, max_outer=3,
+                                   obj_function=obj_function,
+                                   checkpoint=checkpoint)
+                dm_opt = lhs_opt.create_ese(self.n, self.d, None, max_outer=6,
+                                            obj_function=obj_function,
+                                            checkpoint=checkpoint,
+                                            checkpoint_every=2)
+                self.assertTrue(np.array_equal(dm_opt, dm_ref), obj_function)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_are_stopping_rules_resumed(self):
+        """Are the stalling window and the wall time resumed?"""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            checkpoint = os.path.join(tmp_dir, "ese.npz")
+            telemetry = stochastic_evolutionary.Telemetry()
+            lhs_opt.create_ese(self.n, self.d, self.seed, max_outer=1000,
+                               stall_outer=3, stall_tol=np.inf,
+                               callback=telemetry)
+            self.assertEqual(telemetry.records[-1]["outer"], 3)
+            # Interrupted after 2 outer iterations, the stall window goes on
+            lhs_opt.create_ese(self.n, self.d, self.seed, max_outer=2,
+                               checkpoint=checkpoint)
+            with np.load(checkpoint) as data:
+                elapsed_time = float(data["elapsed_time"])
+                self.assertEqual(data["best_history"].shape[0], 3)
+            self.assertGreater(elapsed_time, 0.0)
+            telemetry = stochastic_evolutionary.Telemetry()
+            lhs_opt.create_ese(self.n, self.d, None, max_outer=1000,
+                               checkpoint=checkpoint, stall_outer=3,
+                               stall_tol=np.inf, callback=telemetry)
+            self.assertEqual([r["outer"] for r in telemetry.records], [3])
+            self.assertGreater(telemetry.records[-1]["elapsed_time"],
+                               elapsed_time)
+            # The wall time budget is already spent
+            telemetry = stochastic_evolutionary.Telemetry()
+            lhs_opt.create_ese(self.n, self.d, None, max_outer=1000,
+                               checkpoint=checkpoint, max_time=elapsed_time,
+                               callback=telemetry)
+            self.assertEqual(len(telemetry.records), 1)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_are_stopping_rules_and_telemetry_working(self):
+        """Are the optimization progress recorded and the stopping rules met?"""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmp_dir, "telemetry.csv")
+            telemetry = stochastic_evolutionary.Telemetry(3, filename)
+            lhs_opt.create_ese(self.n, self.d, self.seed, max_outer=5,
+                               callback=telemetry)
+            self.assertEqual([r["outer"] for r in telemetry.records],
+                             [3, 4, 5])
+            log = np.genfromtxt(filename, delimiter=",", names=True)
+            self.assertEqual(log.shape[0], 5)
+            self.assertTrue(np.all(np.diff(log["obj_func_best"]) <= 0))
+            self.assertTrue(np.all(log["n_improved"] <= log["n_accepted"]))
+            # Evaluation budget, each inner iteration evaluates 50 candidates
+            telemetry = stochastic_evolutionary.Telemetry()
+            lhs_opt.create_ese(self.n, self.d, self.seed, max_outer=100,
+                               max_inner=10, max_evaluations=1500,
+                               callback=telemetry)
+            self.assertEqual(telemetry.records[-1]["num_evaluations"], 1500)
+            # Only the distinct pairs are evaluated, 10 pairs of 5 samples
+            telemetry = stochastic_evolutionary.Telemetry()
+            lhs_opt.create_ese(5, self.d, self.seed, max_outer=3,
+                               num_exchanges=50, max_inner=2,
+                               callback=telemetry)
+            self.assertEqual([r["num_evaluations"] for r in telemetry.records],
+                             [20, 40, 60])
+            # Stalling
+            telemetry = stochastic_evolutionary.Telemetry()
+            lhs_opt.create_ese(self.n, self.d, self.seed, max_outer=1000,
+                               stall_outer=3, stall_tol=np.inf,
+                               callback=telemetry)
+            self.assertEqual(len(telemetry.records), 3)
+            # Callback requesting to stop
+            opt_sol = stochastic_evolutionary.optimize(
+                self.dm, "w2_discrepancy", 0, 0, 0, 100, [0.1, 0.8],
+                [0.1, 0.8, 0.9, 0.7], callback=lambda record: True,
+                max_evol=2)
+            self.assertLessEqual(len(opt_sol.try_evol), 2)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_is_multistart_independent_of_n_jobs(self):
+        """Is the multi-start optimization the same for any number of jobs?"""
+        dm_1 = lhs_opt.create_ese_multistart(self.n, self.d, self.seed,
+                                             max_outer=2, num_starts=3)
+        dm_2 = lhs_opt.create_ese_multistart(self.n, self.d, self.seed,
+                                             max_outer=2, num_starts=3,
+                                             n_jobs=2)
+        self.assertTrue(np.array_equal(dm_1, dm_2))
+        # The best of the chains
+        seeds = [int(seed_seq.generate_state(1)[0]) for seed_seq in
+                 np.random.SeedSequence(self.seed).spawn(3)]
+        obj_funcs = [objective_functions.w2_discrepancy_fast(
+            lhs_opt.create_ese(self.n, self.d, seed, max_outer=2))
+            for seed in seeds]
+        self.assertAlmostEqual(objective_functions.w2_discrepancy_fast(dm_1),
+                               min(obj_funcs), places=12)
+
+
+if __name__ == "__main__":
+    unittest.main()
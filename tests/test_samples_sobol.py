@@ -0,0 +1,182 @@
+"""Unit test class to test the vectorized Sobol' sequence generator
+"""
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+from gsa_module.samples import sobol
+
+__author__ = "Damar Wicaksono"
+
+
+class SobolTestCase(unittest.TestCase):
+    """Tests for gsa_module.samples.sobol"""
+
+    def setUp(self):
+        """Test fixture build"""
+        self.n = 100
+        self.d = 20
+        self.benchmark = np.loadtxt(
+            os.path.join(os.path.dirname(os.path.dirname(
+                os.path.abspath(__file__))), "sobol_gen", "benchmark.txt"),
+            skiprows=1)
+        # Cache the direction numbers tables in a temporary directory
+        self.cache_env = os.environ.get("GSA_MODULE_CACHE")
+        self.cache_dir = tempfile.mkdtemp()
+        os.environ["GSA_MODULE_CACHE"] = self.cache_dir
+
+    def tearDown(self):
+        """Test fixture destroy"""
+        if self.cache_env is None:
+            del os.environ["GSA_MODULE_CACHE"]
+        else:
+            os.environ["GSA_MODULE_CACHE"] = self.cache_env
+        shutil.rmtree(self.cache_dir)
+
+    def test_is_dm_same_as_the_benchmark(self):
+        """Is the design matrix bit-identical to the reference?"""
+        dm = sobol.create(self.n, self.d)
+        self.assertTrue(np.array_equal(dm, self.benchmark))
+
+    def test_is_nominal_excluded(self):
+        """Is the nominal point {0.5} removed from the design?"""
+        dm = sobol.create(self.n, self.d, excl_nom=True)
+        self.assertEqual(dm.shape[0], self.n)
+        self.assertTrue(np.array_equal(dm[0], self.benchmark[0]))
+        self.assertTrue(np.array_equal(dm[1:self.n-1], self.benchmark[2:]))
+
+    def test_is_graycode_index_correct(self):
+        """Is the index of the first zero bit computed correctly?"""
+        c = sobol.graycode_index(1000)
+        for i in range(1000):
+            value = i
+            c_ref = 1
+            while value & 1:
+                value >>= 1
+                c_ref += 1
+            self.assertEqual(c[i], c_ref)
+
+    def test_is_single_sample_zero(self):
+        """Is a design of a single sample equal to zero?"""
+        dm = sobol.create(1, self.d)
+        self.assertTrue(np.array_equal(dm, np.zeros([1, self.d])))
+
+    def test_is_engine_draw_in_blocks_same_as_create(self):
+        """Is drawing the points in blocks the same as drawing at once?"""
+        engine = sobol.SobolEngine(self.d)
+        dm = np.vstack([engine.draw(m) for m in [1, 0, 17, 32, 50]])
+        self.assertEqual(engine.num_generated, self.n)
+        self.assertTrue(np.array_equal(dm, self.benchmark))
+
+    def test_is_engine_fast_forward_correct(self):
+        """Is skipping points the same as drawing and discarding them?"""
+        engine = sobol.SobolEngine(self.d)
+        for k in [0, 1, 2, 31, 64, 99]:
+            dm = engine.reset().fast_forward(k).draw(self.n - k)
+            self.assertTrue(np.array_equal(dm, self.benchmark[k:]))
+
+    def test_is_engine_randomization_consistent(self):
+        """Is the random shift the same across blocks and with create()?"""
+        engine = sobol.SobolEngine(self.d, randomize=True, seed=1234)
+        dm = np.vstack([engine.draw(40), engine.draw(60)])
+        dm_ref = sobol.create(self.n, self.d, randomize=True, seed=1234)
+        self.assertTrue(np.array_equal(dm, dm_ref))
+
+    def test_is_too_many_samples_acceptable(self):
+        """Is drawing beyond 2**32 points acceptable?"""
+        engine = sobol.SobolEngine(self.d).fast_forward(2**32 - 1)
+        self.assertRaises(ValueError, engine.draw, 2)
+
+    def test_is_direction_table_cached(self):
+        """Is the direction numbers table cached and invalidated correctly?"""
+        cache_dir = tempfile.mkdtemp()
+        try:
+            # A custom (truncated) copy of the built-in direction numbers file
+            # (49 lines of copyright and header, followed by 30 dimensions)
+            dirnumfile = os.path.join(cache_dir, "dirnum.txt")
+            with open(sobol.DIRNUMFILE, "rt") as f:
+                lines = [next(f) for _ in range(49 + 30)]
+            with open(dirnumfile, "wt") as f:
+                f.writelines(lines)
+            table = sobol.load_direction_table(dirnumfile, cache_dir)
+            self.assertEqual(table.shape, (31, 32))
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+            # Modifying the file creates a new cache file
+            with open(dirnumfile, "wt") as f:
+                f.writelines(lines[:49 + 20])
+            os.utime(dirnumfile, ns=(0, 0))
+            table = sobol.load_direction_table(dirnumfile, cache_dir)
+            self.assertEqual(table.shape, (21, 32))
+            self.assertEqual(len(os.listdir(cache_dir)), 3)
+            # The cached table gives the same design
+            dm = sobol.create(self.n, self.d, dirnum=dirnumfile)
+            self.assertTrue(np.array_equal(dm, self.benchmark))
+            self.assertRaises(ValueError, sobol.create, self.n, 22, dirnumfile)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_is_scrambling_preserving_stratification(self):
+        """Is each scrambled replicate still stratified in every dimension?"""
+        n = 256
+        dm = sobol.create(n, self.d)
+        for method in ["owen", "lms"]:
+            dm_scr = sobol.scramble(dm, method, num_replicates=4, seed=8910)
+            self.assertEqual(dm_scr.shape, (4, n, self.d))
+            for r in range(4):
+                self.assertFalse(np.array_equal(dm_scr[r], dm))
+                for j in range(self.d):
+                    strata = np.sort(np.floor(dm_scr[r, :, j] * n))
+                    self.assertTrue(np.array_equal(strata, np.arange(n)))
+
+    def test_is_scrambling_repeatable(self):
+        """Is the scrambled design repeatable given the same seed number?"""
+        dm = sobol.create(self.n, self.d)
+        for method in ["owen", "lms"]:
+            dm_1 = sobol.scramble(dm, method, num_replicates=2, seed=12)
+            dm_2 = sobol.scramble(dm, method, num_replicates=2, seed=12)
+            self.assertTrue(np.array_equal(dm_1, dm_2))
+            self.assertFalse(np.array_equal(dm_1[0], dm_1[1]))
+
+    def test_is_unknown_scrambling_acceptable(self):
+        """Is an unknown scrambling method acceptable?"""
+        dm = sobol.create(self.n, self.d)
+        self.assertRaises(ValueError, sobol.scramble, dm, "other")
+
+    def test_is_64bit_prefix_same_as_32bit(self):
+        """Is the 64-bit generator identical to the 32-bit one up to 2**32?"""
+        dm = sobol.create(self.n, self.d, bits=64)
+        self.assertTrue(np.array_equal(dm, self.benchmark))
+        engine_32 = sobol.SobolEngine(self.d).fast_forward(2**32 - 10)
+        engine_64 = sobol.SobolEngine(self.d, bits=64).fast_forward(2**32 - 10)
+        self.assertTrue(np.array_equal(engine_32.draw(10), engine_64.draw(10)))
+
+    def test_is_64bit_beyond_2_32_samples(self):
+        """Is the 64-bit generator able to go beyond 2**32 samples?"""
+        engine = sobol.SobolEngine(self.d, bits=64).fast_forward(2**32 - 1)
+        dm = engine.draw(self.n)
+        self.assertEqual(engine.num_generated, 2**32 - 1 + self.n)
+        self.assertEqual(np.unique(dm[:, 0]).shape[0], self.n)
+        self.assertTrue(np.all(dm < 1.0) and np.all(dm >= 0.0))
+        self.assertRaises(ValueError, sobol.SobolEngine, self.d, None,
+                          False, None, 16)
+
+    def test_is_column_range_same_as_full_design(self):
+        """Is a range of columns identical to the same columns of the design?"""
+        for j0, j1 in [(0, 1), (5, 12), (19, 20), (0, self.d)]:
+            dm = sobol.create(self.n, self.d, columns=(j0, j1))
+            self.assertTrue(np.array_equal(dm, self.benchmark[:, j0:j1]))
+        self.assertRaises(ValueError, sobol.create, self.n, self.d,
+                          columns=(5, 21))
+
+    def test_is_parallel_same_as_serial(self):
+        """Is the design generated by worker processes the same as serial?"""
+        dm = sobol.create(self.n, self.d, n_jobs=3)
+        self.assertTrue(np.array_equal(dm, self.benchmark))
+        engine = sobol.SobolEngine(self.d)
+        dm = np.vstack([engine.draw(30, n_jobs=2), engine.draw(70)])
+        self.assertTrue(np.array_equal(dm, self.benchmark))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Unit test class to test the generation of sequential validation data set
+"""
+import unittest
+import numpy as np
+from gsa_module.samples import lhs, test_sample
+from gsa_module.samples.opt_alg import objective_functions
+
+__author__ = "Damar Wicaksono"
+
+
+class FullEvaluation:
+    """Objective function state without incremental candidate scoring"""
+
+
+class TestSampleTestCase(unittest.TestCase):
+    """Tests for gsa_module.samples.test_sample"""
+
+    def setUp(self):
+        """Test fixture build"""
+        self.dm = lhs.create(15, 3, seed=9713)
+        self.num_tests = 6
+        self.num_candidates = 100
+
+    def tearDown(self):
+        """Remove the registered objective functions"""
+        for name in list(objective_functions.OBJECTIVE_FUNCTIONS):
+            if name.endswith("_full"):
+                del objective_functions.OBJECTIVE_FUNCTIONS[name]
+
+    def test_are_scores_same_as_full_evaluation(self):
+        """Are the incremental candidate scores the same as full evaluation?"""
+        candidates = np.random.RandomState(9713).rand(self.num_candidates, 3)
+        for name, (obj_func, obj_class) in \
+                list(objective_functions.OBJECTIVE_FUNCTIONS.items()):
+            scores = obj_class.candidate_scores(self.dm, candidates)
+            train_data = self.dm.copy()
+            for ind in [5, 17, 42]:
+                values = [obj_func(np.vstack((train_data, candidate)))
+                          for candidate in candidates]
+                values = np.where(scores.selected, np.inf, values)
+                self.assertTrue(np.allclose(scores.values, values,
+                                            rtol=1e-10, atol=1e-14))
+                self.assertAlmostEqual(scores.add(ind), values[ind],
+                                       delta=1e-10*abs(values[ind]))
+                train_data = np.vstack((train_data, candidates[ind]))
+
+    def test_is_validation_set_same_as_full_evaluation(self):
+        """Is the validation set the same with and without the scores?"""
+        for name, (obj_func, obj_class) in \
+                list(objective_functions.OBJECTIVE_FUNCTIONS.items()):
+            objective_functions.register(name + "_full", obj_func,
+                                         FullEvaluation)
+            for batch_size in [1, 4]:
+                valid_data = test_sample.create_sequential(
+                    self.dm, self.num_tests, self.num_candidates, name,
+                    batch_size=batch_size, lazy=False)
+                valid_data_full = test_sample.create_sequential(
+                    self.dm, self.num_tests, self.num_candidates,
+                    name + "_full", batch_size=batch_size)
+                self.assertEqual(valid_data.shape, (self.num_tests, 3))
+                self.assertTrue(np.array_equal(valid_data, valid_data_full))
+                # No candidate is selected twice
+                self.assertEqual(np.unique(valid_data, axis=0).shape[0],
+                                 self.num_tests)
+
+    def test_is_lazy_greedy_same_as_greedy(self):
+        """Is the lazy-greedy selection the same as the greedy one?"""
+        candidates = np.random.RandomState(9713).rand(2000, 3)
+        all_scores = [
+            (objective_functions.W2Discrepancy, {}),
+            (objective_functions.CenteredL2Discrepancy, {}),
+            (objective_functions.MixtureDiscrepancy, {}),
+            (objective_functions.PhiP, {"p": 5})]
+        for obj_class, kwargs in all_scores:
+            for batch_size in [1, 3]:
+                selected = test_sample.select_greedy(
+                    obj_class.candidate_scores(self.dm, candidates, **kwargs),
+                    50, batch_size)
+                selected_lazy = test_sample.select_lazy_greedy(
+                    obj_class.candidate_scores(self.dm, candidates, **kwargs),
+                    50, batch_size)
+                self.assertTrue(np.array_equal(selected, selected_lazy))
+                self.assertEqual(np.unique(selected_lazy).shape[0], 50)
+
+    def test_is_batch_the_best_candidates(self):
+        """Is a batch made of the best candidates of the previous rounds?"""
+        for name, (obj_func, obj_class) in \
+                list(objective_functions.OBJECTIVE_FUNCTIONS.items()):
+            candidates = np.random.RandomState(9713).rand(500, 3)
+            scores = obj_class.candidate_scores(self.dm, candidates)
+            keys = scores.keys(np.arange(500))
+            selected = test_sample.select_lazy_greedy(scores, 10, 5)
+            self.assertEqual(set(selected[:5]), set(np.argsort(keys)[:5]))
+
+    def test_are_all_candidates_selected_at_most_once(self):
+        """Are too many validation points refused and all candidates used?"""
+        dm = lhs.create(10, 2, seed=1)
+        for lazy in [True, False]:
+            with self.assertRaises(ValueError):
+                test_sample.create_sequential(dm, 5, 3, lazy=lazy)
+        for name, (obj_func, obj_class) in \
+                list(objective_functions.OBJECTIVE_FUNCTIONS.items()):
+            candidates = np.random.RandomState(9713).rand(7, 2)
+            for batch_size in [1, 3]:
+                for select in [test_sample.select_lazy_greedy,
+                               test_sample.select_greedy]:
+                    scores = obj_class.candidate_scores(dm, candidates)
+                    selected = select(scores, 7, batch_size)
+                    self.assertEqual(sorted(selected), list(range(7)))
+                    with self.assertRaises(ValueError):
+                        select(scores, 1, batch_size)
+
+
+if __name__ == "__main__":
+    unittest.main()
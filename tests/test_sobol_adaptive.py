@@ -0,0 +1,64 @@
+"""Unit test class to test the adaptive Sobol'-Saltelli design
+"""
+import unittest
+import numpy as np
+from gsa_module.sobol import adaptive, indices_1st, indices_total, \
+    sobol_saltelli
+from gsa_module.test_functions import ishigami
+
+__author__ = "Damar Wicaksono"
+
+
+def model(xx: np.ndarray) -> np.ndarray:
+    """The Ishigami function of the normalized inputs"""
+    return ishigami.evaluate(2 * np.pi * xx - np.pi)
+
+
+class AdaptiveSobolSaltelliTestCase(unittest.TestCase):
+    """Tests for gsa_module.sobol.adaptive"""
+
+    def test_is_extended_design_the_same_as_created(self):
+        """Is the union of the steps the design created at once?"""
+        for sampling_scheme in ["sobol", "srs"]:
+            ad = adaptive.AdaptiveSobolSaltelli(
+                3, 32, sampling_scheme, seed_number=2718, num_bootstrap=50,
+                tolerance=0.0, max_runs=5 * 128)
+            steps = []
+            design = ad.next_design()
+            while design is not None:
+                self.assertIs(ad.next_design(), design)
+                steps.append(design)
+                ad.update({key: model(design[key]) for key in design})
+                design = ad.next_design()
+            self.assertEqual(ad.status, "budget")
+            self.assertEqual([step.num_samples for step in steps],
+                             [32, 32, 64])
+            self.assertEqual(ad.num_runs, 5 * 128)
+
+            expected = sobol_saltelli.create(128, 3, sampling_scheme, 2718)
+            y_dict = {key: model(expected[key]) for key in expected}
+            for key in expected:
+                self.assertTrue(np.array_equal(
+                    np.vstack([step[key] for step in steps]), expected[key]))
+            for module, str_estimator in [(indices_1st, "janon"),
+                                          (indices_total, "jansen")]:
+                self.assertTrue(np.allclose(
+                    ad.estimate(str_estimator)[0],
+                    module.estimate(y_dict, str_estimator, 0)[0]))
+
+    def test_does_it_stop_at_tolerance(self):
+        """Does the design stop growing once the intervals are narrow?"""
+        ad = adaptive.AdaptiveSobolSaltelli(3, 64, seed_number=2718,
+                                            tolerance=0.25,
+                                            num_bootstrap=200).run(model)
+        self.assertEqual(ad.status, "converged")
+        widths = [record["max_width"] for record in ad.history]
+        self.assertLessEqual(widths[-1], 0.25)
+        self.assertTrue(all(width > 0.25 for width in widths[:-1]))
+        self.assertEqual(ad.num_samples, 64 * 2**(len(widths) - 1))
+        with self.assertRaises(ValueError):
+            ad.update({"a": np.zeros(ad.num_samples)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""Unit test class to test the estimation of the Sobol' indices
+"""
+import unittest
+import numpy as np
+from gsa_module import util
+from gsa_module.sobol import indices_1st, indices_total, indices_all, misc
+
+__author__ = "Damar Wicaksono"
+
+
+class SobolIndicesTestCase(unittest.TestCase):
+    """Tests for gsa_module.sobol.indices_1st and indices_total"""
+
+    def setUp(self):
+        """Test fixture build"""
+        rng = np.random.RandomState(4521)
+        self.n = 200
+        self.k = 4
+        self.y_dict = {"a": rng.rand(self.n), "b": rng.rand(self.n)}
+        for i in range(self.k):
+            self.y_dict["ab_{}" .format(i+1)] = \
+                (1 - 0.2*i) * self.y_dict["a"] + 0.2*i * self.y_dict["b"] + \
+                0.1 * rng.rand(self.n)
+        self.num_bootstrap = 300
+
+    def loop_estimate(self, estimator, keys):
+        """Estimate the indices one replicate and one dimension at a time"""
+        estimates = np.empty([self.num_bootstrap + 1, self.k])
+        for i in range(self.num_bootstrap + 1):
+            if i == 0:
+                idx = np.arange(self.n)
+            else:
+                idx = np.random.choice(self.n, self.n, replace=True)
+            for j in range(self.k):
+                y_dict = dict(self.y_dict, ab_i=self.y_dict[
+                    "ab_{}" .format(j+1)])
+                estimates[i, j] = estimator(*[y_dict[key][idx]
+                                              for key in keys])
+
+        return estimates[0], estimates[1:]
+
+    def test_is_bootstrap_the_same_as_loop(self):
+        """Is the vectorized bootstrap the same as one sample at a time?"""
+        for module, str_estimator, keys in [
+                (indices_1st, "saltelli", ["b", "ab_i", "a"]),
+                (indices_1st, "janon", ["b", "ab_i", "a"]),
+                (indices_total, "jansen", ["a", "ab_i"]),
+                (indices_total, "sobol", ["a", "ab_i"])]:
+            estimator = getattr(module, str_estimator)
+            np.random.seed(4521)
+            expected, expected_bootstrap = self.loop_estimate(estimator, keys)
+            np.random.seed(4521)
+            estimates, bootstrap = module.estimate(self.y_dict, str_estimator,
+                                                   self.num_bootstrap)
+            self.assertTrue(np.allclose(estimates, expected,
+                                        rtol=1e-10, atol=1e-12))
+            self.assertTrue(np.allclose(bootstrap, expected_bootstrap,
+                                        rtol=1e-10, atol=1e-12))
+
+    def test_is_bootstrap_independent_of_chunks(self):
+        """Is the bootstrap the same for any size of chunks?"""
+        fab = misc.stack_outputs(self.y_dict, self.k)
+        bootstrap = []
+        for chunk_size in [1, 5000, 10**7]:
+            np.random.seed(4521)
+            bootstrap.append(util.bootstrap(
+                indices_total.jansen, [self.y_dict["a"], fab],
+                self.num_bootstrap, chunk_size=chunk_size))
+        self.assertTrue(np.array_equal(bootstrap[0], bootstrap[1]))
+        self.assertTrue(np.array_equal(bootstrap[0], bootstrap[2]))
+        self.assertEqual(bootstrap[0].shape, (self.num_bootstrap, self.k))
+
+    def test_is_bootstrap_independent_of_jobs(self):
+        """Is the bootstrap the same for any number of workers?"""
+        fab = misc.stack_outputs(self.y_dict, self.k)
+        outputs = [self.y_dict["b"], fab, self.y_dict["a"]]
+        num_bootstrap = 2 * util.BOOTSTRAP_BLOCK_SIZE + 7
+        expected = util.bootstrap(indices_1st.saltelli, outputs,
+                                  num_bootstrap, seed=4521)
+        for n_jobs, backend, chunk_size in [(3, "thread", 5000),
+                                            (-1, "thread", 10**7),
+                                            (2, "process", 10**5)]:
+            bootstrap = util.bootstrap(indices_1st.saltelli, outputs,
+                                       num_bootstrap, seed=4521,
+                                       n_jobs=n_jobs, backend=backend,
+                                       chunk_size=chunk_size)
+            self.assertTrue(np.array_equal(bootstrap, expected))
+        self.assertFalse(np.array_equal(
+            util.bootstrap(indices_1st.saltelli, outputs, num_bootstrap,
+                           seed=4522), expected))
+
+        # The global random state, drawn in order
+        np.random.seed(4521)
+        expected = indices_total.estimate(self.y_dict, "sobol",
+                                          self.num_bootstrap)[1]
+        np.random.seed(4521)
+        bootstrap = indices_total.estimate(self.y_dict, "sobol",
+                                           self.num_bootstrap, n_jobs=4)[1]
+        self.assertTrue(np.array_equal(bootstrap, expected))
+
+    def test_is_estimate_all_the_same_as_separate(self):
+        """Are all the estimators at once the same as one at a time?"""
+        for seed in [None, 4521]:
+            np.random.seed(4521)
+            results = indices_all.estimate_all(self.y_dict,
+                                               self.num_bootstrap, seed=seed)
+            self.assertEqual(sorted(results), sorted(indices_all.ESTIMATORS))
+            for module, str_estimator in [(indices_1st, "saltelli"),
+                                          (indices_1st, "janon"),
+                                          (indices_total, "jansen"),
+                                          (indices_total, "sobol")]:
+                # The same resamples as a separate estimation
+                np.random.seed(4521)
+                expected = module.estimate(self.y_dict, str_estimator,
+                                           self.num_bootstrap, seed=seed)
+                for result, expected_result in zip(results[str_estimator],
+                                                   expected):
+                    self.assertTrue(np.allclose(result, expected_result,
+                                                rtol=1e-10, atol=1e-12))
+        results = indices_all.estimate_all(self.y_dict, 0)
+        self.assertIsNone(results["jansen"][1])
+
+    def test_are_other_outputs_ignored(self):
+        """Are the outputs of the matrices BA_i ignored by all the modules?"""
+        y_dict = dict(self.y_dict)
+        for i in range(self.k):
+            y_dict["ba_{}" .format(i+1)] = self.y_dict["a"]
+        self.assertEqual(misc.num_dimensions(y_dict), self.k)
+        results = indices_all.estimate_all(y_dict, 0)
+        for module, str_estimator in [(indices_1st, "saltelli"),
+                                      (indices_total, "jansen")]:
+            expected = module.estimate(self.y_dict, str_estimator, 0)[0]
+            self.assertTrue(np.array_equal(
+                module.estimate(y_dict, str_estimator, 0)[0], expected))
+            self.assertTrue(np.allclose(results[str_estimator][0], expected,
+                                        rtol=1e-10, atol=1e-12))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""Unit test class to test the streaming estimation of the Sobol' indices
+"""
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+from gsa_module.sobol import indices_1st, indices_total, online
+
+__author__ = "Damar Wicaksono"
+
+
+class SobolOnlineTestCase(unittest.TestCase):
+    """Tests for gsa_module.sobol.online"""
+
+    def setUp(self):
+        """Test fixture build"""
+        rng = np.random.RandomState(8123)
+        self.n = 300
+        self.k = 4
+        self.y_dict = {"a": rng.rand(self.n), "b": rng.rand(self.n)}
+        for i in range(self.k):
+            self.y_dict["ab_{}" .format(i+1)] = \
+                (1 - 0.2*i) * self.y_dict["a"] + 0.2*i * self.y_dict["b"] + \
+                0.1 * rng.rand(self.n)
+        self.num_bootstrap = 40
+        self.estimators = [(indices_1st, "saltelli"), (indices_1st, "janon"),
+                           (indices_total, "jansen"), (indices_total, "sobol")]
+
+    def accumulate(self, indices: np.ndarray, batch_size: int):
+        """Accumulate the outputs of some samples, by batches"""
+        acc = online.SobolAccumulator(self.k, self.num_bootstrap, seed=8123)
+        for i in range(0, len(indices), batch_size):
+            batch = indices[i:i+batch_size]
+            acc.update({key: value[batch]
+                        for key, value in self.y_dict.items()}, batch)
+
+        return acc
+
+    def test_is_online_the_same_as_batch(self):
+        """Are the accumulated indices the same as the batch estimators?"""
+        acc = self.accumulate(np.arange(self.n), 37)
+        self.assertEqual(acc.num_samples, self.n)
+        for module, str_estimator in self.estimators:
+            expected = module.estimate(self.y_dict, str_estimator, 0)[0]
+            estimates, bootstrap = acc.estimate(str_estimator)
+            self.assertTrue(np.allclose(estimates, expected,
+                                        rtol=1e-10, atol=1e-12))
+            self.assertEqual(bootstrap.shape, (self.num_bootstrap, self.k))
+
+    def test_is_merge_the_same_as_single_stream(self):
+        """Is merging shuffled partial accumulations the same as one?"""
+        expected = self.accumulate(np.arange(self.n), self.n)
+        order = np.random.RandomState(8123).permutation(self.n)
+        acc = self.accumulate(order[:100], 7)
+        acc.merge(self.accumulate(order[100:], 50))
+        self.assertEqual(acc.num_samples, self.n)
+        for _, str_estimator in self.estimators:
+            for result, expected_result in zip(
+                    acc.estimate(str_estimator),
+                    expected.estimate(str_estimator)):
+                self.assertTrue(np.allclose(result, expected_result,
+                                            rtol=1e-10, atol=1e-12))
+        with self.assertRaises(ValueError):
+            acc.merge(online.SobolAccumulator(self.k, self.num_bootstrap,
+                                              seed=1))
+
+    def test_is_poisson_replicate_a_resampling(self):
+        """Is a bootstrap replicate the estimate of the weighted samples?"""
+        acc = self.accumulate(np.arange(self.n), 64)
+        weights = acc.weights(np.arange(self.n)).astype(int)
+        self.assertTrue(np.all(weights[0] == 1))
+        for r in [1, self.num_bootstrap]:
+            idx = np.repeat(np.arange(self.n), weights[r])
+            y_dict = {key: value[idx] for key, value in self.y_dict.items()}
+            for module, str_estimator in self.estimators:
+                expected = module.estimate(y_dict, str_estimator, 0)[0]
+                bootstrap = acc.estimate(str_estimator)[1]
+                self.assertTrue(np.allclose(bootstrap[r-1], expected,
+                                            rtol=1e-10, atol=1e-12))
+
+    def test_are_weights_independent_of_batches(self):
+        """Are the weights of a sample the same for any batches of samples?"""
+        indices = np.arange(2 * online.WEIGHT_BLOCK_SIZE + 10)
+        acc = online.SobolAccumulator(self.k, self.num_bootstrap, seed=8123)
+        expected = acc.weights(indices)
+        order = np.random.RandomState(8123).permutation(len(indices))
+        for batch in np.array_split(order, 7):
+            acc = online.SobolAccumulator(self.k, self.num_bootstrap,
+                                          seed=8123)
+            self.assertTrue(np.array_equal(acc.weights(batch),
+                                           expected[:, batch]))
+        for index in [0, online.WEIGHT_BLOCK_SIZE, len(indices) - 1]:
+            self.assertTrue(np.array_equal(acc.weights([index]),
+                                           expected[:, [index]]))
+
+    def test_is_saved_state_the_same(self):
+        """Can the accumulation be saved and continued?"""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmp_dir, "acc.npz")
+            self.accumulate(np.arange(100), 30).save(filename)
+            acc = online.SobolAccumulator.load(filename)
+            acc.update({key: value[100:]
+                        for key, value in self.y_dict.items()})
+        finally:
+            shutil.rmtree(tmp_dir)
+        expected = self.accumulate(np.arange(self.n), 30)
+        self.assertTrue(np.allclose(acc.estimate("jansen")[1],
+                                    expected.estimate("jansen")[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
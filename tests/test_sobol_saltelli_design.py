@@ -0,0 +1,78 @@
+"""Unit test class to test the lazy Sobol'-Saltelli design
+"""
+import unittest
+import numpy as np
+from gsa_module.samples import lhs
+from gsa_module.sobol import sobol_saltelli
+
+__author__ = "Damar Wicaksono"
+
+
+class SobolSaltelliDesignTestCase(unittest.TestCase):
+    """Tests for gsa_module.sobol.sobol_saltelli.SobolSaltelliDesign"""
+
+    def setUp(self):
+        """Test fixture build"""
+        self.n = 25
+        self.k = 5
+        self.seed = 8723
+
+    def test_are_matrices_the_same_as_copies(self):
+        """Are the matrices the same as A with a column replaced by B's?"""
+        for interaction in [False, True]:
+            dm = sobol_saltelli.create(self.n, self.k, "srs", self.seed,
+                                       interaction=interaction)
+            self.assertEqual(len(dm), (2 if interaction else 1) * self.k + 2)
+            self.assertEqual(list(dm)[:3], ["a", "b", "ab_1"])
+            for i in range(self.k):
+                ab_i = np.copy(dm["a"])
+                ab_i[:, i] = dm["b"][:, i]
+                self.assertTrue(np.array_equal(dm["ab_{}" .format(i+1)],
+                                               ab_i))
+                if interaction:
+                    ba_i = np.copy(dm["b"])
+                    ba_i[:, i] = dm["a"][:, i]
+                    self.assertTrue(np.array_equal(dm["ba_{}" .format(i+1)],
+                                                   ba_i))
+            self.assertEqual("ba_1" in dm, interaction)
+            self.assertRaises(KeyError, dm.__getitem__, "ab_0")
+
+    def test_are_runs_the_same_as_stacked_matrices(self):
+        """Are the runs by global index the same as the stacked matrices?"""
+        dm = sobol_saltelli.create(self.n, self.k, "lhs", self.seed,
+                                   interaction=True)
+        stacked = np.vstack([dm[key] for key in dm])
+        self.assertEqual(dm.num_runs, stacked.shape[0])
+        self.assertTrue(np.array_equal(dm.runs(slice(None)), stacked))
+        indices = np.random.RandomState(self.seed).randint(0, dm.num_runs, 50)
+        self.assertTrue(np.array_equal(dm.runs(indices), stacked[indices]))
+        self.assertTrue(np.array_equal(dm.runs(77), stacked[77]))
+        self.assertTrue(np.array_equal(dm.block("ba_2", slice(3, 9)),
+                                       dm["ba_2"][3:9]))
+        self.assertRaises(IndexError, dm.runs, dm.num_runs)
+
+    def test_are_lhs_replicates_the_same_as_lhs_designs(self):
+        """Are the replicated designs made of the replicated LHS designs?"""
+        dms = sobol_saltelli.create(self.n, self.k, "lhs", self.seed,
+                                    num_replicates=3)
+        ab = lhs.create(self.n, 2*self.k, self.seed, num_replicates=3)
+        self.assertEqual(len(dms), 3)
+        for dm, ab_i in zip(dms, ab):
+            self.assertTrue(np.array_equal(dm["a"], ab_i[:, :self.k]))
+            self.assertTrue(np.array_equal(dm["b"], ab_i[:, self.k:]))
+        self.assertRaises(ValueError, sobol_saltelli.create, self.n, self.k,
+                          "srs", self.seed, num_replicates=3)
+
+    def test_is_matrix_a_new_array(self):
+        """Is modifying an accessed matrix leaving the design unchanged?"""
+        dm = sobol_saltelli.create(self.n, self.k, "srs", self.seed)
+        a = dm["a"]
+        ab_1 = dm["ab_1"]
+        a[:] = -1.0
+        ab_1[:] = -1.0
+        self.assertTrue(np.all(dm["a"] >= 0.0))
+        self.assertTrue(np.all(dm["ab_1"] >= 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
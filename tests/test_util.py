@@ -0,0 +1,81 @@
+"""Unit test class to test the utilities
+"""
+import unittest
+import io
+import os
+import shutil
+import tempfile
+import numpy as np
+from gsa_module import util
+from gsa_module.sobol import sobol_saltelli
+
+__author__ = "Damar Wicaksono"
+
+
+class UtilTestCase(unittest.TestCase):
+    """Tests for gsa_module.util"""
+
+    def setUp(self):
+        """Test fixture build"""
+        self.dm = np.random.RandomState(3197).rand(1000, 7)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the written files"""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_is_text_the_same_as_savetxt(self):
+        """Is the chunked text output the same as np.savetxt?"""
+        for array, delimiter, fmt in [(self.dm, ",", "%1.6e"),
+                                      (self.dm, "\t", "%.17g"),
+                                      (self.dm[:, 0], " ", "%1.6e")]:
+            expected = io.StringIO()
+            np.savetxt(expected, array, fmt=fmt, delimiter=delimiter)
+            text = io.StringIO()
+            util.write_text(text, array, delimiter, fmt, chunk_size=100)
+            self.assertEqual(text.getvalue(), expected.getvalue())
+
+    def test_is_format_from_extension(self):
+        """Is the output format inferred from the extension of the file?"""
+        self.assertEqual(util.ext_to_format("dir.npz/dm.npy"), "npy")
+        self.assertEqual(util.ext_to_format("dm.npz"), "npz")
+        self.assertEqual(util.ext_to_format("dm.tsv", "npy"), "tsv")
+        self.assertEqual(util.ext_to_format("dm.dat", "txt"), "txt")
+        self.assertEqual(util.ext_to_format("-", "npy"), "npy")
+        self.assertRaises(ValueError, util.ext_to_format, "dm.dat", "dat")
+
+    def test_is_binary_output_exact(self):
+        """Is the binary output keeping the full precision?"""
+        for ext in ["npy", "npz", "csv"]:
+            filename = os.path.join(self.tmp_dir, "dm.{}" .format(ext))
+            util.write_array(filename, self.dm)
+            if ext == "npy":
+                dm = np.load(filename, mmap_mode="r")
+                self.assertTrue(np.array_equal(dm, self.dm))
+            elif ext == "npz":
+                self.assertTrue(np.array_equal(np.load(filename)["dm"],
+                                               self.dm))
+            else:
+                dm = np.loadtxt(filename, delimiter=",")
+                self.assertTrue(np.allclose(dm, self.dm, rtol=1e-6))
+
+    def test_are_sobol_saltelli_files_the_same(self):
+        """Are the Sobol'-Saltelli matrices the same in all the formats?"""
+        dm = sobol_saltelli.create(50, 3, "srs", 3197, interaction=True)
+        header = os.path.join(self.tmp_dir, "ss")
+        for output_format in ["csv", "npy", "npz"]:
+            sobol_saltelli.write(dm, header, fmt="%.17g",
+                                 output_format=output_format, chunk_size=40)
+        dm_npz = np.load(header + ".npz")
+        self.assertEqual(list(dm_npz.keys()), list(dm))
+        for key in dm:
+            self.assertTrue(np.array_equal(dm_npz[key], dm[key]))
+            self.assertTrue(np.array_equal(
+                np.load("{}_{}.npy" .format(header, key)), dm[key]))
+            self.assertTrue(np.array_equal(
+                np.loadtxt("{}_{}.csv" .format(header, key), delimiter=","),
+                dm[key]))
+
+
+if __name__ == "__main__":
+    unittest.main()